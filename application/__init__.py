@@ -4,12 +4,21 @@ from litestar.di import Provide
 from litestar.plugins.sqlalchemy import SQLAlchemyPlugin
 from litestar.plugins.structlog import StructlogPlugin
 
+from .accounts import principals
 from .commands import CommandPlugin
 from .config import config
+from .contents.hits import view_counter
+from .contents.trending import trending_service
 from .deps import provide_limit_offset
+from .guards import PermissionGuard
+from .media.pipeline import pipeline
 from .router import route_handlers
+from .search.index import search_index
 from .security import SecurityPlugin
 from .web import events
+from .web.bus import bus
+from .web.lookup import watcher
+from .web.pages import page_cache
 
 __all__ = ["create_app"]
 
@@ -32,9 +41,29 @@ def create_app():
         template_config=config.plugins.template,
         openapi_config=config.plugins.openapi,
         exception_handlers=config.plugins.exception_handlers,
+        on_startup=[
+            bus.start,
+            page_cache.start,
+            PermissionGuard.load_bits,
+            search_index.create_table,
+            watcher.start,
+            view_counter.start,
+            trending_service.start,
+        ],
+        on_shutdown=[
+            view_counter.stop,
+            trending_service.stop,
+            bus.stop,
+            watcher.stop,
+            pipeline.shutdown,
+        ],
         listeners=[
             events.on_category_changed,
             events.on_feature_changed,
             events.on_special_changed,
+            events.on_content_changed,
+            events.on_tag_changed,
+            events.on_template_changed,
+            principals.on_principal_changed,
         ],
     )
@@ -20,19 +20,21 @@ class AccessController(Controller):
 
     @get("/me")
     async def profile(self, request: Request, service: UserService) -> UserSchema:
-        return service.to_schema(data=request.user, schema_type=UserSchema)
+        user = await service.get(request.user.id)
+        return service.to_schema(data=user, schema_type=UserSchema)
 
     @patch("/me/password")
     async def update_password(
         self, request: Request, data: PasswordChangeSchema, service: UserService
     ) -> UserSchema:
-        # 验证旧密码
-        if not request.user.password_hash.verify(data.old_password):
+        # 验证旧密码（request.user 只是鉴权快照，不含密码）
+        user = await service.get(request.user.id)
+        if not user.password_hash.verify(data.old_password):
             raise NotAuthorizedException("当前密码错误")
 
         # 更新密码
-        await service.update({"password_hash": data.new_password}, request.user.id)
-        user = await service.get(request.user.id)
+        await service.update({"password_hash": data.new_password}, user.id)
+        user = await service.get(user.id)
         return service.to_schema(data=user, schema_type=UserSchema)
 
     @post(path="/login", exclude_from_auth=True)
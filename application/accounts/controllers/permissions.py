@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING
 from uuid import UUID
 
 from advanced_alchemy.filters import LimitOffset
-from litestar import Controller, get, patch
+from litestar import Controller, Request, get, patch
 
 from application.deps import create_service_provider
 from application.guards import PermissionGuard
@@ -39,7 +39,13 @@ class PermissionController(Controller):
 
     @patch("{item_id:uuid}", guards=[update_permission])
     async def update_permission(
-        self, item_id: UUID, service: PermissionService, data: PermissionUpdateSchema
+        self,
+        item_id: UUID,
+        service: PermissionService,
+        data: PermissionUpdateSchema,
+        request: Request,
     ) -> PermissionSchema:
-        item = await service.update(data, item_id)
+        # 先提交再通知，避免其他 worker 在提交前重新加载到旧的权限
+        item = await service.update(data, item_id, auto_commit=True)
+        request.app.emit("principal_changed")
         return service.to_schema(data=item, schema_type=PermissionSchema)
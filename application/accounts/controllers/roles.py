@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING, Annotated
 from uuid import UUID
 
 from advanced_alchemy.filters import LimitOffset, SearchFilter
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, Request, delete, get, patch, post
 from litestar.params import Parameter
 from sqlalchemy.orm import lazyload
 
@@ -73,10 +73,16 @@ class RoleController(Controller):
         service: RoleService,
         data: RoleUpdateSchema,
         item_id: UUID,
+        request: Request,
     ) -> RoleSchema:
-        role = await service.update(data, item_id)
+        # 先提交再通知，避免其他 worker 在提交前重新加载到旧的权限
+        role = await service.update(data, item_id, auto_commit=True)
+        request.app.emit("principal_changed")
         return service.to_schema(data=role, schema_type=RoleSchema)
 
     @delete("{item_id:uuid}", guards=[delete_permission])
-    async def delete_role(self, service: RoleService, item_id: UUID) -> None:
-        await service.delete(item_id)
+    async def delete_role(
+        self, service: RoleService, item_id: UUID, request: Request
+    ) -> None:
+        await service.delete(item_id, auto_commit=True)
+        request.app.emit("principal_changed")
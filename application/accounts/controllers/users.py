@@ -4,7 +4,7 @@ from typing import Annotated
 from uuid import UUID
 
 from advanced_alchemy.filters import ComparisonFilter, LimitOffset, SearchFilter
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, Request, delete, get, patch, post
 from litestar.pagination import OffsetPagination
 from litestar.params import Parameter
 from sqlalchemy.orm import lazyload
@@ -67,11 +67,20 @@ class UserController(Controller):
 
     @patch("{item_id:uuid}", guards=[update_permission])
     async def update_user(
-        self, item_id: UUID, data: UserUpdateSchema, service: UserService
+        self,
+        item_id: UUID,
+        data: UserUpdateSchema,
+        service: UserService,
+        request: Request,
     ) -> UserSchema:
-        user = await service.update(data, item_id)
+        # 先提交再通知，避免其他 worker 在提交前重新加载到旧的权限
+        user = await service.update(data, item_id, auto_commit=True)
+        request.app.emit("principal_changed")
         return service.to_schema(data=user, schema_type=UserSchema)
 
     @delete("{item_id:uuid}", guards=[delete_permission])
-    async def delete_user(self, item_id: UUID, service: UserService) -> None:
-        await service.delete(item_id)
+    async def delete_user(
+        self, item_id: UUID, service: UserService, request: Request
+    ) -> None:
+        await service.delete(item_id, auto_commit=True)
+        request.app.emit("principal_changed")
@@ -6,7 +6,7 @@ from uuid import UUID
 from advanced_alchemy.base import AdvancedDeclarativeBase, UUIDv7AuditBase, UUIDv7Base
 from advanced_alchemy.types import HashedPassword, PasswordHash
 from advanced_alchemy.types.password_hash.argon2 import Argon2Hasher
-from sqlalchemy import ForeignKey, String, sql
+from sqlalchemy import ForeignKey, Integer, String, sql
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 if TYPE_CHECKING:
@@ -44,8 +44,9 @@ class User(UUIDv7AuditBase):
         return f"<User username='{self.username}' id='{self.id}'>"
 
     def has_permission(self, permission: str) -> bool:
+        # 鉴权走 Principal 的预计算集合，这里只用于已加载完整 User 的场景
         return any(
-            permission in [p.name for p in role.permissions] for role in self.roles
+            p.name == permission for role in self.roles for p in role.permissions
         )
 
     @property
@@ -90,6 +91,9 @@ class Permission(UUIDv7Base):
     name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     description: Mapped[str | None] = mapped_column(String(255))
 
+    # 权限位编号，由 permissions_to_db 分配，分配后不再变化
+    bit: Mapped[int | None] = mapped_column(Integer, unique=True)
+
     # 关系: Permission <-> Role (多对多)
     roles: Mapped[list[Role]] = relationship(
         secondary="accounts_roles_permissions",
@@ -101,6 +105,19 @@ class Permission(UUIDv7Base):
         return f"<Permission name='{self.name}'>"
 
 
+class PermissionBitMark(AdvancedDeclarativeBase):
+    """
+    已分配过的最大权限位编号（只有一行，只增不减）
+
+    删除权限后它的编号不再分配给新权限，避免仍持有旧位图的主体获得新权限。
+    """
+
+    __tablename__ = "accounts_permission_bits"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    high_water: Mapped[int] = mapped_column(Integer, default=-1)
+
+
 class UserRole(AdvancedDeclarativeBase):
     """
     用户-角色 关联表 (多对多)
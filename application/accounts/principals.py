@@ -0,0 +1,121 @@
+"""认证主体缓存
+
+每个 /api 请求都要根据 session 中的 user_id 还原当前用户。完整加载 User 需要
+用户、角色、权限三次查询，这里只缓存鉴权需要的只读快照，并用一次联表查询构建。
+
+用户、角色、权限变更时通过失效总线清理所有 worker 的缓存；
+缓存带版本号，清理前开始、清理后才完成的加载结果不会写回。
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+import sqlalchemy as sa
+from litestar.events import listener
+
+from application.config import config
+from application.web.bus import bus
+
+from .models import Permission, RolePermission, User, UserRole
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """当前用户的鉴权快照，作为 `request.user`"""
+
+    id: UUID
+    username: str
+    is_active: bool
+    is_superuser: bool
+    permissions: frozenset[str]
+    # 按 Permission.bit 编码的权限位图
+    mask: int = 0
+
+    def has_permission(self, permission: str) -> bool:
+        return permission in self.permissions
+
+    def has_bit(self, bit: int) -> bool:
+        return (self.mask >> bit) & 1 == 1
+
+
+async def load_principal(session: AsyncSession, user_id: Any) -> Principal | None:
+    stmt = (
+        sa.select(
+            User.id,
+            User.username,
+            User.is_active,
+            User.is_superuser,
+            Permission.name,
+            Permission.bit,
+        )
+        .outerjoin(UserRole, UserRole.user_id == User.id)
+        .outerjoin(RolePermission, RolePermission.role_id == UserRole.role_id)
+        .outerjoin(Permission, Permission.id == RolePermission.permission_id)
+        .where(User.id == user_id)
+    )
+    rows = (await session.execute(stmt)).all()
+    if not rows:
+        return None
+    id_, username, is_active, is_superuser, *_ = rows[0]
+    mask = 0
+    for row in rows:
+        if row.bit is not None:
+            mask |= 1 << row.bit
+    return Principal(
+        id=id_,
+        username=username,
+        is_active=is_active,
+        is_superuser=is_superuser,
+        permissions=frozenset(row.name for row in rows if row.name is not None),
+        mask=mask,
+    )
+
+
+class PrincipalCache:
+    """按 user_id 缓存 Principal，带过期时间和全局版本号"""
+
+    def __init__(self, ttl: int) -> None:
+        self.ttl = ttl
+        self.version = 0
+        self._items: dict[str, tuple[Principal | None, int, float]] = {}
+
+    async def get(self, session: AsyncSession, user_id: Any) -> Principal | None:
+        key = str(user_id)
+        cached = self._items.get(key)
+        if (
+            cached is not None
+            and cached[1] == self.version
+            and cached[2] > time.monotonic()
+        ):
+            return cached[0]
+
+        version = self.version
+        principal = await load_principal(session, user_id)
+        if version == self.version:
+            self._items[key] = (principal, version, time.monotonic() + self.ttl)
+        return principal
+
+    def clear(self) -> None:
+        self.version += 1
+        self._items.clear()
+
+
+principals = PrincipalCache(ttl=config.accounts_principal_ttl)
+
+
+@listener("principal_changed")
+async def on_principal_changed(**kwargs):
+    await bus.publish("principal_changed", **kwargs)
+
+
+@bus.subscribe("principal_changed")
+async def invalidate_principals(**kwargs):
+    # 后台修改用户、角色、权限的频率很低，直接全部清理
+    principals.clear()
@@ -3,15 +3,17 @@ from __future__ import annotations
 from typing import Annotated
 from uuid import UUID
 
-from advanced_alchemy.filters import LimitOffset, SearchFilter
+from advanced_alchemy.filters import CollectionFilter, LimitOffset, SearchFilter
 from advanced_alchemy.service import OffsetPagination
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, Request, delete, get, patch, post
 from litestar.params import Parameter
 from sqlalchemy.orm import joinedload, selectinload, defer
 
 from application.accounts.models import User
 from application.deps import create_service_provider
 from application.guards import PermissionGuard
+from application.search.index import search_index
+from application.web import pages
 
 from .models import Article
 from .schemas import (
@@ -22,6 +24,13 @@ from .schemas import (
 )
 from .services import ArticleService
 
+# 列表加载选项：不加载正文
+LIST_LOAD_OPTIONS = [
+    joinedload(Article.creator),
+    joinedload(Article.category),
+    defer(Article.text),
+]
+
 # 详情页加载选项：加载完整关联数据
 DETAIL_LOAD_OPTIONS = [
     joinedload(Article.creator),
@@ -37,6 +46,17 @@ update_permission = PermissionGuard("articles:update_article", "更新文章")
 delete_permission = PermissionGuard("articles:delete_article", "删除文章")
 
 
+def cache_tags(article: Article) -> list[str]:
+    """文章变更时需要失效的前台页面缓存标签"""
+    return pages.content_tags(
+        content_ids=[article.id],
+        category_ids=[article.category_id],
+        tag_ids=[item.id for item in article.tags],
+        special_ids=[item.id for item in article.specials],
+        feature_ids=[item.id for item in article.features],
+    )
+
+
 class ArticleController(Controller):
     path = "/articles"
     tags = ["Articles (文章)"]
@@ -51,6 +71,30 @@ class ArticleController(Controller):
         limit_offset: LimitOffset,
         search: Annotated[str | None, Parameter(default=None)],
     ) -> OffsetPagination[ArticleLiteSchema]:
+        session = service.repository.session
+        if search and search_index.available(session):
+            # 使用全文索引，按相关度排序
+            ids, total = await search_index.search(
+                session,
+                search,
+                limit=limit_offset.limit,
+                offset=limit_offset.offset,
+                published=False,
+            )
+            items = {
+                item.id: item
+                for item in await service.list(
+                    CollectionFilter(field_name="id", values=ids),
+                    load=LIST_LOAD_OPTIONS,
+                )
+            }
+            return service.to_schema(
+                data=[items[i] for i in ids if i in items],
+                total=total,
+                schema_type=ArticleLiteSchema,
+                filters=[limit_offset],
+            )
+
         filters = []
         if search:
             filters.append(
@@ -58,14 +102,11 @@ class ArticleController(Controller):
             )
 
         filters.append(limit_offset)
+        # 计数表只按分类维护，后台文章列表直接 COUNT
         total = await service.count(*filters)
         results = await service.list(
             *filters,
-            load=[
-                joinedload(Article.creator),
-                joinedload(Article.category),
-                defer(Article.text),
-            ],
+            load=LIST_LOAD_OPTIONS,
             order_by=Article.published_at.desc(),
         )
         return service.to_schema(
@@ -93,8 +134,20 @@ class ArticleController(Controller):
         service: ArticleService,
         current_user: User,
         data: ArticleCreateSchema,
+        request: Request,
     ) -> None:
-        await service.create_many_for_categories(data, creator=current_user)
+        await service.create_many_for_categories(
+            data, creator=current_user, auto_commit=True
+        )
+        request.app.emit(
+            "content_changed",
+            tags=pages.content_tags(
+                category_ids=data.category_ids,
+                tag_ids=data.tag_ids or (),
+                special_ids=data.special_ids or (),
+                feature_ids=data.feature_ids or (),
+            ),
+        )
 
     @patch("{item_id:uuid}", guards=[update_permission])
     async def update_article(
@@ -102,13 +155,21 @@ class ArticleController(Controller):
         item_id: UUID,
         service: ArticleService,
         data: ArticleUpdateSchema,
+        request: Request,
     ) -> ArticleSchema:
+        # 更新前后所属分类都可能展示这篇文章
+        tags = cache_tags(await service.get(item_id, load=DETAIL_LOAD_OPTIONS))
         article = await service.update(data, item_id, load=DETAIL_LOAD_OPTIONS)
+        request.app.emit("content_changed", tags=sorted({*tags, *cache_tags(article)}))
         return service.to_schema(
             data=article,
             schema_type=ArticleSchema,
         )
 
     @delete("{item_id:uuid}", guards=[delete_permission])
-    async def delete_article(self, item_id: UUID, service: ArticleService) -> None:
-        await service.delete(item_id)
+    async def delete_article(
+        self, item_id: UUID, service: ArticleService, request: Request
+    ) -> None:
+        tags = cache_tags(await service.get(item_id, load=DETAIL_LOAD_OPTIONS))
+        await service.delete(item_id, auto_commit=True)
+        request.app.emit("content_changed", tags=tags)
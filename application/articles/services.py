@@ -12,8 +12,11 @@ from advanced_alchemy.service import (
     schema_dump,
 )
 from advanced_alchemy.service.typing import ModelDictT
+from sqlalchemy.orm import selectinload
 
+from application.contents.counters import refresh_counters
 from application.media.models import File
+from application.search.index import search_index
 from application.taxonomies.services import (
     CategoryRepository,
     FeatureRepository,
@@ -32,6 +35,25 @@ class ArticleRepository(SQLAlchemyAsyncRepository[Article]):
     model_type = Article
 
 
+# 计数需要的关联数据
+COUNTER_LOAD_OPTIONS = [
+    selectinload(Article.tags),
+    selectinload(Article.specials),
+    selectinload(Article.features),
+]
+
+
+async def refresh_article_counters(session, *articles: Article) -> None:
+    """重新统计文章所属栏目、标签、专题、推荐位的计数"""
+    await refresh_counters(
+        session,
+        category_ids={article.category_id for article in articles},
+        tag_ids={item.id for article in articles for item in article.tags},
+        special_ids={item.id for article in articles for item in article.specials},
+        feature_ids={item.id for article in articles for item in article.features},
+    )
+
+
 class ArticleService(SQLAlchemyAsyncRepositoryService[Article]):
     repository_type = ArticleRepository
 
@@ -39,6 +61,7 @@ class ArticleService(SQLAlchemyAsyncRepositoryService[Article]):
         self,
         data: ModelDictT[Article],
         creator: User,
+        auto_commit: bool = False,
     ) -> Sequence[Article]:
         if not is_dict(data):
             data = schema_dump(data)
@@ -51,7 +74,12 @@ class ArticleService(SQLAlchemyAsyncRepositoryService[Article]):
             {**data, "category": category, "creator": creator}
             for category in categories
         ]
-        return await super().create_many(datas)
+        articles = await super().create_many(datas)
+        await refresh_article_counters(self.repository.session, *articles)
+        await search_index.index(self.repository.session, articles)
+        if auto_commit:
+            await self.repository.session.commit()
+        return articles
 
     async def to_model_on_create(
         self, data: ModelDictT[Article]
@@ -135,8 +163,15 @@ class ArticleService(SQLAlchemyAsyncRepositoryService[Article]):
     async def update(
         self, data: ModelDictT[Article], item_id: Any | None = None, **kwargs
     ) -> Article:
-        history = await self.repository.get(item_id)
+        history = await self.repository.get(item_id, load=COUNTER_LOAD_OPTIONS)
         category_id = history.category_id
+        # 更新前的归属，更新后这些对象的计数也要重新统计
+        before = {
+            "category_ids": {history.category_id},
+            "tag_ids": {item.id for item in history.tags},
+            "special_ids": {item.id for item in history.specials},
+            "feature_ids": {item.id for item in history.features},
+        }
         category_repo = CategoryRepository(session=self.repository.session)
         category = await category_repo.get(category_id)
 
@@ -153,5 +188,25 @@ class ArticleService(SQLAlchemyAsyncRepositoryService[Article]):
                 key=model.id,
                 category=splitext(model.category.path)[0],
             )
+        await self.repository.session.flush()
+        await refresh_counters(
+            self.repository.session,
+            category_ids=before["category_ids"] | {model.category_id},
+            tag_ids=before["tag_ids"] | {item.id for item in model.tags},
+            special_ids=before["special_ids"] | {item.id for item in model.specials},
+            feature_ids=before["feature_ids"] | {item.id for item in model.features},
+        )
+        await search_index.index(self.repository.session, [model])
         await self.repository.session.commit()
         return await self.get(item_id, load=kwargs.get("load"))
+
+    async def delete(self, item_id: Any, **kwargs) -> Article:
+        article = await self.repository.get(item_id, load=COUNTER_LOAD_OPTIONS)
+        auto_commit = kwargs.pop("auto_commit", None)
+        model = await super().delete(item_id, auto_commit=False, **kwargs)
+        await self.repository.session.flush()
+        await refresh_article_counters(self.repository.session, article)
+        await search_index.remove(self.repository.session, [article.id])
+        if auto_commit:
+            await self.repository.session.commit()
+        return model
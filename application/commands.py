@@ -7,6 +7,10 @@ from litestar import Litestar
 from litestar.plugins import CLIPluginProtocol
 
 from application.accounts.commands import accounts_management
+from application.contents.commands import counters_management
+from application.search.commands import search_management
+from application.themes.commands import templates_management
+from application.web.commands import pages_management, sitemap_management
 
 from .guards import PermissionGuard
 
@@ -14,6 +18,11 @@ from .guards import PermissionGuard
 class CommandPlugin(CLIPluginProtocol):
     def on_cli_init(self, cli: click.Group) -> None:
         cli.add_command(accounts_management)
+        cli.add_command(counters_management)
+        cli.add_command(templates_management)
+        cli.add_command(pages_management)
+        cli.add_command(search_management)
+        cli.add_command(sitemap_management)
 
         @cli.command("permissions", help="显示所有权限")
         def run(app: Litestar):
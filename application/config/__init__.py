@@ -5,6 +5,7 @@ from functools import cached_property
 from .exceptions import ExceptionConfig, create_exception_handlers
 from .middleware import create_middleware_config
 from .openapi import OpenAPIConfig, create_openapi_config
+from .sessions import BaseBackendConfig, create_session_config
 from .settings import Settings
 from .sqlalchemy import SQLAlchemyAsyncConfig, create_sqlalchemy_config
 from .stores import StoreRegistry, create_stores_config
@@ -35,7 +36,12 @@ class PluginRegistry:
     @cached_property
     def stores(self) -> StoreRegistry:
         """缓存存储注册表对象"""
-        return create_stores_config(self._settings)
+        return create_stores_config(self._settings, self.sqlalchemy.get_engine())
+
+    @cached_property
+    def session(self) -> BaseBackendConfig:
+        """Session 后端配置对象"""
+        return create_session_config(self._settings)
 
     @cached_property
     def openapi(self) -> OpenAPIConfig:
@@ -2,11 +2,11 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from litestar.middleware.session.server_side import ServerSideSessionConfig
-
 if TYPE_CHECKING:
     from .settings import Settings
 
 
 def create_middleware_config(settings: Settings):
-    return [ServerSideSessionConfig().middleware]
+    # session 中间件由 SecurityPlugin 通过 SessionAuth 注册（见 config/sessions.py），
+    # 这里不再重复注册，否则每个请求会读写两次 session
+    return []
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING
+
+from litestar.middleware.session.base import BaseBackendConfig
+from litestar.middleware.session.client_side import CookieBackendConfig
+
+from application.stores.sessions import SessionConfig
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+SESSION_STORE = "sessions"
+
+# 前台页面不需要 session，只有 /api 下的请求经过 session 中间件
+SESSION_EXCLUDE = "^/(?!api/).+$"
+
+
+def create_session_config(settings: Settings) -> BaseBackendConfig:
+    if settings.session_backend == "cookie":
+        # 无状态 session：数据加密后保存在 Cookie 中，不访问任何存储
+        return CookieBackendConfig(
+            secret=hashlib.sha256(settings.secret_key.encode()).digest(),
+            max_age=settings.session_max_age,
+            exclude=SESSION_EXCLUDE,
+        )
+    return SessionConfig(
+        store=SESSION_STORE,
+        max_age=settings.session_max_age,
+        renew_after=settings.session_renew_after,
+        exclude=SESSION_EXCLUDE,
+    )
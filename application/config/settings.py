@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from functools import cached_property
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -27,6 +28,34 @@ class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///storage/cms.db"
     database_echo: bool = False
 
+    # ===== 认证配置 =====
+    accounts_principal_ttl: int = Field(
+        default=300,
+        ge=1,
+        description="当前用户鉴权快照缓存有效期（秒），漏收失效消息时的兜底",
+    )
+
+    session_backend: Literal["file", "memory", "database", "cookie"] = Field(
+        default="file",
+        description="Session 后端：file 本地文件，memory 进程内（单 worker），"
+        "database 数据库共享（多 worker），cookie 加密 Cookie（无状态）",
+    )
+    session_max_age: int = Field(
+        default=14 * 24 * 3600,
+        ge=60,
+        description="Session 有效期（秒）",
+    )
+    session_renew_after: int = Field(
+        default=3600,
+        ge=0,
+        description="Session 内容不变时的续期间隔（秒），期间的请求不写存储",
+    )
+    session_memory_max_entries: int = Field(
+        default=10000,
+        ge=1,
+        description="memory 后端最多保存的 session 数",
+    )
+
     # ===== URL 配置 =====
     admin_url: str = "/admin"
     admin_title: str = "LiteCMS"
@@ -46,12 +75,199 @@ class Settings(BaseSettings):
         default=10 * 1024 * 1024,  # 10MB
         description="最大上传文件大小（字节）",
     )
+    upload_max_pixels: int = Field(
+        default=40_000_000,
+        description="上传图片的最大像素数（宽 x 高），限制解码时的内存占用",
+    )
     upload_webp_quality: int = Field(
         default=80,
         ge=1,
         le=100,
         description="WebP 压缩质量 (1-100)",
     )
+    media_image_widths: tuple[int, ...] = Field(
+        default=(320, 640, 1280),
+        description="上传图片生成的宽度变体（像素），模板通过 srcset() 使用",
+    )
+    media_avif: bool = Field(
+        default=False,
+        description="是否额外生成 AVIF 变体",
+    )
+    media_storage: Literal["oss", "local"] = Field(
+        default="oss",
+        description="文件存储后端：oss 阿里云对象存储，local 保存到 public/uploads",
+    )
+    media_local_url: str = Field(
+        default="/uploads",
+        description="本地存储的访问 URL 前缀",
+    )
+    media_workers: int = Field(
+        default=2,
+        ge=1,
+        description="图片处理进程数",
+    )
+    media_max_pending: int = Field(
+        default=8,
+        ge=0,
+        description="图片处理排队上限，超过后返回 503",
+    )
+    media_io_threads: int = Field(
+        default=4,
+        ge=1,
+        description="上传到对象存储的线程数上限",
+    )
+
+    # ===== 缓存存储配置 =====
+    cache_memory_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="每个 worker 内存缓存的容量上限（字节），超出后淘汰最久未访问的条目",
+    )
+    cache_memory_max_entries: int = Field(
+        default=10000,
+        ge=1,
+        description="每个 worker 内存缓存的条目数上限",
+    )
+    cache_memory_ttl: int = Field(
+        default=60,
+        ge=0,
+        description="内存缓存条目的最长有效期（秒），其他 worker 的删除最多延迟这么久可见",
+    )
+
+    cache_shared_store: Literal["file", "mmap"] = Field(
+        default="file",
+        description="worker 之间共享的缓存层：file 文件目录，mmap 内存映射文件（单机多 worker）",
+    )
+    cache_mmap_size: int = Field(
+        default=64 * 1024 * 1024,
+        ge=1024 * 1024,
+        description="mmap 共享缓存的数据区大小（字节），写满后整体淘汰",
+    )
+    cache_mmap_slots: int = Field(
+        default=65536,
+        ge=1024,
+        description="mmap 共享缓存的索引槽位数",
+    )
+
+    # ===== 前台缓存配置 =====
+    web_permalink_miss_size: int = Field(
+        default=10000,
+        ge=0,
+        description="不存在路径的负缓存条数上限",
+    )
+    web_permalink_miss_ttl: int = Field(
+        default=300,
+        ge=1,
+        description="不存在路径的负缓存有效期（秒）",
+    )
+    web_page_cache: bool = Field(
+        default=True,
+        description="是否启用整页缓存；页面存放在两级缓存存储中，容量见 cache_memory_* 和共享缓存配置",
+    )
+    web_page_cache_ttl: int = Field(
+        default=3600,
+        ge=1,
+        description="整页缓存有效期（秒），数据变更时会按标签提前失效",
+    )
+    web_stale_ttl: int = Field(
+        default=30,
+        ge=0,
+        description="缓存过期或失效后旧版本的保留时间（秒），重新加载期间返回给并发请求，0 表示不返回旧版本",
+    )
+    web_stream_render: bool = Field(
+        default=False,
+        description="未进入整页缓存的前台页面以流式方式渲染，先发送页面头部",
+    )
+    web_template_watch: bool = Field(
+        default=True,
+        description="监听模板目录，文件变化时清理模板和整页缓存（需要 watchfiles）",
+    )
+    web_keyset_threshold: int = Field(
+        default=1000,
+        ge=0,
+        description="栏目文章数超过该值时改用游标分页，否则使用页码分页",
+    )
+    web_store_ttl: int = Field(
+        default=600,
+        ge=1,
+        description="栏目/专题/推荐位列表缓存有效期（秒），漏收失效消息时的兜底",
+    )
+    web_feed_size: int = Field(
+        default=20,
+        ge=1,
+        description="RSS/Atom 订阅包含的最新内容条数",
+    )
+    web_bus_backend: Literal["local", "database"] = Field(
+        default="database",
+        description="缓存失效总线：local 仅当前进程（单 worker / 测试），database 通过数据库广播到所有 worker",
+    )
+    web_bus_poll_interval: float = Field(
+        default=2.0,
+        gt=0,
+        description="轮询缓存版本表的间隔（秒）",
+    )
+
+    contents_views_flush_interval: float = Field(
+        default=10.0,
+        gt=0,
+        description="浏览量写回数据库的间隔（秒）",
+    )
+    contents_views_max_pending: int = Field(
+        default=10000,
+        ge=1,
+        description="每个进程最多累计的待写回路径数，达到后提前写回",
+    )
+
+    contents_trending_windows: dict[str, int] = Field(
+        default={"1h": 3600, "24h": 86400, "7d": 604800},
+        description="热门排行的统计窗口：名称 -> 秒数，模板中按名称选择",
+    )
+    contents_trending_bucket: int = Field(
+        default=3600,
+        ge=60,
+        description="热门排行的分桶时长（秒），窗口按桶滑动",
+    )
+    contents_trending_top_k: int = Field(
+        default=50,
+        ge=1,
+        description="每个栏目/全站保留的热门内容数",
+    )
+    contents_trending_snapshot_interval: float = Field(
+        default=300.0,
+        gt=0,
+        description="热门排行保存快照并刷新页面的间隔（秒）",
+    )
+
+    # ===== 搜索 =====
+    search_page_size: int = Field(
+        default=10,
+        ge=1,
+        description="前台搜索结果每页条数",
+    )
+    search_query_length: int = Field(
+        default=100,
+        ge=1,
+        description="搜索词最大长度，超出部分忽略",
+    )
+
+    # ===== 静态导出 =====
+    export_base_url: str = Field(
+        default="http://example.com",
+        description="导出静态页面时使用的站点地址（canonical 等链接）",
+    )
+    export_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="导出静态页面时同时渲染的页面数",
+    )
+
+    # ===== 站点地图 =====
+    sitemap_shard_size: int = Field(
+        default=50000,
+        ge=1,
+        le=50000,
+        description="站点地图每个分片的最大 URL 数",
+    )
 
     # ===== 路径计算 (Computed Fields) =====
 
@@ -85,3 +301,18 @@ class Settings(BaseSettings):
     @cached_property
     def assets_dir(self) -> Path:
         return self.public_dir / "build"
+
+    @computed_field
+    @cached_property
+    def upload_dir(self) -> Path:
+        return self.public_dir / "uploads"
+
+    @computed_field
+    @cached_property
+    def export_dir(self) -> Path:
+        return self.public_dir / "pages"
+
+    @computed_field
+    @cached_property
+    def sitemap_dir(self) -> Path:
+        return self.public_dir / "sitemaps"
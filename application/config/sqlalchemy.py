@@ -15,20 +15,24 @@ from sqlalchemy.pool import NullPool
 if TYPE_CHECKING:
     from .settings import Settings
 
+# 只读连接的执行选项：SQLite 下不执行 BEGIN IMMEDIATE，读取不占用写锁
+READ_ONLY = "read_only"
 
-def create_engine(settings: Settings) -> AsyncEngine:
+
+def create_engine(settings: Settings, url: str | None = None) -> AsyncEngine:
     # 确定是否开启回显：如果在 debug 模式或者是显式开启了 database_echo
     should_echo = settings.debug or settings.database_echo
+    url = url or settings.database_url
 
     engine_kwargs = {
-        "url": settings.database_url,
+        "url": url,
         "future": True,
         "json_serializer": encode_json,
         "json_deserializer": decode_json,
         "echo": should_echo,
     }
 
-    if settings.database_url.startswith("postgresql"):
+    if url.startswith("postgresql"):
         engine = create_async_engine(**engine_kwargs)
 
         @event.listens_for(engine.sync_engine, "connect")
@@ -58,7 +62,7 @@ def create_engine(settings: Settings) -> AsyncEngine:
                 ),
             )
 
-    elif settings.database_url.startswith("sqlite"):
+    elif url.startswith("sqlite"):
         engine_kwargs["poolclass"] = NullPool
         engine = create_async_engine(**engine_kwargs)
 
@@ -78,8 +82,9 @@ def create_engine(settings: Settings) -> AsyncEngine:
             dbapi_connection.isolation_level = None
 
         @event.listens_for(engine.sync_engine, "begin")
-        def _sqla_on_begin_sqlite(dbapi_connection: Any) -> Any:
-            dbapi_connection.exec_driver_sql("BEGIN IMMEDIATE")
+        def _sqla_on_begin_sqlite(conn: Any) -> Any:
+            if not conn.get_execution_options().get(READ_ONLY):
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
 
     else:
         engine = create_async_engine(**engine_kwargs)
@@ -5,13 +5,66 @@ from typing import TYPE_CHECKING
 from litestar.stores.file import FileStore
 from litestar.stores.registry import StoreRegistry
 
+from application.stores import (
+    DatabaseStore,
+    LRUMemoryStore,
+    SharedMemoryStore,
+    TieredStore,
+)
+
+from .sessions import SESSION_STORE
+from .sqlalchemy import create_engine
+
 if TYPE_CHECKING:
+    from litestar.stores.base import NamespacedStore, Store
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
     from .settings import Settings
 
 
-def create_stores_config(settings: Settings) -> StoreRegistry:
+def create_session_store(settings: Settings, engine: AsyncEngine) -> Store:
+    if settings.session_backend == "memory":
+        return LRUMemoryStore(max_entries=settings.session_memory_max_entries)
+    if settings.session_backend == "database":
+        if engine.dialect.name == "sqlite":
+            # SQLite 只允许一个写事务：请求自身的数据库事务在响应发出后才提交，
+            # session 写入如果用同一个库会互相等待，因此单独放一个库文件
+            engine = create_engine(
+                settings,
+                url=f"sqlite+aiosqlite:///{settings.storage_dir / 'sessions.db'}",
+            )
+            return DatabaseStore(engine, create_table=True).with_namespace(
+                SESSION_STORE
+            )
+        return DatabaseStore(engine).with_namespace(SESSION_STORE)
+    return FileStore(
+        create_directories=True, path=settings.storage_dir / "caches"
+    ).with_namespace(SESSION_STORE)
+
+
+def create_shared_store(settings: Settings) -> NamespacedStore:
+    if settings.cache_shared_store == "mmap":
+        # 同一台机器上的所有 worker 共享一个映射文件
+        return SharedMemoryStore(
+            path=settings.storage_dir / "caches" / "shared.cache",
+            size=settings.cache_mmap_size,
+            slots=settings.cache_mmap_slots,
+        )
+    return FileStore(create_directories=True, path=settings.storage_dir / "caches")
+
+
+def create_stores_config(settings: Settings, engine: AsyncEngine) -> StoreRegistry:
+    # 其余存储（整页缓存 pages、响应缓存等）：worker 内存 LRU + 共享存储两级，
+    # 所有命名空间共享内存容量和统计，可通过任一存储的 stats() 查看
+    cache = TieredStore(
+        l1=LRUMemoryStore(
+            max_entries=settings.cache_memory_max_entries,
+            max_bytes=settings.cache_memory_max_bytes,
+        ),
+        l2=create_shared_store(settings),
+        l1_ttl=settings.cache_memory_ttl,
+    )
     return StoreRegistry(
-        default_factory=lambda name: FileStore(
-            create_directories=True, path=settings.storage_dir / "caches"
-        ).with_namespace(name.replace("_", ""))
+        stores={SESSION_STORE: create_session_store(settings, engine)},
+        default_factory=lambda name: cache.with_namespace(name.replace("_", "")),
     )
@@ -10,7 +10,12 @@ import pkgutil
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, TypeVar
 
-from jinja2 import Environment, FileSystemLoader, pass_context
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    pass_context,
+)
 from litestar.contrib.jinja import JinjaTemplateEngine
 from litestar.template.config import TemplateConfig
 
@@ -64,6 +69,10 @@ def create_template_config(settings: Settings) -> TemplateConfig:
     # 自动发现并导入所有 templates.py 模块
     _auto_discover_template_modules()
 
+    # 编译后的字节码保存到磁盘，重启和新 worker 不必重新编译模板
+    bytecode_dir = settings.storage_dir / "caches" / "jinja"
+    bytecode_dir.mkdir(parents=True, exist_ok=True)
+
     env = Environment(
         loader=FileSystemLoader(
             [
@@ -72,6 +81,9 @@ def create_template_config(settings: Settings) -> TemplateConfig:
             ]
         ),
         enable_async=True,
+        # 模板变更通过 template_changed 事件清理缓存，非 debug 模式下不逐次检查文件
+        auto_reload=settings.debug,
+        bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir)),
     )
 
     # 直接在 Jinja2 globals 中注册异步函数
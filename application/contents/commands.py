@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import anyio
+import click
+
+from application.config import config
+
+from .counters import rebuild_counters
+
+
+@click.group(
+    name="counters",
+    invoke_without_command=False,
+    help="Manage content counters.",
+)
+def counters_management() -> None:
+    """Manage content counters."""
+
+
+@counters_management.command(name="rebuild", help="重新统计所有内容计数")
+def rebuild() -> None:
+    async def _rebuild() -> int:
+        async with config.plugins.sqlalchemy.get_session() as db_session:
+            rows = await rebuild_counters(db_session)
+            await db_session.commit()
+            return rows
+
+    rows = anyio.run(_rebuild)
+    click.echo(f"内容计数已重建，共 {rows} 条")
@@ -0,0 +1,197 @@
+"""内容计数维护
+
+写入内容或调整标签/专题/推荐位归属时，在同一个事务内重新统计受影响对象的计数并写回
+`contents_counters`；前台分页和后台列表直接读取计数，不再 COUNT。
+
+重新统计前先锁住对应的计数行，并发写入同一对象时依次统计，先提交的结果不会被
+后统计、但看不到它的事务覆盖。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+import sqlalchemy as sa
+
+from application.taxonomies.models import FeatureContent, SpecialContent, TagContent
+
+from .enums import PublishStatus
+from .models import Content, ContentCounter
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# kind -> (分组列, 需要关联的中间表)
+SOURCES: dict[str, tuple[Any, Any]] = {
+    "category": (Content.category_id, None),
+    "tag": (TagContent.tag_id, TagContent),
+    "special": (SpecialContent.special_id, SpecialContent),
+    "feature": (FeatureContent.feature_id, FeatureContent),
+}
+
+
+def _count_statement(kind: str) -> sa.Select:
+    published = sa.func.coalesce(
+        sa.func.sum(sa.case((Content.status == PublishStatus.PUBLISHED, 1), else_=0)),
+        0,
+    )
+    column, through = SOURCES[kind]
+    stmt = sa.select(column, sa.func.count(Content.id), published)
+    if through is not None:
+        stmt = stmt.select_from(through).join(Content, Content.id == through.content_id)
+    return stmt.group_by(column)
+
+
+def _upsert(session: AsyncSession) -> Any:
+    """支持 ON CONFLICT 的数据库返回对应的 insert，否则返回 None"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        return insert
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+
+        return insert
+    return None
+
+
+async def _lock(session: AsyncSession, keys: dict[str, set[UUID]]) -> None:
+    """锁住要重新统计的计数行；不存在的行先插入，保证有行可锁"""
+    table = ContentCounter.__table__
+    insert = _upsert(session)
+    if insert is not None:
+        await session.execute(
+            insert(table).on_conflict_do_nothing(
+                index_elements=[table.c.kind, table.c.object_id]
+            ),
+            [
+                {"kind": kind, "object_id": object_id, "total": 0, "published": 0}
+                for kind, ids in keys.items()
+                for object_id in ids
+            ],
+        )
+    # 固定加锁顺序，避免两个事务交叉等待
+    await session.execute(
+        sa.select(table.c.kind)
+        .where(
+            sa.or_(
+                *(
+                    sa.and_(table.c.kind == kind, table.c.object_id.in_(ids))
+                    for kind, ids in keys.items()
+                )
+            )
+        )
+        .order_by(table.c.kind, table.c.object_id)
+        .with_for_update()
+    )
+
+
+async def _save(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    table = ContentCounter.__table__
+    insert = _upsert(session)
+    if insert is not None:
+        stmt = insert(table)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.kind, table.c.object_id],
+                set_={
+                    "total": stmt.excluded.total,
+                    "published": stmt.excluded.published,
+                },
+            ),
+            rows,
+        )
+        return
+
+    for row in rows:
+        await session.execute(
+            sa.delete(table).where(
+                table.c.kind == row["kind"], table.c.object_id == row["object_id"]
+            )
+        )
+    await session.execute(sa.insert(table), rows)
+
+
+async def refresh_counters(
+    session: AsyncSession,
+    *,
+    category_ids: Iterable[UUID] = (),
+    tag_ids: Iterable[UUID] = (),
+    special_ids: Iterable[UUID] = (),
+    feature_ids: Iterable[UUID] = (),
+) -> None:
+    """重新统计指定对象的计数（在调用方的事务内，不提交）"""
+    keys: dict[str, set[UUID]] = {}
+    for kind, ids in (
+        ("category", category_ids),
+        ("tag", tag_ids),
+        ("special", special_ids),
+        ("feature", feature_ids),
+    ):
+        if ids := set(ids):
+            keys[kind] = ids
+    if not keys:
+        return
+    await _lock(session, keys)
+
+    rows: list[dict[str, Any]] = []
+    for kind, ids in keys.items():
+        column = SOURCES[kind][0]
+        result = await session.execute(_count_statement(kind).where(column.in_(ids)))
+        counted = {
+            object_id: (total, published) for object_id, total, published in result
+        }
+        for object_id in ids:
+            total, published = counted.get(object_id, (0, 0))
+            rows.append(
+                {
+                    "kind": kind,
+                    "object_id": object_id,
+                    "total": total,
+                    "published": published,
+                }
+            )
+    await _save(session, rows)
+
+
+async def rebuild_counters(session: AsyncSession) -> int:
+    """全量重建计数，返回写入的行数"""
+    await session.execute(sa.delete(ContentCounter))
+    rows: list[dict[str, Any]] = []
+    for kind in SOURCES:
+        for object_id, total, published in await session.execute(
+            _count_statement(kind)
+        ):
+            if object_id is None:
+                continue
+            rows.append(
+                {
+                    "kind": kind,
+                    "object_id": object_id,
+                    "total": total,
+                    "published": published,
+                }
+            )
+    await _save(session, rows)
+    return len(rows)
+
+
+async def get_count(
+    session: AsyncSession,
+    kind: str,
+    object_id: UUID,
+    *,
+    published: bool = True,
+) -> int | None:
+    """读取计数；尚未统计过时返回 None，由调用方回退到 COUNT"""
+    column = ContentCounter.published if published else ContentCounter.total
+    return await session.scalar(
+        sa.select(column).where(
+            ContentCounter.kind == kind, ContentCounter.object_id == object_id
+        )
+    )
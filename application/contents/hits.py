@@ -0,0 +1,111 @@
+"""内容浏览量计数
+
+每次访问都执行 `UPDATE ... SET views = views + 1` 会在 SQLite 的写锁上排队。
+这里先在进程内按内容路径累加访问次数，后台任务定期把累计的增量用一条 UPDATE 写回，
+进程退出时再写一次。写回的增量同时计入热门排行（见 `trending`）。
+
+整页缓存命中时不会执行视图函数，所以按路径而不是内容 ID 计数；
+栏目页等不是内容的路径在写回时匹配不到任何行。
+nginx 直接返回的静态导出页面由页面中的脚本上报浏览（见 `web.export`）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections import Counter
+
+import sqlalchemy as sa
+
+from application.config import config
+
+from .models import Content
+from .trending import trending_service
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    def __init__(self, flush_interval: float, max_pending: int) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # 因为待写入路径过多丢弃的访问次数
+        self.dropped = 0
+        self._pending: Counter[str] = Counter()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+    def hit(self, path: str) -> None:
+        pending = self._pending
+        if path not in pending:
+            if len(pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            if len(pending) + 1 == self.max_pending:
+                # 待写入路径达到上限，通知后台任务提前写回
+                self._full.set()
+        pending[path] += 1
+
+    async def flush(self) -> int:
+        """写回累计的访问次数，返回更新的行数"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, Counter()
+        self._full.clear()
+
+        table = Content.__table__
+        stmt = (
+            sa.update(table)
+            .where(table.c.path.in_(pending))
+            .values(
+                views=table.c.views + sa.case(pending, value=table.c.path, else_=0),
+                # 浏览量不算内容修改，保留 updated_at，避免触发 onupdate
+                updated_at=table.c.updated_at,
+            )
+            .returning(table.c.id, table.c.category_id, table.c.path)
+        )
+        try:
+            async with config.plugins.sqlalchemy.get_engine().begin() as conn:
+                rows = (await conn.execute(stmt)).all()
+        except Exception:
+            # 写回失败时合并回去，下次重试
+            logger.exception("写回浏览量失败")
+            for path, count in pending.items():
+                if path in self._pending or len(self._pending) < self.max_pending:
+                    self._pending[path] += count
+                else:
+                    self.dropped += count
+            return 0
+        trending_service.add(
+            (content_id, category_id, pending[path])
+            for content_id, category_id, path in rows
+        )
+        return len(rows)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # 不取消后台任务，避免正在写回的增量丢失
+        if self._task is not None:
+            self._closing = True
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            if self._closing:
+                return
+            await self.flush()
+
+
+view_counter = ViewCounter(
+    flush_interval=config.contents_views_flush_interval,
+    max_pending=config.contents_views_max_pending,
+)
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from random import randint
 from typing import TYPE_CHECKING
 from urllib.parse import urljoin
 from uuid import UUID
 
-from advanced_alchemy.base import UUIDv7AuditBase
+from advanced_alchemy.base import AdvancedDeclarativeBase, UUIDv7AuditBase
 from advanced_alchemy.types import DateTimeUTC
 from sqlalchemy import Enum as SaEnum
 from sqlalchemy import ForeignKey, Index, String
@@ -97,7 +96,7 @@ class Content(UUIDv7AuditBase):
         default=PublishStatus.DRAFT,
         index=True,
     )
-    views: Mapped[int] = mapped_column(default=lambda: randint(10000, 99999))
+    views: Mapped[int] = mapped_column(default=0)
 
     published_at: Mapped[datetime | None] = mapped_column(
         DateTimeUTC(timezone=True), index=True
@@ -159,6 +158,21 @@ def pluralize(name: str) -> str:
     return name + "s"
 
 
+class ContentCounter(AdvancedDeclarativeBase):
+    """
+    内容计数 (按栏目/标签/专题/推荐位维护，替代分页时的 COUNT 查询)
+
+    kind 为 category / tag / special / feature
+    """
+
+    __tablename__ = "contents_counters"
+
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+    object_id: Mapped[UUID] = mapped_column(primary_key=True)
+    total: Mapped[int] = mapped_column(default=0, comment="内容总数")
+    published: Mapped[int] = mapped_column(default=0, comment="已发布内容数")
+
+
 class ContentBase(Content):
     """
     内容类型的抽象基类 (Abstract Base for Content Types)
@@ -0,0 +1,296 @@
+"""热门内容排行
+
+浏览量写回数据库时（见 `hits.ViewCounter`），把各内容的访问增量按时间分桶累加到内存：
+- 每个统计窗口（如 24h）维护窗口内各内容的访问合计，新增访问时加上，桶滑出窗口时减去
+- 每个窗口按栏目和全站维护前 K 名，只重新计算本次有变化的栏目，模板读取时直接切片
+
+每个进程只记录自己处理的访问，定期保存到 `storage/caches/trending/` 下属于本进程的快照，
+再合并目录中所有快照重新计算排行：每次访问只在一个快照中出现，各 worker 的排行一致，
+重启前的快照在滑出窗口前继续参与合并。
+每次合并后失效使用了排行的整页缓存，页面上的排行按保存间隔更新。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import heapq
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import msgspec
+
+from application.config import config
+from application.web.pages import TRENDING_TAG, page_cache
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingSnapshot(msgspec.Struct, array_like=True):
+    bucket_seconds: int
+    # 桶序号 -> [(内容 ID, 栏目 ID, 访问次数)]
+    buckets: dict[int, list[tuple[str, str, int]]]
+
+
+_decoder = msgspec.msgpack.Decoder(TrendingSnapshot)
+
+
+class TrendingIndex:
+    def __init__(
+        self,
+        windows: dict[str, int],
+        bucket_seconds: int = 3600,
+        top_k: int = 50,
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.top_k = top_k
+        self.window_seconds = dict(windows)
+        # 窗口名 -> 包含的桶数
+        self.windows = {
+            name: max(1, -(-seconds // bucket_seconds))
+            for name, seconds in windows.items()
+        }
+        self._span = max(self.windows.values())
+        self._current = self._bucket(time.time())
+        self._buckets: dict[int, Counter[UUID]] = {}
+        self._categories: dict[UUID, UUID] = {}
+        self._totals: dict[str, Counter[UUID]] = {name: Counter() for name in windows}
+        # (窗口名, 栏目 ID，None 表示全站) -> [(内容 ID, 访问次数)]
+        self._top: dict[tuple[str, UUID | None], list[tuple[UUID, int]]] = {}
+
+    def _bucket(self, now: float) -> int:
+        return int(now // self.bucket_seconds)
+
+    @property
+    def span_seconds(self) -> int:
+        """最长窗口覆盖的时长，更早的访问不再参与排行"""
+        return self._span * self.bucket_seconds
+
+    def add(self, hits: Iterable[tuple[UUID, UUID, int]]) -> None:
+        """累加当前时间的访问次数：(内容 ID, 栏目 ID, 次数)"""
+        changed = self._advance(self._bucket(time.time()))
+        changed |= self._merge(self._current, hits)
+        self._rank(changed)
+
+    def refresh(self) -> None:
+        """时间推进后让滑出窗口的访问失效"""
+        self._rank(self._advance(self._bucket(time.time())))
+
+    def top(
+        self, window: str, category: UUID | None = None, limit: int = 10
+    ) -> list[tuple[UUID, int]]:
+        if window not in self.windows:
+            logger.warning("未配置的热门排行统计窗口: %s", window)
+            return []
+        return self._top.get((window, category), [])[:limit]
+
+    def fingerprint(self) -> str:
+        """各排行名次的摘要，不含访问次数"""
+        digest = hashlib.sha256()
+        for (window, category), ranked in sorted(
+            self._top.items(), key=lambda item: (item[0][0], str(item[0][1]))
+        ):
+            digest.update(f"{window}:{category}:".encode())
+            digest.update(b"".join(content_id.bytes for content_id, _ in ranked))
+        return digest.hexdigest()
+
+    def _merge(self, index: int, hits: Iterable[tuple[UUID, UUID, int]]) -> set[UUID]:
+        changed: set[UUID] = set()
+        bucket = self._buckets.setdefault(index, Counter())
+        for content_id, category_id, count in hits:
+            bucket[content_id] += count
+            previous = self._categories.get(content_id)
+            if previous is not None and previous != category_id:
+                # 内容换了栏目，原栏目的排行也要更新
+                changed.add(previous)
+            self._categories[content_id] = category_id
+            for name, size in self.windows.items():
+                if index > self._current - size:
+                    self._totals[name][content_id] += count
+            changed.add(category_id)
+        return changed
+
+    def _advance(self, current: int) -> set[UUID]:
+        """切换到新的桶，返回排行受影响的栏目"""
+        changed: set[UUID] = set()
+        previous = self._current
+        if current <= previous:
+            return changed
+        self._current = current
+        for name, size in self.windows.items():
+            totals = self._totals[name]
+            # 滑出窗口的桶：(previous - size, current - size]
+            for index, bucket in self._buckets.items():
+                if not previous - size < index <= current - size:
+                    continue
+                for content_id, count in bucket.items():
+                    totals[content_id] -= count
+                    if totals[content_id] <= 0:
+                        del totals[content_id]
+                    changed.add(self._categories[content_id])
+        for index in [i for i in self._buckets if i <= current - self._span]:
+            for content_id in self._buckets.pop(index):
+                if not any(content_id in b for b in self._buckets.values()):
+                    self._categories.pop(content_id, None)
+        return changed
+
+    def _rank(self, categories: set[UUID]) -> None:
+        if not categories:
+            return
+        for name, totals in self._totals.items():
+            by_category: defaultdict[UUID, list[UUID]] = defaultdict(list)
+            for content_id in totals:
+                category_id = self._categories[content_id]
+                if category_id in categories:
+                    by_category[category_id].append(content_id)
+            for category_id in categories:
+                self._top[name, category_id] = self._largest(
+                    totals, by_category.get(category_id, ())
+                )
+            self._top[name, None] = self._largest(totals, totals)
+
+    def _largest(
+        self, totals: Counter[UUID], candidates: Iterable[UUID]
+    ) -> list[tuple[UUID, int]]:
+        ids = heapq.nlargest(self.top_k, candidates, key=totals.__getitem__)
+        return [(content_id, totals[content_id]) for content_id in ids]
+
+    def dump(self) -> bytes:
+        return msgspec.msgpack.encode(
+            TrendingSnapshot(
+                bucket_seconds=self.bucket_seconds,
+                buckets={
+                    index: [
+                        (str(content_id), str(self._categories[content_id]), count)
+                        for content_id, count in bucket.items()
+                    ]
+                    for index, bucket in self._buckets.items()
+                },
+            )
+        )
+
+    def load(self, *snapshots: TrendingSnapshot) -> None:
+        """合并快照中仍在窗口内的访问"""
+        changed = self._advance(self._bucket(time.time()))
+        for snapshot in snapshots:
+            if snapshot.bucket_seconds != self.bucket_seconds:
+                continue
+            for index, items in snapshot.buckets.items():
+                if self._current - self._span < index <= self._current:
+                    changed |= self._merge(
+                        index,
+                        (
+                            (UUID(content_id), UUID(category_id), count)
+                            for content_id, category_id, count in items
+                        ),
+                    )
+        self._rank(changed)
+
+
+class TrendingService:
+    """热门排行的生命周期：启动时合并已有快照，定期保存本进程的快照并重新合并
+
+    `own` 只记录本进程的访问，写入自己的快照文件；模板读取的 `index` 由所有快照合并而成。
+    """
+
+    def __init__(
+        self,
+        windows: dict[str, int],
+        bucket_seconds: int,
+        top_k: int,
+        directory: Path,
+        interval: float,
+    ) -> None:
+        self.windows = dict(windows)
+        self.bucket_seconds = bucket_seconds
+        self.top_k = top_k
+        self.directory = directory
+        self.interval = interval
+        # 快照文件名，每次启动不同，重启前的快照不会被覆盖
+        self.origin = uuid4().hex
+        self.own = self._new_index()
+        self.index = self._new_index()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{self.origin}.msgpack"
+
+    def _new_index(self) -> TrendingIndex:
+        return TrendingIndex(
+            windows=self.windows, bucket_seconds=self.bucket_seconds, top_k=self.top_k
+        )
+
+    def add(self, hits: Iterable[tuple[UUID, UUID, int]]) -> None:
+        self.own.add(hits)
+
+    def top(
+        self, window: str, category: UUID | None = None, limit: int = 10
+    ) -> list[tuple[UUID, int]]:
+        return self.index.top(window, category, limit)
+
+    async def start(self) -> None:
+        self.index = self.merged()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.save()
+
+    def merged(self) -> TrendingIndex:
+        """合并目录中所有快照，顺带删除已经整个滑出窗口的快照"""
+        index = self._new_index()
+        expired = time.time() - index.span_seconds - self.bucket_seconds
+        snapshots = []
+        for file in sorted(self.directory.glob("*.msgpack")):
+            try:
+                if file.stat().st_mtime < expired:
+                    file.unlink(missing_ok=True)
+                    continue
+                snapshots.append(_decoder.decode(file.read_bytes()))
+            except (OSError, msgspec.DecodeError):
+                logger.exception("读取热门排行快照失败: %s", file)
+        index.load(*snapshots)
+        return index
+
+    def snapshot_fingerprint(self) -> str:
+        """已保存快照中排行的摘要，给不统计访问的进程（如静态导出）判断排行是否变化"""
+        return self.merged().fingerprint()
+
+    def save(self) -> None:
+        """保存本进程记录的访问"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / f".{self.origin}.tmp"
+            tmp.write_bytes(self.own.dump())
+            os.replace(tmp, self.path)
+        except OSError:
+            logger.exception("保存热门排行快照失败")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.own.refresh()
+            self.save()
+            self.index = self.merged()
+            # 使用了排行的页面按快照间隔更新
+            page_cache.evict(TRENDING_TAG)
+
+
+trending_service = TrendingService(
+    windows=config.contents_trending_windows,
+    bucket_seconds=config.contents_trending_bucket,
+    top_k=config.contents_trending_top_k,
+    directory=config.storage_dir / "caches" / "trending",
+    interval=config.contents_trending_snapshot_interval,
+)
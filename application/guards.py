@@ -1,14 +1,22 @@
+import logging
 from typing import ClassVar, cast
 
 from litestar.connection import ASGIConnection
 from litestar.exceptions import NotAuthorizedException, PermissionDeniedException
 from litestar.handlers.base import BaseRouteHandler
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 
-from application.accounts.models import User
+from application.accounts.principals import Principal
+
+
+logger = logging.getLogger(__name__)
 
 
 class PermissionGuard:
     ALL_PERMISSIONS: ClassVar[dict[str, str | None]] = {}
+    # 权限名 -> Permission.bit，启动时从数据库加载；没有编号的权限按名称检查
+    BITS: ClassVar[dict[str, int]] = {}
 
     def __init__(
         self,
@@ -22,7 +30,7 @@ class PermissionGuard:
     async def __call__(
         self, connection: ASGIConnection, route_handler: BaseRouteHandler
     ) -> None:
-        user = cast(User, connection.user)
+        user = cast(Principal | None, connection.user)
         if not user:
             raise NotAuthorizedException("未认证")
 
@@ -30,11 +38,36 @@ class PermissionGuard:
         if user.is_superuser:
             return
 
-        if not user.has_permission(self.permission):
+        bit = self.BITS.get(self.permission)
+        allowed = (
+            user.has_bit(bit)
+            if bit is not None
+            else user.has_permission(self.permission)
+        )
+        if not allowed:
             raise PermissionDeniedException("权限不足")
 
+    @staticmethod
+    async def load_bits() -> None:
+        """加载权限位编号（应用启动时调用）"""
+        from application.accounts.models import Permission
+        from application.config import config
+
+        try:
+            async with config.plugins.sqlalchemy.get_session() as db_session:
+                rows = await db_session.execute(
+                    select(Permission.name, Permission.bit).where(
+                        Permission.bit.is_not(None)
+                    )
+                )
+                PermissionGuard.BITS = {name: bit for name, bit in rows}
+        except SQLAlchemyError:
+            # 表结构未迁移时退回按名称检查
+            logger.warning("权限位编号加载失败，按权限名称检查", exc_info=True)
+
     @staticmethod
     async def permissions_to_db() -> None:
+        from application.accounts.models import PermissionBitMark
         from application.accounts.schemas import PermissionCreateSchema
         from application.accounts.services import PermissionService
         from application.config import config
@@ -47,7 +80,7 @@ class PermissionGuard:
             # 添加权限
             for name, description in PermissionGuard.ALL_PERMISSIONS.items():
                 if name not in existing_perms_map:
-                    await service.create(
+                    existing_perms_map[name] = await service.create(
                         PermissionCreateSchema(
                             name=name, description=description or ""
                         ),
@@ -62,6 +95,30 @@ class PermissionGuard:
                     await service.delete(perm_obj.id, auto_commit=False)
                     needs_commit = True
 
+            # 分配权限位：已有编号保持不变，新权限从分配过的最大编号之后分配，
+            # 已删除权限的编号不再使用
+            mark = await db_session.get(PermissionBitMark, 1)
+            if mark is None:
+                mark = PermissionBitMark(id=1, high_water=-1)
+                db_session.add(mark)
+            next_bit = max(
+                (p.bit for p in existing_perms_map.values() if p.bit is not None),
+                default=-1,
+            )
+            next_bit = max(next_bit, mark.high_water)
+            for perm_name in sorted(perms_set):
+                perm_obj = existing_perms_map[perm_name]
+                if perm_obj.bit is None:
+                    next_bit += 1
+                    perm_obj.bit = next_bit
+                    needs_commit = True
+            if mark.high_water != next_bit:
+                mark.high_water = next_bit
+                needs_commit = True
+            PermissionGuard.BITS = {
+                name: existing_perms_map[name].bit for name in sorted(perms_set)
+            }
+
             if needs_commit:
                 await db_session.commit()
                 print("Permissions updated successfully")
@@ -168,7 +168,23 @@ server {{
         expires 30d;
     }}
 
+    # 站点地图（uv run litestar sitemap build）
+    location ~ ^/sitemap[\\w-]*\\.xml$ {{
+        root {PROJECT_DIR}/public/sitemaps;
+        expires 1h;
+    }}
+
+    # 静态导出的页面（uv run litestar pages export），带查询参数的请求交给应用
     location / {{
+        root {PROJECT_DIR}/public/pages;
+        error_page 418 = @app;
+        if ($args) {{
+            return 418;
+        }}
+        try_files $uri $uri/index.html @app;
+    }}
+
+    location @app {{
         proxy_pass http://{PROJECT_NAME}_backend;
         proxy_set_header Host $host;
         proxy_set_header X-Real-IP $remote_addr;
@@ -190,10 +206,16 @@ server {{
     print()
     print("部署步骤:")
     print("   1. cp .env.example .env && vim .env")
-    print(f"   2. sudo cp deploy/{PROJECT_NAME}.service /etc/systemd/system/")
-    print(f"   3. sudo systemctl enable --now {PROJECT_NAME}")
-    print(f"   4. sudo cp deploy/nginx.conf /etc/nginx/sites-enabled/{PROJECT_NAME}")
-    print("   5. sudo nginx -t && sudo systemctl reload nginx")
+    print("   2. uv run litestar templates compile")
+    print(
+        "   3. uv run litestar pages export（内容变更后重新执行，只导出受影响的页面）"
+    )
+    print("   4. uv run litestar search rebuild（已有文章首次启用搜索时执行）")
+    print("   5. uv run litestar sitemap build（可加入 crontab 定期执行）")
+    print(f"   6. sudo cp deploy/{PROJECT_NAME}.service /etc/systemd/system/")
+    print(f"   7. sudo systemctl enable --now {PROJECT_NAME}")
+    print(f"   8. sudo cp deploy/nginx.conf /etc/nginx/sites-enabled/{PROJECT_NAME}")
+    print("   9. sudo nginx -t && sudo systemctl reload nginx")
 
 
 # ============================================================
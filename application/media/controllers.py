@@ -1,113 +1,149 @@
-import oss2
-from io import BytesIO
-from litestar import Controller, post
-from litestar.datastructures import UploadFile
-from litestar.enums import RequestEncodingType
+import asyncio
+
+from litestar import Controller, Request, get, post
 from litestar.exceptions import HTTPException
-from litestar.params import Body
-from pathlib import Path
-from PIL import Image
+from litestar.status_codes import HTTP_503_SERVICE_UNAVAILABLE
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid_utils import uuid7
-from yarl import URL
 
 from application.config import config
+from application.guards import PermissionGuard
 
 from .models import File
+from .pipeline import PipelineBusy, PipelineStats, pipeline
 from .schemas import UploadSchema
+from .storages import StorageError, storage
+from .uploads import SpooledUpload, UploadError, receive_upload
 
+# multipart 边界和表单头的额外字节，超过后由 Litestar 按 Content-Length 直接拒绝
+UPLOAD_BODY_OVERHEAD = 64 * 1024
 
-def compress_image_to_webp(file_content: bytes, quality: int = 80) -> bytes:
-    """将图片压缩为 WebP 格式"""
-    with Image.open(BytesIO(file_content)) as img:
-        # 处理 RGBA 模式（PNG 透明背景）
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGBA")
-        else:
-            img = img.convert("RGB")
-
-        # 保存为 WebP
-        output = BytesIO()
-        img.save(output, format="WEBP", quality=quality, optimize=True)
-        return output.getvalue()
+# 权限定义
+stats_permission = PermissionGuard("media:view_stats", "查看图片处理队列")
 
 
 class UploadController(Controller):
     path = "/upload"
     tags = ["Upload (文件上传)"]
 
-    @post()
+    @post(request_max_body_size=config.upload_max_size + UPLOAD_BODY_OVERHEAD)
     async def upload(
         self,
+        request: Request,
         db_session: AsyncSession,
-        data: UploadFile = Body(media_type=RequestEncodingType.MULTI_PART),
-        upload_token: str = Body(),
+        upload_token: str,
     ) -> UploadSchema:
-        """上传文件到 OSS"""
+        """上传文件到存储后端（multipart 字段 data）"""
         # 验证 upload_token
         if not upload_token:
             raise HTTPException(status_code=400, detail="upload_token is required")
 
-        # 验证文件扩展名
-        ext = Path(data.filename or "").suffix.lower()
-        if ext not in config.upload_allowed_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail=f"不支持的文件类型: {ext}，允许: {', '.join(config.upload_allowed_extensions)}",
-            )
-
-        # 读取文件内容
-        file_content = await data.read()
+        try:
+            async with receive_upload(
+                request,
+                field="data",
+                max_size=config.upload_max_size,
+                allowed_extensions=config.upload_allowed_extensions,
+            ) as upload:
+                return await self._save_upload(db_session, upload, upload_token)
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    async def _save_upload(
+        self, db_session: AsyncSession, upload: SpooledUpload, upload_token: str
+    ) -> UploadSchema:
+        content_hash = upload.content_hash
 
-        # 验证文件大小（压缩前）
-        if len(file_content) > config.upload_max_size:
-            max_mb = config.upload_max_size / (1024 * 1024)
-            raise HTTPException(
-                status_code=400, detail=f"文件大小超过限制 ({max_mb:.0f}MB)"
-            )
+        # 按内容去重：相同图片直接复用已生成的文件
+        existing = await self._find(db_session, content_hash)
+        if existing is not None:
+            return await self._reuse(db_session, existing, upload_token)
 
-        # 压缩图片为 WebP 格式
+        # 生成 WebP 原图和各宽度变体（在进程池中按路径读取临时文件）
         try:
-            file_content = compress_image_to_webp(
-                file_content, quality=config.upload_webp_quality
+            variants = await pipeline.variants(
+                str(upload.path),
+                widths=config.media_image_widths,
+                quality=config.upload_webp_quality,
+                avif=config.media_avif,
+                max_pixels=config.upload_max_pixels,
+            )
+        except PipelineBusy:
+            raise HTTPException(
+                status_code=HTTP_503_SERVICE_UNAVAILABLE,
+                detail="图片处理繁忙，请稍后重试",
+                headers={"Retry-After": "5"},
             )
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"图片处理失败: {e}")
 
-        # OSS 配置
-        bucket_name = config.oss_bucket
-        auth = oss2.Auth(config.oss_access_key, config.oss_secret_key)
-        bucket = oss2.Bucket(auth, config.oss_endpoint, bucket_name)
-
-        s3_key = f"images/{uuid7().hex}.webp"  # 统一使用 .webp 扩展名
-
-        # 上传到 OSS
+        # 以内容哈希作为目录：images/{hash}/full.webp, images/{hash}/w640.webp ...
+        prefix = f"images/{content_hash}"
         try:
-            bucket.put_object(s3_key, file_content)
-        except oss2.exceptions.OssError as e:
-            raise HTTPException(status_code=500, detail=f"上传失败: {e.message}")
-
-        # 返回访问 URL
-        # 解析 endpoint 获取 host，拼接 bucket 和路径
-        endpoint_url = URL(config.oss_endpoint)
-        url = str(
-            URL.build(
-                scheme="https",
-                host=f"{bucket_name}.{endpoint_url.host}",
-                path=f"/{s3_key}",
+            await asyncio.gather(
+                *(
+                    storage.save(f"{prefix}/{variant.name}", variant.content)
+                    for variant in variants
+                )
             )
-        )
+        except StorageError as e:
+            raise HTTPException(status_code=500, detail=f"上传失败: {e}")
+
+        full = variants[0]
+        s3_key = f"{prefix}/{full.name}"
+        url = storage.url(s3_key)
 
         # 写入数据库
         db_session.add(
             File(
                 url=url,
                 s3_key=s3_key,
-                original_name=data.filename or "unknown",
-                size=len(file_content),
+                original_name=upload.filename,
+                size=len(full.content),
                 upload_token=upload_token,
+                content_hash=content_hash,
+                variants=[
+                    {
+                        "key": f"{prefix}/{variant.name}",
+                        "width": variant.width,
+                        "height": variant.height,
+                        "format": variant.format,
+                        "size": len(variant.content),
+                    }
+                    for variant in variants[1:]
+                ],
             )
         )
-        await db_session.commit()
+        try:
+            await db_session.commit()
+        except IntegrityError:
+            # 相同内容的并发上传先写入了记录（s3_key 唯一），复用那一条
+            await db_session.rollback()
+            existing = await self._find(db_session, content_hash)
+            if existing is None:
+                raise
+            return await self._reuse(db_session, existing, upload_token)
 
         return UploadSchema(url=url)
+
+    @staticmethod
+    async def _find(db_session: AsyncSession, content_hash: str) -> File | None:
+        return await db_session.scalar(
+            select(File).where(File.content_hash == content_hash).limit(1)
+        )
+
+    @staticmethod
+    async def _reuse(
+        db_session: AsyncSession, existing: File, upload_token: str
+    ) -> UploadSchema:
+        if not existing.is_used and existing.upload_token != upload_token:
+            # 文件被多个编辑会话引用，不再归属某一个会话，标记为已使用，不参与清理
+            existing.is_used = True
+            await db_session.commit()
+        return UploadSchema(url=existing.url)
+
+    @get("/stats", guards=[stats_permission])
+    async def stats(self) -> PipelineStats:
+        """图片处理队列状态"""
+        return pipeline.stats()
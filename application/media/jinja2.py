@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import select
+
+from application.config import template
+from application.web.jinja2 import get_session_by_request
+
+from .models import File
+
+# 上传生成的原尺寸图片：.../images/{sha256}/full.webp
+VARIANT_URL_RE = re.compile(
+    r"^(?P<base>.*/images/(?P<hash>[0-9a-f]{64}))/full\.(?:webp|avif)$"
+)
+
+# 内容哈希 -> 已生成的变体 [(文件名, 格式, 实际宽度)]；同一内容的变体生成后不再变化
+VARIANTS_CACHE_SIZE = 4096
+_variants: OrderedDict[str, tuple[tuple[str, str, int], ...]] = OrderedDict()
+
+
+async def _load_variants(
+    ctx: Any, content_hash: str
+) -> tuple[tuple[str, str, int], ...] | None:
+    if (cached := _variants.get(content_hash)) is not None:
+        _variants.move_to_end(content_hash)
+        return cached
+
+    session = get_session_by_request(ctx)
+    recorded = await session.scalar(
+        select(File.variants).where(File.content_hash == content_hash).limit(1)
+    )
+    if recorded is None:
+        return None
+    variants = tuple(
+        (item["key"].rsplit("/", 1)[-1], item["format"], item["width"])
+        for item in recorded
+    )
+    _variants[content_hash] = variants
+    if len(_variants) > VARIANTS_CACHE_SIZE:
+        _variants.popitem(last=False)
+    return variants
+
+
+@template.global_function(use_context=True)
+async def srcset(ctx: Any, url: str | None, fmt: str = "webp") -> str:
+    """
+    生成图片的 srcset
+
+    按上传时记录的变体（`File.variants`）生成，宽度取变体的实际宽度：
+    修改 `media_image_widths` 不影响已上传的图片，不小于原图的宽度只保留一项。
+    不是上传生成的图片（外链、旧数据）返回空字符串。
+
+    用法:
+        <img src="{{ url }}" srcset="{{ srcset(url) }}" sizes="(min-width: 768px) 33vw, 100vw">
+        <source type="image/avif" srcset="{{ srcset(url, 'avif') }}">
+    """
+    match = VARIANT_URL_RE.match(url or "")
+    if match is None:
+        return ""
+    variants = await _load_variants(ctx, match.group("hash"))
+    if not variants:
+        return ""
+
+    base = match.group("base")
+    entries: dict[int, str] = {}
+    for name, variant_format, width in variants:
+        if variant_format == fmt:
+            entries.setdefault(width, f"{base}/{name} {width}w")
+    return ", ".join(entries[width] for width in sorted(entries))
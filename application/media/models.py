@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from enum import StrEnum
 
+from typing import Any
+
 from advanced_alchemy.base import UUIDv7AuditBase
+from advanced_alchemy.types import JsonB
 from sqlalchemy import Boolean, Integer, String, update
 from sqlalchemy import Enum as SaEnum
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -56,6 +59,12 @@ class File(UUIDv7AuditBase):
     # 上传令牌，发布时通过此 token 批量标记已使用
     upload_token: Mapped[str | None] = mapped_column(String(36), index=True)
 
+    # 原文件内容的 SHA-256，相同内容重复上传时直接复用
+    content_hash: Mapped[str | None] = mapped_column(String(64), index=True)
+
+    # 尺寸变体：[{"key", "width", "height", "format", "size"}, ...]
+    variants: Mapped[list[dict[str, Any]]] = mapped_column(JsonB, default=list)
+
     def __repr__(self) -> str:
         return f"<File s3_key='{self.s3_key}' file_type='{self.file_type}' is_used={self.is_used}>"
 
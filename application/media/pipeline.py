@@ -0,0 +1,173 @@
+"""图片处理流水线
+
+Pillow 解码/缩放/编码是 CPU 密集操作，放在有上限的进程池中执行，不占用事件循环和 GIL。
+同时处理的任务数受 worker 数限制；排队任务超过上限时直接拒绝（503），
+由前端稍后重试，避免批量上传拖慢同一 worker 上的前台请求。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any
+
+from PIL import Image
+
+from application.config import config
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+    output = BytesIO()
+    if fmt == "AVIF":
+        img.save(output, format=fmt, quality=quality)
+    else:
+        img.save(output, format=fmt, quality=quality, optimize=True)
+    return output.getvalue()
+
+
+@dataclass(frozen=True, slots=True)
+class ImageVariant:
+    name: str  # 存储文件名，如 full.webp / w640.avif
+    width: int
+    height: int
+    format: str
+    content: bytes
+
+
+class ImageTooLarge(ValueError):
+    """图片像素数超过限制"""
+
+
+def render_variants(
+    path: str,
+    widths: tuple[int, ...],
+    quality: int = 80,
+    avif: bool = False,
+    max_pixels: int | None = None,
+) -> list[ImageVariant]:
+    """
+    读取 path 处的图片，生成原尺寸 WebP 和各宽度的缩略图（可选 AVIF）
+
+    宽度不小于原图时不放大，直接复用原尺寸的编码结果，变体记录的是实际宽度。
+    解码前按文件头中的尺寸检查 max_pixels，解码后的内存占用有上限。
+    """
+    with Image.open(path) as img:
+        if max_pixels is not None and img.width * img.height > max_pixels:
+            raise ImageTooLarge(f"图片尺寸过大 ({img.width}x{img.height})")
+        img = img.convert("RGBA" if img.mode in ("RGBA", "P") else "RGB")
+        formats = [("WEBP", "webp")] + ([("AVIF", "avif")] if avif else [])
+
+        variants = []
+        for fmt, ext in formats:
+            full = _encode(img, fmt, quality)
+            variants.append(
+                ImageVariant(f"full.{ext}", img.width, img.height, ext, full)
+            )
+            for width in widths:
+                if width >= img.width:
+                    size, content = img.size, full
+                else:
+                    resized = img.resize(
+                        (width, max(1, round(img.height * width / img.width))),
+                        Image.Resampling.LANCZOS,
+                    )
+                    size, content = resized.size, _encode(resized, fmt, quality)
+                variants.append(ImageVariant(f"w{width}.{ext}", *size, ext, content))
+        return variants
+
+
+class PipelineBusy(Exception):
+    """排队任务已满"""
+
+
+@dataclass(frozen=True, slots=True)
+class PipelineStats:
+    workers: int
+    max_pending: int
+    running: int
+    queued: int
+    processed: int
+    rejected: int
+
+
+class ImagePipeline:
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self._running = 0
+        self._queued = 0
+        self._processed = 0
+        self._rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """等待进程池空闲的任务数"""
+        return self._queued
+
+    def stats(self) -> PipelineStats:
+        return PipelineStats(
+            workers=self.workers,
+            max_pending=self.max_pending,
+            running=self._running,
+            queued=self._queued,
+            processed=self._processed,
+            rejected=self._rejected,
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn：不继承事件循环线程和数据库连接
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def variants(
+        self,
+        path: str,
+        widths: tuple[int, ...],
+        quality: int,
+        avif: bool,
+        max_pixels: int | None = None,
+    ) -> list[ImageVariant]:
+        return await self.run(render_variants, path, widths, quality, avif, max_pixels)
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:
+        """在进程池中执行 fn，fn 和参数都必须可以 pickle"""
+        if self._queued >= self.max_pending:
+            self._rejected += 1
+            raise PipelineBusy
+
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), fn, *args)
+            self._processed += 1
+            return result
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pipeline = ImagePipeline(
+    workers=config.media_workers,
+    max_pending=config.media_max_pending,
+)
@@ -0,0 +1,117 @@
+"""文件存储后端
+
+上传流程只依赖 `Storage` 接口：
+- `OSSStorage`：阿里云 OSS，oss2 是同步客户端，放到线程池执行，不阻塞事件循环
+- `LocalStorage`：保存到 public/uploads，由静态文件路由提供访问，用于开发和测试
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from functools import cached_property
+from pathlib import Path
+
+import anyio
+import oss2
+from anyio.to_thread import run_sync
+from yarl import URL
+
+from application.config import config
+
+
+class StorageError(Exception):
+    """存储操作失败"""
+
+
+class Storage(ABC):
+    @abstractmethod
+    async def save(self, key: str, content: bytes) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def url(self, key: str) -> str: ...
+
+
+class OSSStorage(Storage):
+    def __init__(
+        self,
+        access_key: str,
+        secret_key: str,
+        endpoint: str,
+        bucket: str,
+        max_threads: int,
+    ) -> None:
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.endpoint = endpoint
+        self.bucket_name = bucket
+        # 限制同时占用的线程数，批量上传时不挤占其他同步调用
+        self.limiter = anyio.CapacityLimiter(max_threads)
+
+    @cached_property
+    def bucket(self) -> oss2.Bucket:
+        auth = oss2.Auth(self.access_key, self.secret_key)
+        return oss2.Bucket(auth, self.endpoint, self.bucket_name)
+
+    async def save(self, key: str, content: bytes) -> None:
+        try:
+            await run_sync(self.bucket.put_object, key, content, limiter=self.limiter)
+        except oss2.exceptions.OssError as e:
+            raise StorageError(e.message) from e
+
+    async def delete(self, key: str) -> None:
+        try:
+            await run_sync(self.bucket.delete_object, key, limiter=self.limiter)
+        except oss2.exceptions.OssError as e:
+            raise StorageError(e.message) from e
+
+    def url(self, key: str) -> str:
+        # 解析 endpoint 获取 host，拼接 bucket 和路径
+        endpoint_url = URL(self.endpoint)
+        return str(
+            URL.build(
+                scheme="https",
+                host=f"{self.bucket_name}.{endpoint_url.host}",
+                path=f"/{key}",
+            )
+        )
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: Path, base_url: str) -> None:
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise StorageError(f"非法的存储路径: {key}")
+        return path
+
+    async def save(self, key: str, content: bytes) -> None:
+        path = anyio.Path(self._path(key))
+        await path.parent.mkdir(parents=True, exist_ok=True)
+        await path.write_bytes(content)
+
+    async def delete(self, key: str) -> None:
+        await anyio.Path(self._path(key)).unlink(missing_ok=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+def create_storage() -> Storage:
+    if config.media_storage == "local":
+        return LocalStorage(root=config.upload_dir, base_url=config.media_local_url)
+    return OSSStorage(
+        access_key=config.oss_access_key,
+        secret_key=config.oss_secret_key,
+        endpoint=config.oss_endpoint,
+        bucket=config.oss_bucket,
+        max_threads=config.media_io_threads,
+    )
+
+
+storage = create_storage()
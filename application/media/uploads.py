@@ -0,0 +1,182 @@
+"""流式接收上传文件
+
+不使用 Litestar 的表单解析（会先把整个文件读进 UploadFile 再交给处理函数），
+直接按块解析 multipart 请求体：
+- 第一个分块到达时按文件头识别图片类型，不是图片立即拒绝
+- 边接收边写入临时文件并计算哈希，超过大小限制立即中止
+- 图片处理进程按路径读取临时文件，事件循环进程内不保留完整文件内容
+
+每个并发上传在内存中只保留一个分块，峰值内存与文件大小无关。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import anyio
+from litestar import Request
+from multipart import (
+    MultipartSegment,
+    ParserError,
+    PushMultipartParser,
+    parse_options_header,
+)
+
+# 识别类型所需的最少字节数
+SNIFF_SIZE = 12
+
+# 文件头 -> 图片类型
+SIGNATURES: tuple[tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+
+class UploadError(Exception):
+    """上传内容不合法"""
+
+    status_code = 400
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(detail)
+        self.detail = detail
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+def sniff_image(head: bytes) -> str | None:
+    """按文件头识别图片类型，无法识别返回 None"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for signature, kind in SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class SpooledUpload:
+    path: Path
+    filename: str
+    size: int
+    content_hash: str
+    kind: str
+
+
+@asynccontextmanager
+async def receive_upload(
+    request: Request,
+    field: str,
+    max_size: int,
+    allowed_extensions: set[str],
+) -> AsyncIterator[SpooledUpload]:
+    """
+    接收 multipart 请求中名为 field 的文件，写入临时文件
+
+    离开上下文时删除临时文件。
+    """
+    _, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get("boundary")
+    if not boundary:
+        raise UploadError("请求不是 multipart/form-data")
+
+    fd, name = tempfile.mkstemp(prefix="upload-")
+    os.close(fd)
+    path = Path(name)
+    try:
+        upload = await _spool(
+            request, boundary, field, path, max_size, allowed_extensions
+        )
+        yield upload
+    finally:
+        path.unlink(missing_ok=True)
+
+
+async def _spool(
+    request: Request,
+    boundary: str,
+    field: str,
+    path: Path,
+    max_size: int,
+    allowed_extensions: set[str],
+) -> SpooledUpload:
+    digest = hashlib.sha256()
+    filename = ""
+    kind: str | None = None
+    size = 0
+    head = b""
+    receiving = False
+    received = False
+
+    async with await anyio.open_file(path, "wb") as output:
+
+        async def write(chunk: bytes) -> None:
+            nonlocal size
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge(
+                    f"文件大小超过限制 ({max_size / (1024 * 1024):.0f}MB)"
+                )
+            digest.update(chunk)
+            await output.write(chunk)
+
+        try:
+            with PushMultipartParser(boundary) as parser:
+                async for chunk in request.stream():
+                    for event in parser.parse(chunk):
+                        if isinstance(event, MultipartSegment):
+                            # 只接收第一个匹配的文件，其余分段忽略
+                            receiving = (
+                                not received
+                                and event.name == field
+                                and bool(event.filename)
+                            )
+                            if receiving:
+                                filename = event.filename or ""
+                                ext = Path(filename).suffix.lower()
+                                if ext not in allowed_extensions:
+                                    raise UploadError(
+                                        f"不支持的文件类型: {ext}，允许: {', '.join(allowed_extensions)}"
+                                    )
+                        elif event is None:
+                            # 分段结束
+                            received = received or receiving
+                            receiving = False
+                        elif receiving:
+                            if kind is None:
+                                # 凑够文件头后识别类型，再开始写入
+                                head += event
+                                if len(head) < SNIFF_SIZE:
+                                    continue
+                                kind = sniff_image(head)
+                                if kind is None:
+                                    raise UploadError("文件内容不是支持的图片格式")
+                                event, head = head, b""
+                            await write(event)
+        except ParserError as e:
+            raise UploadError("上传数据格式错误") from e
+
+        if kind is None and head:
+            # 文件小于识别所需的字节数
+            raise UploadError("文件内容不是支持的图片格式")
+
+    if not received or kind is None:
+        raise UploadError("缺少上传文件")
+
+    return SpooledUpload(
+        path=path,
+        filename=filename,
+        size=size,
+        content_hash=digest.hexdigest(),
+        kind=kind,
+    )
@@ -47,3 +47,12 @@ route_handlers = [
         path=config.assets_url, directories=[config.assets_dir], name="assets"
     ),
 ]
+
+if config.media_storage == "local":
+    route_handlers.append(
+        create_static_files_router(
+            path=config.media_local_url,
+            directories=[config.upload_dir],
+            name="uploads",
+        )
+    )
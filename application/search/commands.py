@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import anyio
+import click
+
+from application.config import config
+
+from .index import search_index
+
+
+@click.group(
+    name="search",
+    invoke_without_command=False,
+    help="Manage the search index.",
+)
+def search_management() -> None:
+    """Manage the search index."""
+
+
+@search_management.command(name="rebuild", help="重新建立全部文章的搜索索引")
+def rebuild() -> None:
+    async def _rebuild() -> int:
+        await search_index.create_table()
+        async with config.plugins.sqlalchemy.get_session() as db_session:
+            if not search_index.available(db_session):
+                raise click.ClickException("当前数据库不支持全文索引")
+            count = await search_index.rebuild(db_session)
+            await db_session.commit()
+            return count
+
+    count = anyio.run(_rebuild)
+    click.echo(f"搜索索引已重建，共 {count} 篇文章")
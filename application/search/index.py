@@ -0,0 +1,261 @@
+"""内容全文索引
+
+SQLite 使用 FTS5 虚拟表，PostgreSQL 使用带 GIN 索引的 tsvector 列，
+两者都保存 `text` 模块处理后的标题、摘要+正文、标题拼音。
+
+文章增删改时由 `ArticleService` 在同一个事务内更新索引；索引写入失败只记录日志，
+不影响文章保存，可以用 `litestar search rebuild` 重建。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+
+from application.articles.models import Article, PublishStatus
+from application.config import config
+
+from .text import Term, parse_query, pinyin, segment, strip_html
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+TABLE = "search_contents"
+# 正文只索引前面这部分
+MAX_BODY = 20000
+REBUILD_BATCH = 500
+
+SQLITE_DDL = (
+    (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+        "content_id UNINDEXED, published UNINDEXED, title, body, pinyin, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    ),
+)
+
+POSTGRES_DDL = (
+    (
+        f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+        "content_id UUID PRIMARY KEY, "
+        "published BOOLEAN NOT NULL, "
+        "title TEXT NOT NULL, "
+        "body TEXT NOT NULL, "
+        "pinyin TEXT NOT NULL, "
+        "document TSVECTOR GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', title), 'A') || "
+        "setweight(to_tsvector('simple', pinyin), 'B') || "
+        "setweight(to_tsvector('simple', body), 'C')) STORED)"
+    ),
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_document ON {TABLE} USING GIN (document)",
+)
+
+
+def _rowid(content_id: UUID) -> int:
+    # FTS5 按 rowid 删除最快，用内容 ID 的哈希作为 rowid
+    digest = hashlib.blake2b(content_id.bytes, digest_size=8).digest()
+    return int.from_bytes(digest) & 0x7FFF_FFFF_FFFF_FFFF
+
+
+def _document(article: Article) -> dict[str, Any]:
+    body = " ".join(filter(None, (article.description, strip_html(article.text or ""))))
+    return {
+        "content_id": article.id,
+        "published": article.status == PublishStatus.PUBLISHED,
+        "title": segment(article.title),
+        "body": segment(body[:MAX_BODY]),
+        "pinyin": pinyin(article.title),
+    }
+
+
+def _sqlite_query(terms: Sequence[Term]) -> str:
+    # 词只包含字母、数字和汉字，不需要转义
+    parts = []
+    for term in terms:
+        phrase = '"' + " ".join(term.tokens) + '"'
+        parts.append(phrase + "*" if term.prefix else phrase)
+    return " ".join(parts)
+
+
+def _postgres_query(terms: Sequence[Term]) -> str:
+    parts = []
+    for term in terms:
+        if term.prefix:
+            parts.append(f"{term.tokens[0]}:*")
+        else:
+            parts.append("(" + " <-> ".join(term.tokens) + ")")
+    return " & ".join(parts)
+
+
+DIALECTS = ("sqlite", "postgresql")
+
+
+class SearchIndex:
+    @staticmethod
+    def _dialect(session: AsyncSession) -> str:
+        return session.get_bind().dialect.name
+
+    def available(self, session: AsyncSession) -> bool:
+        """当前数据库是否支持全文索引，不支持时由调用方回退到 LIKE 查询"""
+        return self._dialect(session) in DIALECTS
+
+    async def create_table(self) -> None:
+        """启动时建表；索引表不在 ORM 模型中，已存在时跳过"""
+        engine = config.plugins.sqlalchemy.get_engine()
+        dialect = engine.dialect.name
+        if dialect not in DIALECTS:
+            return
+        statements = SQLITE_DDL if dialect == "sqlite" else POSTGRES_DDL
+        try:
+            async with engine.begin() as conn:
+                for statement in statements:
+                    await conn.execute(sa.text(statement))
+        except SQLAlchemyError:
+            # 多个 worker 同时启动时可能并发建表
+            logger.exception("创建搜索索引表失败")
+
+    async def index(self, session: AsyncSession, articles: Iterable[Article]) -> None:
+        """写入或更新文章的索引"""
+        documents = [_document(article) for article in articles]
+        if documents:
+            await self._write(session, documents, [d["content_id"] for d in documents])
+
+    async def remove(self, session: AsyncSession, content_ids: Iterable[UUID]) -> None:
+        ids = list(content_ids)
+        if ids:
+            await self._write(session, [], ids)
+
+    async def _write(
+        self,
+        session: AsyncSession,
+        documents: list[dict[str, Any]],
+        removed: list[UUID],
+    ) -> None:
+        dialect = self._dialect(session)
+        if dialect not in DIALECTS:
+            return
+        try:
+            # 放在 SAVEPOINT 中，失败时只回滚索引的修改
+            async with session.begin_nested():
+                if dialect == "sqlite":
+                    await self._write_sqlite(session, documents, removed)
+                else:
+                    await self._write_postgres(session, documents, removed)
+        except SQLAlchemyError:
+            logger.exception("更新搜索索引失败")
+
+    async def _write_sqlite(
+        self,
+        session: AsyncSession,
+        documents: list[dict[str, Any]],
+        removed: list[UUID],
+    ) -> None:
+        await session.execute(
+            sa.text(f"DELETE FROM {TABLE} WHERE rowid = :rowid"),
+            [{"rowid": _rowid(i)} for i in removed],
+        )
+        if documents:
+            await session.execute(
+                sa.text(
+                    f"INSERT INTO {TABLE} "
+                    "(rowid, content_id, published, title, body, pinyin) VALUES "
+                    "(:rowid, :content_id, :published, :title, :body, :pinyin)"
+                ),
+                [
+                    {
+                        **d,
+                        "rowid": _rowid(d["content_id"]),
+                        "content_id": str(d["content_id"]),
+                    }
+                    for d in documents
+                ],
+            )
+
+    async def _write_postgres(
+        self,
+        session: AsyncSession,
+        documents: list[dict[str, Any]],
+        removed: list[UUID],
+    ) -> None:
+        if not documents:
+            await session.execute(
+                sa.text(f"DELETE FROM {TABLE} WHERE content_id = ANY(:ids)"),
+                {"ids": removed},
+            )
+            return
+        await session.execute(
+            sa.text(
+                f"INSERT INTO {TABLE} (content_id, published, title, body, pinyin) "
+                "VALUES (:content_id, :published, :title, :body, :pinyin) "
+                "ON CONFLICT (content_id) DO UPDATE SET "
+                "published = excluded.published, title = excluded.title, "
+                "body = excluded.body, pinyin = excluded.pinyin"
+            ),
+            documents,
+        )
+
+    async def search(
+        self,
+        session: AsyncSession,
+        query: str,
+        *,
+        limit: int,
+        offset: int = 0,
+        published: bool = True,
+    ) -> tuple[list[UUID], int]:
+        """按相关度排序的内容 ID 和命中总数"""
+        terms = parse_query(query)
+        if not terms:
+            return [], 0
+
+        if self._dialect(session) == "sqlite":
+            match = f"{TABLE} MATCH :query"
+            rank = f"bm25({TABLE}, 0, 0, 10.0, 1.0, 5.0)"
+            params: dict[str, Any] = {"query": _sqlite_query(terms)}
+            where = f"{match} AND published = 1" if published else match
+        else:
+            match = "document @@ to_tsquery('simple', :query)"
+            rank = "-ts_rank(document, to_tsquery('simple', :query))"
+            params = {"query": _postgres_query(terms)}
+            where = f"{match} AND published" if published else match
+
+        total = await session.scalar(
+            sa.text(f"SELECT count(*) FROM {TABLE} WHERE {where}"), params
+        )
+        if not total:
+            return [], 0
+        rows = await session.execute(
+            sa.text(
+                f"SELECT content_id FROM {TABLE} WHERE {where} "
+                f"ORDER BY {rank} LIMIT :limit OFFSET :offset"
+            ),
+            {**params, "limit": limit, "offset": offset},
+        )
+        return [UUID(str(content_id)) for (content_id,) in rows], total
+
+    async def rebuild(self, session: AsyncSession) -> int:
+        """清空并重新索引全部文章，返回索引的文章数"""
+        await session.execute(sa.text(f"DELETE FROM {TABLE}"))
+        count = 0
+        last_id = None
+        while True:
+            stmt = sa.select(Article).order_by(Article.id).limit(REBUILD_BATCH)
+            if last_id is not None:
+                stmt = stmt.where(Article.id > last_id)
+            articles = (await session.scalars(stmt)).all()
+            if not articles:
+                return count
+            await self.index(session, articles)
+            count += len(articles)
+            last_id = articles[-1].id
+            session.expunge_all()
+
+
+search_index = SearchIndex()
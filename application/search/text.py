@@ -0,0 +1,76 @@
+"""搜索文本处理
+
+数据库自带的分词器不能切分中文，建索引前先处理：
+- 中文按字切分，查询时按相邻字的短语匹配
+- 英文、数字按词切分并转小写
+- 标题额外生成拼音：每个字的全拼、相邻两字的全拼和首字母、整段的全拼和首字母，
+  查询时按前缀匹配，"beijing"、"bj"、"beij" 都能找到“北京”
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from dataclasses import dataclass
+from itertools import pairwise
+
+from pypinyin import lazy_pinyin
+
+CJK = r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+CJK_RE = re.compile(f"[{CJK}]+")
+WORD_RE = re.compile(f"[{CJK}]+|[0-9A-Za-z]+")
+TAG_RE = re.compile(r"<[^>]+>")
+
+# 整段拼音最多取的字数，避免长句生成过长的词
+MAX_RUN = 12
+# 查询最多使用的词数
+MAX_TERMS = 8
+
+
+def strip_html(text: str) -> str:
+    return html.unescape(TAG_RE.sub(" ", text))
+
+
+def segment(text: str) -> str:
+    """切分成空格分隔的词：中文按字，其他按词"""
+    tokens: list[str] = []
+    for match in WORD_RE.finditer(text):
+        word = match.group()
+        if CJK_RE.fullmatch(word):
+            tokens.extend(word)
+        else:
+            tokens.append(word.lower())
+    return " ".join(tokens)
+
+
+def pinyin(text: str) -> str:
+    """中文部分的拼音词"""
+    tokens: dict[str, None] = {}
+    for run in CJK_RE.findall(text):
+        syllables = lazy_pinyin(run)
+        tokens.update(dict.fromkeys(syllables))
+        tokens.update(dict.fromkeys(a + b for a, b in pairwise(syllables)))
+        tokens.update(dict.fromkeys(a[0] + b[0] for a, b in pairwise(syllables)))
+        head = syllables[:MAX_RUN]
+        tokens["".join(head)] = None
+        tokens["".join(s[0] for s in head)] = None
+    return " ".join(tokens)
+
+
+@dataclass(frozen=True, slots=True)
+class Term:
+    """查询中的一个词：中文为按字切分的短语，其他为前缀"""
+
+    tokens: tuple[str, ...]
+    prefix: bool
+
+
+def parse_query(query: str) -> list[Term]:
+    terms: list[Term] = []
+    for match in WORD_RE.finditer(query):
+        word = match.group()
+        if CJK_RE.fullmatch(word):
+            terms.append(Term(tokens=tuple(word), prefix=False))
+        else:
+            terms.append(Term(tokens=(word.lower(),), prefix=True))
+    return terms[:MAX_TERMS]
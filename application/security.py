@@ -8,15 +8,14 @@ from litestar.connection import ASGIConnection, Request
 from litestar.di import Provide
 from litestar.exceptions import NotAuthorizedException
 from litestar.middleware.authentication import AuthenticationResult
-from litestar.middleware.session.server_side import (
-    ServerSideSessionBackend,
-    ServerSideSessionConfig,
-)
+from litestar.middleware.session.base import BaseSessionBackend
 from litestar.plugins.base import CLIPlugin, InitPluginProtocol
 from litestar.security.session_auth import SessionAuth
 from litestar.security.session_auth.middleware import SessionAuthMiddleware
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from application.accounts.models import User
+from application.accounts.principals import Principal, principals
 from application.accounts.services import UserService
 from application.config import config
 
@@ -39,28 +38,35 @@ class SecurityPlugin(InitPluginProtocol, CLIPlugin):
         return app_config
 
     @staticmethod
-    async def provide_user(request: Request[User, Any, Any]) -> User | None:
-        return cast(User, request.user)
+    async def provide_user(
+        request: Request[Principal, Any, Any], db_session: AsyncSession
+    ) -> User | None:
+        """需要完整 User 对象的处理函数通过依赖注入获取"""
+        principal = cast(Principal | None, request.user)
+        if principal is None:
+            return None
+        return await UserService(session=db_session).get_one_or_none(id=principal.id)
 
     async def retrieve_session_user_handler(
         self, session: dict[str, Any], connection: ASGIConnection
-    ) -> User | None:
+    ) -> Principal | None:
         user_id = session.get(USER_SESSION_KEY)
+        if user_id is None:
+            return None
 
         db_session = config.plugins.sqlalchemy.provide_session(
             connection.app.state, connection.scope
         )
-        service = UserService(session=db_session)
-        user = await service.get_one_or_none(id=user_id)
-        return user if user and user.is_active else None
+        principal = await principals.get(db_session, user_id)
+        return principal if principal and principal.is_active else None
 
     @cached_property
     def session_backend(self):
         return SessionAuth[
-            User, ServerSideSessionBackend
+            Principal, BaseSessionBackend
         ](
             retrieve_user_handler=self.retrieve_session_user_handler,
-            session_backend_config=ServerSideSessionConfig(),
+            session_backend_config=config.plugins.session,
             authentication_middleware_class=CustomSessionAuthMiddleware,  # 👈 使用自定义中间件
             # exclude=[r"^(?!.*\/api).*$"],
             exclude="^/(?!api/).+$",
@@ -0,0 +1,19 @@
+from .database import DatabaseStore
+from .memory import LRUMemoryStore, MemoryStats
+from .models import StoreEntry
+from .sessions import SessionBackend, SessionConfig
+from .shared import SharedMemoryStore, SharedStats
+from .tiered import TieredStats, TieredStore
+
+__all__ = [
+    "DatabaseStore",
+    "LRUMemoryStore",
+    "MemoryStats",
+    "SessionBackend",
+    "SessionConfig",
+    "SharedMemoryStore",
+    "SharedStats",
+    "StoreEntry",
+    "TieredStats",
+    "TieredStore",
+]
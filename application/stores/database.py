@@ -0,0 +1,176 @@
+"""数据库键值存储
+
+多个 worker 共享同一份数据（session 等），使用应用本身的数据库，不需要额外部署 Redis。
+SQLite 和 PostgreSQL 使用 upsert 写入，其他数据库先删后插。
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+import sqlalchemy as sa
+from litestar.stores.base import NamespacedStore
+
+from application.config.sqlalchemy import READ_ONLY
+
+from .models import StoreEntry
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# 每写入多少次顺带清理一次过期数据
+CLEANUP_EVERY = 1000
+
+
+def _expires_at(expires_in: int | timedelta | None) -> float | None:
+    if expires_in is None:
+        return None
+    if isinstance(expires_in, timedelta):
+        expires_in = int(expires_in.total_seconds())
+    return time.time() + expires_in
+
+
+class DatabaseStore(NamespacedStore):
+    __slots__ = ("_ready", "_writes", "engine", "namespace")
+
+    def __init__(
+        self, engine: AsyncEngine, namespace: str = "", create_table: bool = False
+    ) -> None:
+        self.engine = engine
+        self.namespace = namespace
+        self._writes = 0
+        # 独立库文件没有迁移，第一次使用时建表
+        self._ready = not create_table
+
+    def with_namespace(self, namespace: str) -> DatabaseStore:
+        if self.namespace:
+            namespace = f"{self.namespace}_{namespace}"
+        store = DatabaseStore(self.engine, namespace)
+        store._ready = self._ready
+        return store
+
+    async def _ensure_table(self) -> None:
+        if not self._ready:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(StoreEntry.__table__.create, checkfirst=True)
+            self._ready = True
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[AsyncConnection]:
+        await self._ensure_table()
+        async with self.engine.begin() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def _read(self) -> AsyncIterator[AsyncConnection]:
+        """只读查询不开启写事务，SQLite 下不与写入争抢写锁"""
+        await self._ensure_table()
+        async with self.engine.connect() as conn:
+            yield await conn.execution_options(**{READ_ONLY: True})
+
+    def _where(self, key: str) -> tuple[sa.ColumnElement[bool], ...]:
+        table = StoreEntry.__table__
+        return (table.c.namespace == self.namespace, table.c.key == key)
+
+    def _not_expired(self) -> sa.ColumnElement[bool]:
+        table = StoreEntry.__table__
+        return sa.or_(table.c.expires_at.is_(None), table.c.expires_at > time.time())
+
+    async def set(
+        self, key: str, value: str | bytes, expires_in: int | timedelta | None = None
+    ) -> None:
+        if isinstance(value, str):
+            value = value.encode()
+        table = StoreEntry.__table__
+        row = {
+            "namespace": self.namespace,
+            "key": key,
+            "value": value,
+            "expires_at": _expires_at(expires_in),
+        }
+        dialect = self.engine.dialect.name
+        async with self._transaction() as conn:
+            if dialect in ("sqlite", "postgresql"):
+                if dialect == "sqlite":
+                    from sqlalchemy.dialects.sqlite import insert
+                else:
+                    from sqlalchemy.dialects.postgresql import insert
+                stmt = insert(table).values(row)
+                await conn.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[table.c.namespace, table.c.key],
+                        set_={
+                            "value": stmt.excluded.value,
+                            "expires_at": stmt.excluded.expires_at,
+                        },
+                    )
+                )
+            else:
+                await conn.execute(sa.delete(table).where(*self._where(key)))
+                await conn.execute(sa.insert(table).values(row))
+
+        self._writes += 1
+        if self._writes % CLEANUP_EVERY == 0:
+            await self.delete_expired()
+
+    async def get(
+        self, key: str, renew_for: int | timedelta | None = None
+    ) -> bytes | None:
+        table = StoreEntry.__table__
+        stmt = sa.select(table.c.value).where(*self._where(key), self._not_expired())
+        if renew_for is None:
+            async with self._read() as conn:
+                return await conn.scalar(stmt)
+
+        async with self._transaction() as conn:
+            value = await conn.scalar(stmt)
+            if value is not None:
+                await conn.execute(
+                    sa.update(table)
+                    .where(*self._where(key), table.c.expires_at.is_not(None))
+                    .values(expires_at=_expires_at(renew_for))
+                )
+        return value
+
+    async def delete(self, key: str) -> None:
+        async with self._transaction() as conn:
+            await conn.execute(sa.delete(StoreEntry.__table__).where(*self._where(key)))
+
+    async def delete_all(self) -> None:
+        table = StoreEntry.__table__
+        stmt = sa.delete(table)
+        if self.namespace:
+            stmt = stmt.where(
+                sa.or_(
+                    table.c.namespace == self.namespace,
+                    table.c.namespace.startswith(f"{self.namespace}_"),
+                )
+            )
+        async with self._transaction() as conn:
+            await conn.execute(stmt)
+
+    async def delete_expired(self) -> None:
+        table = StoreEntry.__table__
+        async with self._transaction() as conn:
+            await conn.execute(
+                sa.delete(table).where(table.c.expires_at <= time.time())
+            )
+
+    async def exists(self, key: str) -> bool:
+        return await self.get(key) is not None
+
+    async def expires_in(self, key: str) -> int | None:
+        table = StoreEntry.__table__
+        async with self._read() as conn:
+            expires_at = await conn.scalar(
+                sa.select(table.c.expires_at).where(
+                    *self._where(key), self._not_expired()
+                )
+            )
+        if expires_at is None:
+            return None
+        return int(expires_at - time.time())
@@ -0,0 +1,176 @@
+"""进程内 LRU 存储
+
+Litestar 自带的 MemoryStore 没有容量上限，过期数据只在读取时清理。
+这里按最近访问顺序淘汰，条目数或总字节数超过上限时丢弃最久未访问的数据。
+同一个根存储派生出的命名空间共享容量和统计。
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from litestar.stores.base import NamespacedStore
+
+
+def _seconds(expires_in: int | timedelta | None) -> float | None:
+    if expires_in is None:
+        return None
+    if isinstance(expires_in, timedelta):
+        return expires_in.total_seconds()
+    return float(expires_in)
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryStats:
+    entries: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class _Entries:
+    """所有命名空间共享的条目表"""
+
+    __slots__ = (
+        "evictions",
+        "hits",
+        "items",
+        "max_bytes",
+        "max_entries",
+        "misses",
+        "size",
+    )
+
+    def __init__(self, max_entries: int, max_bytes: int | None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.items: OrderedDict[tuple[str | None, str], tuple[bytes, float | None]] = (
+            OrderedDict()
+        )
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple[str | None, str]) -> tuple[bytes, float | None] | None:
+        entry = self.items.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            self.pop(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.items.move_to_end(key)
+        return entry
+
+    def put(
+        self, key: tuple[str | None, str], value: bytes, expires_at: float | None
+    ) -> None:
+        self.pop(key)
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            # 单条超过总容量，不缓存
+            return
+        self.items[key] = (value, expires_at)
+        self.size += len(value)
+        while len(self.items) > self.max_entries or (
+            self.max_bytes is not None and self.size > self.max_bytes
+        ):
+            _, (evicted, _) = self.items.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def pop(self, key: tuple[str | None, str]) -> None:
+        entry = self.items.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+class LRUMemoryStore(NamespacedStore):
+    __slots__ = ("_entries", "namespace")
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int | None = None,
+        namespace: str | None = None,
+        _entries: _Entries | None = None,
+    ) -> None:
+        self.namespace = namespace
+        self._entries = (
+            _entries if _entries is not None else _Entries(max_entries, max_bytes)
+        )
+
+    def with_namespace(self, namespace: str) -> LRUMemoryStore:
+        if self.namespace:
+            namespace = f"{self.namespace}_{namespace}"
+        return LRUMemoryStore(namespace=namespace, _entries=self._entries)
+
+    def stats(self) -> MemoryStats:
+        entries = self._entries
+        return MemoryStats(
+            entries=len(entries.items),
+            size=entries.size,
+            hits=entries.hits,
+            misses=entries.misses,
+            evictions=entries.evictions,
+        )
+
+    async def set(
+        self, key: str, value: str | bytes, expires_in: int | timedelta | None = None
+    ) -> None:
+        if isinstance(value, str):
+            value = value.encode()
+        seconds = _seconds(expires_in)
+        self._entries.put(
+            (self.namespace, key),
+            value,
+            time.monotonic() + seconds if seconds is not None else None,
+        )
+
+    async def get(
+        self, key: str, renew_for: int | timedelta | None = None
+    ) -> bytes | None:
+        item_key = (self.namespace, key)
+        entry = self._entries.get(item_key)
+        if entry is None:
+            return None
+        seconds = _seconds(renew_for)
+        if seconds is not None and entry[1] is not None:
+            self._entries.items[item_key] = (entry[0], time.monotonic() + seconds)
+        return entry[0]
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop((self.namespace, key))
+
+    async def delete_all(self) -> None:
+        prefix = f"{self.namespace}_"
+        for item_key in [
+            k
+            for k in self._entries.items
+            if self.namespace is None
+            or (
+                k[0] is not None and (k[0] == self.namespace or k[0].startswith(prefix))
+            )
+        ]:
+            self._entries.pop(item_key)
+
+    def _alive(self, key: str) -> tuple[bytes, float | None] | None:
+        # 不计入命中统计，也不调整访问顺序
+        entry = self._entries.items.get((self.namespace, key))
+        if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+            return None
+        return entry
+
+    async def exists(self, key: str) -> bool:
+        return self._alive(key) is not None
+
+    async def expires_in(self, key: str) -> int | None:
+        entry = self._alive(key)
+        if entry is None or entry[1] is None:
+            return None
+        return int(entry[1] - time.monotonic())
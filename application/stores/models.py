@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from advanced_alchemy.base import AdvancedDeclarativeBase
+from sqlalchemy import Float, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class StoreEntry(AdvancedDeclarativeBase):
+    """
+    键值存储表
+
+    多 worker 部署时共享的 session 等数据，expires_at 为 Unix 时间戳，为空表示不过期。
+    """
+
+    __tablename__ = "app_store_entries"
+
+    namespace: Mapped[str] = mapped_column(String(100), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    value: Mapped[bytes] = mapped_column(LargeBinary)
+    expires_at: Mapped[float | None] = mapped_column(Float, index=True)
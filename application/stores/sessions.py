@@ -0,0 +1,126 @@
+"""服务端 session
+
+在 Litestar `ServerSideSessionBackend` 基础上：
+- 用 msgspec msgpack 编码，写入时记录写入时间
+- 延迟续期：内容没变且距上次写入不足 renew_after 秒时不写存储、不重发 Cookie，
+  每个请求只有一次读取
+- 空 session 不落盘：匿名请求不会为每次访问生成新的 session 记录
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import msgspec
+from litestar.datastructures import Cookie, MutableScopeHeaders
+from litestar.middleware.session.server_side import (
+    ServerSideSessionBackend,
+    ServerSideSessionConfig,
+)
+from litestar.types import Empty
+from litestar.utils.dataclass import extract_dataclass_items
+
+if TYPE_CHECKING:
+    from litestar.connection import ASGIConnection
+    from litestar.types import Message, ScopeSession
+
+# scope 中记录本次请求读到的 session：(session_id, 写入时间, 数据)
+LOADED_SCOPE_KEY = "_session_loaded"
+
+
+class SessionRecord(msgspec.Struct, array_like=True):
+    written_at: float
+    data: bytes
+
+
+_record_decoder = msgspec.msgpack.Decoder(SessionRecord)
+
+
+class SessionBackend(ServerSideSessionBackend):
+    config: SessionConfig
+
+    def serialize_data(self, data: ScopeSession, scope: Any = None) -> bytes:
+        return msgspec.msgpack.encode(data)
+
+    def deserialize_data(self, data: Any) -> dict[str, Any]:
+        return msgspec.msgpack.decode(data)
+
+    async def load_from_connection(self, connection: ASGIConnection) -> dict[str, Any]:
+        session_id = connection.cookies.get(self.config.key)
+        if not session_id or session_id == "null":
+            return {}
+        store = self.config.get_store_from_app(connection.scope["app"])
+        raw = await self.get(session_id, store=store)
+        if raw is None:
+            return {}
+        try:
+            record = _record_decoder.decode(raw)
+            data = self.deserialize_data(record.data)
+        except msgspec.DecodeError:
+            # 旧格式或损坏的数据，当作未登录
+            return {}
+        connection.scope[LOADED_SCOPE_KEY] = (
+            session_id,
+            record.written_at,
+            record.data,
+        )  # type: ignore[literal-required]
+        return data
+
+    async def store_in_message(
+        self, scope_session: ScopeSession, message: Message, connection: ASGIConnection
+    ) -> None:
+        loaded = connection.scope.get(LOADED_SCOPE_KEY)
+        has_cookie = bool(connection.cookies.get(self.config.key))
+
+        if scope_session is Empty or not scope_session:
+            if has_cookie:
+                await self._clear(message, connection)
+            return
+
+        data = self.serialize_data(scope_session)
+        if loaded is not None:
+            session_id, written_at, loaded_data = loaded
+            if (
+                loaded_data == data
+                and time.time() - written_at < self.config.renew_after
+            ):
+                return
+        else:
+            session_id = self.get_session_id(connection)
+
+        store = self.config.get_store_from_app(connection.scope["app"])
+        record = msgspec.msgpack.encode(SessionRecord(time.time(), data))
+        await self.set(session_id=session_id, data=record, store=store)
+        MutableScopeHeaders.from_message(message).add(
+            "Set-Cookie",
+            Cookie(
+                value=session_id, key=self.config.key, **self._cookie_params()
+            ).to_header(header=""),
+        )
+
+    async def _clear(self, message: Message, connection: ASGIConnection) -> None:
+        store = self.config.get_store_from_app(connection.scope["app"])
+        await self.delete(self.get_session_id(connection), store=store)
+        MutableScopeHeaders.from_message(message).add(
+            "Set-Cookie",
+            Cookie(
+                value="null", key=self.config.key, expires=0, **self._cookie_params()
+            ).to_header(header=""),
+        )
+
+    def _cookie_params(self) -> dict[str, Any]:
+        return dict(
+            extract_dataclass_items(
+                self.config, exclude_none=True, include=Cookie.__dict__.keys()
+            )
+        )
+
+
+@dataclass
+class SessionConfig(ServerSideSessionConfig):
+    _backend_class = SessionBackend
+
+    renew_after: int = field(default=3600)
+    """内容不变时，距上次写入超过该秒数才续期"""
@@ -0,0 +1,313 @@
+"""多 worker 共享的内存映射存储
+
+Granian 多 worker 部署时，每个 worker 各自的内存缓存都要单独预热，数据也重复保存。
+这里把缓存放在一个内存映射文件中，同一台机器上的所有 worker 共享一份数据，
+进程重启后缓存仍然保留。
+
+文件布局：
+- 头部：魔数、槽位数、数据区大小、写入位置、代数（generation）
+- 槽位表：开放寻址的哈希索引，每个槽位记录键哈希、数据位置、长度、过期时间和所属代数
+- 数据区：键和值顺序追加写入
+
+数据区写满时代数加一、写入位置归零，旧代数的槽位全部视为空（整体淘汰），
+不需要维护空闲链表。读写通过 flock 在进程之间加锁，只适用于单机（Linux/macOS）。
+
+配置（槽位数、数据区大小）变化时新建文件替换旧文件，不在原文件上截断，
+仍映射着旧文件的 worker 不受影响，重启后使用新文件。
+
+选择 `cache_shared_store = "mmap"` 时作为两级缓存的第二级，整页缓存等都存放在这里。
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from litestar.stores.base import NamespacedStore
+
+from .memory import _seconds
+
+MAGIC = b"LCMSSHM1"
+# 魔数, 槽位数, 数据区大小, 写入位置, 代数
+HEADER = struct.Struct("<8sQQQQ")
+HEADER_SIZE = 64
+# 键哈希, 数据位置, 键长度, 值长度, 过期时间, 代数
+SLOT = struct.Struct("<QQIIdQ")
+# 查找时最多探测的槽位数
+MAX_PROBES = 16
+
+NO_EXPIRY = 0.0
+DELETED = -1.0
+
+
+def _hash(key: bytes) -> int:
+    # 0 表示空槽位
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest()) or 1
+
+
+@dataclass(frozen=True, slots=True)
+class SharedStats:
+    generation: int
+    used: int
+    size: int
+    slots: int
+
+
+class _SharedFile:
+    """映射文件和进程间锁，同一进程内的所有命名空间共用"""
+
+    def __init__(self, path: Path, size: int, slots: int) -> None:
+        self.path = path
+        self.slots = slots
+        self.data_size = size
+        self.data_start = HEADER_SIZE + slots * SLOT.size
+        self._open()
+
+    def _open(self) -> None:
+        # flock 锁跟随打开的文件描述，fork 出的子进程必须重新打开才能互斥
+        self.pid = os.getpid()
+        total = self.data_start + self.data_size
+        path, slots, size = self.path, self.slots, self.data_size
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                stat = os.fstat(fd)
+                # 等待锁期间文件可能已被其他进程替换，此时重新打开
+                if (stat.st_dev, stat.st_ino) == self._identity(path):
+                    header = os.pread(fd, HEADER.size, 0)
+                    if (
+                        stat.st_size == total
+                        and len(header) == HEADER.size
+                        and HEADER.unpack(header)[:3] == (MAGIC, slots, size)
+                    ):
+                        self.mm = mmap.mmap(fd, total)
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+                        self.fd = fd
+                        return
+                    # 新文件或配置变化：其他进程可能还映射着旧文件，原地截断会让它们
+                    # 访问时收到 SIGBUS。在新文件中初始化后替换，旧文件在它们关闭后释放
+                    self._create(total)
+            except BaseException:
+                os.close(fd)
+                raise
+            # 关闭即释放锁
+            os.close(fd)
+
+    @staticmethod
+    def _identity(path: Path) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def _create(self, total: int) -> None:
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            # 新文件内容全部为 0
+            os.ftruncate(fd, total)
+            os.pwrite(fd, HEADER.pack(MAGIC, self.slots, self.data_size, 0, 1), 0)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def lock(self, exclusive: bool) -> Iterator[None]:
+        if self.pid != os.getpid():
+            self._open()
+        fcntl.flock(self.fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def header(self) -> tuple[int, int]:
+        """返回 (写入位置, 代数)"""
+        _, _, _, offset, generation = HEADER.unpack_from(self.mm, 0)
+        return offset, generation
+
+    def set_header(self, offset: int, generation: int) -> None:
+        HEADER.pack_into(
+            self.mm, 0, MAGIC, self.slots, self.data_size, offset, generation
+        )
+
+    def slot(self, index: int) -> tuple[int, int, int, int, float, int]:
+        return SLOT.unpack_from(self.mm, HEADER_SIZE + index * SLOT.size)
+
+    def set_slot(self, index: int, *values: float) -> None:
+        SLOT.pack_into(self.mm, HEADER_SIZE + index * SLOT.size, *values)
+
+    def read(self, offset: int, length: int) -> bytes:
+        start = self.data_start + offset
+        return self.mm[start : start + length]
+
+    def find(self, key: bytes, key_hash: int, generation: int) -> tuple[int, int]:
+        """
+        查找键所在的槽位
+
+        返回 (命中的槽位, 可写入的槽位)，没有命中时第一个为 -1；
+        探测范围内没有可用槽位时，可写入的槽位为起始位置（覆盖）。
+        """
+        start = key_hash % self.slots
+        free = -1
+        for probe in range(MAX_PROBES):
+            index = (start + probe) % self.slots
+            h, offset, key_len, _, expires_at, gen = self.slot(index)
+            if h == 0 or gen != generation:
+                return -1, free if free >= 0 else index
+            if (
+                h == key_hash
+                and key_len == len(key)
+                and self.read(offset, key_len) == key
+            ):
+                return index, index
+            if free < 0 and (
+                expires_at == DELETED or NO_EXPIRY < expires_at <= time.time()
+            ):
+                free = index
+        return -1, free if free >= 0 else start
+
+
+class SharedMemoryStore(NamespacedStore):
+    __slots__ = ("_file", "namespace")
+
+    def __init__(
+        self,
+        path: Path,
+        size: int = 64 * 1024 * 1024,
+        slots: int = 65536,
+        namespace: str | None = None,
+        _file: _SharedFile | None = None,
+    ) -> None:
+        self.namespace = namespace
+        self._file = _file if _file is not None else _SharedFile(path, size, slots)
+
+    def with_namespace(self, namespace: str) -> SharedMemoryStore:
+        if self.namespace:
+            namespace = f"{self.namespace}_{namespace}"
+        return SharedMemoryStore(self._file.path, namespace=namespace, _file=self._file)
+
+    def _key(self, key: str) -> bytes:
+        return f"{self.namespace or ''}:{key}".encode()
+
+    def stats(self) -> SharedStats:
+        f = self._file
+        with f.lock(exclusive=False):
+            offset, generation = f.header()
+        return SharedStats(
+            generation=generation, used=offset, size=f.data_size, slots=f.slots
+        )
+
+    async def set(
+        self, key: str, value: str | bytes, expires_in: int | timedelta | None = None
+    ) -> None:
+        if isinstance(value, str):
+            value = value.encode()
+        raw_key = self._key(key)
+        length = len(raw_key) + len(value)
+        f = self._file
+        if length > f.data_size:
+            return
+        seconds = _seconds(expires_in)
+        expires_at = time.time() + seconds if seconds is not None else NO_EXPIRY
+
+        with f.lock(exclusive=True):
+            offset, generation = f.header()
+            if offset + length > f.data_size:
+                # 数据区写满，进入新一代，旧数据整体失效
+                offset, generation = 0, generation + 1
+            start = f.data_start + offset
+            f.mm[start : start + length] = raw_key + value
+            key_hash = _hash(raw_key)
+            _, index = f.find(raw_key, key_hash, generation)
+            f.set_slot(
+                index,
+                key_hash,
+                offset,
+                len(raw_key),
+                len(value),
+                expires_at,
+                generation,
+            )
+            f.set_header(offset + length, generation)
+
+    async def get(
+        self, key: str, renew_for: int | timedelta | None = None
+    ) -> bytes | None:
+        raw_key = self._key(key)
+        key_hash = _hash(raw_key)
+        f = self._file
+        seconds = _seconds(renew_for)
+        with f.lock(exclusive=seconds is not None):
+            _, generation = f.header()
+            index, _ = f.find(raw_key, key_hash, generation)
+            if index < 0:
+                return None
+            h, offset, key_len, value_len, expires_at, gen = f.slot(index)
+            if expires_at == DELETED or NO_EXPIRY < expires_at <= time.time():
+                return None
+            if seconds is not None and expires_at != NO_EXPIRY:
+                f.set_slot(
+                    index, h, offset, key_len, value_len, time.time() + seconds, gen
+                )
+            return f.read(offset + key_len, value_len)
+
+    def _mark_deleted(self, index: int) -> None:
+        h, offset, key_len, value_len, _, gen = self._file.slot(index)
+        self._file.set_slot(index, h, offset, key_len, value_len, DELETED, gen)
+
+    async def delete(self, key: str) -> None:
+        raw_key = self._key(key)
+        f = self._file
+        with f.lock(exclusive=True):
+            _, generation = f.header()
+            index, _ = f.find(raw_key, _hash(raw_key), generation)
+            if index >= 0:
+                self._mark_deleted(index)
+
+    async def delete_all(self) -> None:
+        f = self._file
+        with f.lock(exclusive=True):
+            _, generation = f.header()
+            if self.namespace is None:
+                f.set_header(0, generation + 1)
+                return
+            prefixes = (f"{self.namespace}:".encode(), f"{self.namespace}_".encode())
+            for index in range(f.slots):
+                h, offset, key_len, _, expires_at, gen = f.slot(index)
+                if h == 0 or gen != generation or expires_at == DELETED:
+                    continue
+                if f.read(offset, key_len).startswith(prefixes):
+                    self._mark_deleted(index)
+
+    async def exists(self, key: str) -> bool:
+        return await self.get(key) is not None
+
+    async def expires_in(self, key: str) -> int | None:
+        raw_key = self._key(key)
+        f = self._file
+        with f.lock(exclusive=False):
+            _, generation = f.header()
+            index, _ = f.find(raw_key, _hash(raw_key), generation)
+            if index < 0:
+                return None
+            expires_at = f.slot(index)[4]
+        if expires_at == DELETED or expires_at == NO_EXPIRY:
+            return None
+        return max(0, int(expires_at - time.time()))
@@ -0,0 +1,114 @@
+"""两级缓存存储
+
+第一级是每个 worker 内存中的 LRU（按字节数限制容量），第二级是 worker 之间共享的存储
+（FileStore 等）。读取先查内存，未命中再读第二级并回填内存；写入和删除同时作用于两级。
+
+内存中的条目有效期不超过 l1_ttl，其他 worker 删除或覆盖的数据最多延迟这么久可见。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from litestar.stores.base import NamespacedStore
+
+from .memory import LRUMemoryStore, MemoryStats, _seconds
+
+
+@dataclass(frozen=True, slots=True)
+class TieredStats:
+    memory: MemoryStats
+    # 内存未命中后第二级的命中/未命中次数
+    shared_hits: int
+    shared_misses: int
+
+
+class _Counters:
+    __slots__ = ("hits", "misses")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+class TieredStore(NamespacedStore):
+    __slots__ = ("_counters", "l1", "l1_ttl", "l2", "namespace")
+
+    def __init__(
+        self,
+        l1: LRUMemoryStore,
+        l2: NamespacedStore,
+        l1_ttl: int,
+        namespace: str | None = None,
+        _counters: _Counters | None = None,
+    ) -> None:
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+        self.namespace = namespace
+        self._counters = _counters if _counters is not None else _Counters()
+
+    def with_namespace(self, namespace: str) -> TieredStore:
+        return TieredStore(
+            l1=self.l1.with_namespace(namespace),
+            l2=self.l2.with_namespace(namespace),
+            l1_ttl=self.l1_ttl,
+            namespace=f"{self.namespace}_{namespace}" if self.namespace else namespace,
+            _counters=self._counters,
+        )
+
+    def stats(self) -> TieredStats:
+        return TieredStats(
+            memory=self.l1.stats(),
+            shared_hits=self._counters.hits,
+            shared_misses=self._counters.misses,
+        )
+
+    def _l1_expires_in(self, expires_in: int | timedelta | None) -> int:
+        seconds = _seconds(expires_in)
+        if seconds is None:
+            return self.l1_ttl
+        return max(0, min(self.l1_ttl, int(seconds)))
+
+    async def set(
+        self, key: str, value: str | bytes, expires_in: int | timedelta | None = None
+    ) -> None:
+        if isinstance(value, str):
+            value = value.encode()
+        await self.l2.set(key, value, expires_in)
+        await self.l1.set(key, value, self._l1_expires_in(expires_in))
+
+    async def get(
+        self, key: str, renew_for: int | timedelta | None = None
+    ) -> bytes | None:
+        if renew_for is None:
+            value = await self.l1.get(key)
+            if value is not None:
+                return value
+
+        # 需要续期时以第二级为准
+        value = await self.l2.get(key, renew_for)
+        if value is None:
+            self._counters.misses += 1
+            await self.l1.delete(key)
+            return None
+        self._counters.hits += 1
+        await self.l1.set(
+            key, value, self._l1_expires_in(await self.l2.expires_in(key))
+        )
+        return value
+
+    async def delete(self, key: str) -> None:
+        await self.l1.delete(key)
+        await self.l2.delete(key)
+
+    async def delete_all(self) -> None:
+        await self.l1.delete_all()
+        await self.l2.delete_all()
+
+    async def exists(self, key: str) -> bool:
+        return await self.l1.exists(key) or await self.l2.exists(key)
+
+    async def expires_in(self, key: str) -> int | None:
+        return await self.l2.expires_in(key)
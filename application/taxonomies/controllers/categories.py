@@ -80,7 +80,7 @@ class CategoryController(Controller):
         data: CategoryCreateSchema,
         request: Request,
     ) -> CategoryLiteSchema:
-        category = await service.create(data)
+        category = await service.create(data, auto_commit=True)
         request.app.emit("category_changed")
         return service.to_schema(
             data=category,
@@ -106,5 +106,5 @@ class CategoryController(Controller):
     async def delete_category(
         self, item_id: UUID, service: CategoryService, request: Request
     ) -> None:
-        await service.delete(item_id)
+        await service.delete(item_id, auto_commit=True)
         request.app.emit("category_changed")
@@ -62,7 +62,7 @@ class FeatureController(Controller):
     async def create_feature(
         self, service: FeatureService, data: FeatureCreateSchema, request: Request
     ) -> FeatureSchema:
-        feature = await service.create(data)
+        feature = await service.create(data, auto_commit=True)
         request.app.emit("feature_changed")
         return service.to_schema(data=feature, schema_type=FeatureSchema)
 
@@ -74,7 +74,7 @@ class FeatureController(Controller):
         data: FeatureUpdateSchema,
         request: Request,
     ) -> FeatureSchema:
-        feature = await service.update(data, item_id)
+        feature = await service.update(data, item_id, auto_commit=True)
         request.app.emit("feature_changed")
         return service.to_schema(data=feature, schema_type=FeatureSchema)
 
@@ -82,5 +82,5 @@ class FeatureController(Controller):
     async def delete_feature(
         self, item_id: UUID, service: FeatureService, request: Request
     ) -> None:
-        await service.delete(item_id)
+        await service.delete(item_id, auto_commit=True)
         request.app.emit("feature_changed")
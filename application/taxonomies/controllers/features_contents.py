@@ -3,12 +3,15 @@ from __future__ import annotations
 from uuid import UUID
 
 import sqlalchemy as sa
-from litestar import Controller, delete, get, post
+from litestar import Controller, Request, delete, get, post
 from litestar.exceptions import NotFoundException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from application.contents.counters import refresh_counters
+from application.contents.models import Content
 from application.guards import PermissionGuard
+from application.web import pages
 
 from ..models import Feature, FeatureContent
 from ..schemas import (
@@ -17,6 +20,7 @@ from ..schemas import (
     PushContentsResponseSchema,
     PushContentsSchema,
 )
+from ..services import touch
 
 view_permission = PermissionGuard("taxonomies:view_feature_content", "查看推荐位内容")
 manage_permission = PermissionGuard(
@@ -68,6 +72,7 @@ class FeatureContentController(Controller):
         feature_id: UUID,
         data: PushContentsSchema,
         db_session: AsyncSession,
+        request: Request,
     ) -> PushContentsResponseSchema:
         """批量添加内容到推荐位"""
         # 验证推荐位是否存在
@@ -95,7 +100,18 @@ class FeatureContentController(Controller):
                 added += 1
 
         if added > 0:
+            await db_session.flush()
+            await refresh_counters(db_session, feature_ids=[feature_id])
+            await touch(db_session, Feature, [feature_id])
+            await touch(db_session, Content, data.content_ids)
             await db_session.commit()
+            request.app.emit(
+                "content_changed",
+                tags=[
+                    pages.tag("feature", feature_id),
+                    *(pages.tag("content", i) for i in data.content_ids),
+                ],
+            )
 
         return PushContentsResponseSchema(
             added=added, total_requested=len(data.content_ids)
@@ -107,6 +123,7 @@ class FeatureContentController(Controller):
         feature_id: UUID,
         content_id: UUID,
         db_session: AsyncSession,
+        request: Request,
     ) -> None:
         """从推荐位移除内容"""
         # 先查询是否存在
@@ -121,4 +138,12 @@ class FeatureContentController(Controller):
             raise NotFoundException("内容不在该推荐位中")
 
         await db_session.delete(feature_content)
+        await db_session.flush()
+        await refresh_counters(db_session, feature_ids=[feature_id])
+        await touch(db_session, Feature, [feature_id])
+        await touch(db_session, Content, [content_id])
         await db_session.commit()
+        request.app.emit(
+            "content_changed",
+            tags=[pages.tag("feature", feature_id), pages.tag("content", content_id)],
+        )
@@ -90,7 +90,7 @@ class SpecialController(Controller):
     async def create_special(
         self, service: SpecialService, data: SpecialCreateSchema, request: Request
     ) -> SpecialSchema:
-        special = await service.create(data)
+        special = await service.create(data, auto_commit=True)
         request.app.emit("special_changed")
         return service.to_schema(
             data=special,
@@ -105,7 +105,7 @@ class SpecialController(Controller):
         data: SpecialUpdateSchema,
         request: Request,
     ) -> SpecialSchema:
-        special = await service.update(data, special_id)
+        special = await service.update(data, special_id, auto_commit=True)
         request.app.emit("special_changed")
         return service.to_schema(
             data=special,
@@ -116,5 +116,5 @@ class SpecialController(Controller):
     async def delete_special(
         self, special_id: UUID, service: SpecialService, request: Request
     ) -> None:
-        await service.delete(special_id)
+        await service.delete(special_id, auto_commit=True)
         request.app.emit("special_changed")
@@ -4,12 +4,15 @@ from datetime import datetime, timezone
 from uuid import UUID
 
 import sqlalchemy as sa
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, Request, delete, get, patch, post
 from litestar.exceptions import NotFoundException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from application.contents.counters import refresh_counters
+from application.contents.models import Content
 from application.guards import PermissionGuard
+from application.web import pages
 
 from ..models import Special, SpecialContent
 from ..schemas import (
@@ -20,6 +23,7 @@ from ..schemas import (
     SpecialContentsResponse,
     SpecialContentItem,
 )
+from ..services import touch
 
 view_permission = PermissionGuard("taxonomies:view_special_content", "查看专题内容")
 manage_permission = PermissionGuard("taxonomies:manage_special_content", "管理专题内容")
@@ -77,6 +81,7 @@ class SpecialContentController(Controller):
         special_id: UUID,
         data: PushContentsSchema,
         db_session: AsyncSession,
+        request: Request,
     ) -> PushContentsResponseSchema:
         """批量添加内容到专题"""
         # 验证专题是否存在
@@ -114,7 +119,18 @@ class SpecialContentController(Controller):
                 added += 1
 
         if added > 0:
+            await db_session.flush()
+            await refresh_counters(db_session, special_ids=[special_id])
+            await touch(db_session, Special, [special_id])
+            await touch(db_session, Content, data.content_ids)
             await db_session.commit()
+            request.app.emit(
+                "content_changed",
+                tags=[
+                    pages.tag("special", special_id),
+                    *(pages.tag("content", i) for i in data.content_ids),
+                ],
+            )
 
         return PushContentsResponseSchema(
             added=added, total_requested=len(data.content_ids)
@@ -126,6 +142,7 @@ class SpecialContentController(Controller):
         special_id: UUID,
         content_id: UUID,
         db_session: AsyncSession,
+        request: Request,
     ) -> None:
         """从专题移除内容"""
         # 先查询是否存在
@@ -140,7 +157,15 @@ class SpecialContentController(Controller):
             raise NotFoundException("内容不在该专题中")
 
         await db_session.delete(special_content)
+        await db_session.flush()
+        await refresh_counters(db_session, special_ids=[special_id])
+        await touch(db_session, Special, [special_id])
+        await touch(db_session, Content, [content_id])
         await db_session.commit()
+        request.app.emit(
+            "content_changed",
+            tags=[pages.tag("special", special_id), pages.tag("content", content_id)],
+        )
 
     @patch("/sort", guards=[manage_permission])
     async def sort_contents(
@@ -148,6 +173,7 @@ class SpecialContentController(Controller):
         special_id: UUID,
         data: SortContentsSchema,
         db_session: AsyncSession,
+        request: Request,
     ) -> SortContentsResponseSchema:
         """批量调整专题内内容顺序"""
         if not data.items:
@@ -183,6 +209,8 @@ class SpecialContentController(Controller):
             .values(position=case_stmt)
         )
         await db_session.execute(stmt)
+        await touch(db_session, Special, [special_id])
         await db_session.commit()
+        request.app.emit("content_changed", tags=[pages.tag("special", special_id)])
 
         return SortContentsResponseSchema(updated=len(data.items))
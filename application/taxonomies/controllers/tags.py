@@ -5,7 +5,7 @@ from uuid import UUID
 
 from advanced_alchemy.filters import LimitOffset, SearchFilter
 from advanced_alchemy.service import OffsetPagination
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, Request, delete, get, patch, post
 from litestar.params import Parameter
 from sqlalchemy.orm import lazyload
 
@@ -81,13 +81,18 @@ class TagController(Controller):
         item_id: UUID,
         service: TagService,
         data: TagUpdateSchema,
+        request: Request,
     ) -> TagSchema:
-        tag = await service.update(data, item_id)
+        tag = await service.update(data, item_id, auto_commit=True)
+        request.app.emit("tag_changed", item_id=item_id)
         return service.to_schema(
             data=tag,
             schema_type=TagSchema,
         )
 
     @delete("{item_id:uuid}", guards=[delete_permission])
-    async def delete_tag(self, item_id: UUID, service: TagService) -> None:
-        await service.delete(item_id)
+    async def delete_tag(
+        self, item_id: UUID, service: TagService, request: Request
+    ) -> None:
+        await service.delete(item_id, auto_commit=True)
+        request.app.emit("tag_changed", item_id=item_id)
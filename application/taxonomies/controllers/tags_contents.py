@@ -3,12 +3,15 @@ from __future__ import annotations
 from uuid import UUID
 
 import sqlalchemy as sa
-from litestar import Controller, delete, get, post
+from litestar import Controller, Request, delete, get, post
 from litestar.exceptions import NotFoundException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from application.contents.counters import refresh_counters
+from application.contents.models import Content
 from application.guards import PermissionGuard
+from application.web import pages
 
 from ..models import Tag, TagContent
 from ..schemas import (
@@ -17,6 +20,7 @@ from ..schemas import (
     TagContentsResponse,
     TagContentItem,
 )
+from ..services import touch
 
 view_permission = PermissionGuard("taxonomies:view_tag_content", "查看标签内容")
 manage_permission = PermissionGuard("taxonomies:manage_tag_content", "管理标签内容")
@@ -67,6 +71,7 @@ class TagContentController(Controller):
         tag_id: UUID,
         data: PushContentsSchema,
         db_session: AsyncSession,
+        request: Request,
     ) -> PushContentsResponseSchema:
         """批量添加内容到标签"""
         # 验证标签是否存在
@@ -94,7 +99,18 @@ class TagContentController(Controller):
                 added += 1
 
         if added > 0:
+            await db_session.flush()
+            await refresh_counters(db_session, tag_ids=[tag_id])
+            await touch(db_session, Tag, [tag_id])
+            await touch(db_session, Content, data.content_ids)
             await db_session.commit()
+            request.app.emit(
+                "content_changed",
+                tags=[
+                    pages.tag("tag", tag_id),
+                    *(pages.tag("content", i) for i in data.content_ids),
+                ],
+            )
 
         return PushContentsResponseSchema(
             added=added, total_requested=len(data.content_ids)
@@ -106,6 +122,7 @@ class TagContentController(Controller):
         tag_id: UUID,
         content_id: UUID,
         db_session: AsyncSession,
+        request: Request,
     ) -> None:
         """从标签移除内容"""
         # 先查询是否存在
@@ -120,4 +137,12 @@ class TagContentController(Controller):
             raise NotFoundException("内容不在该标签中")
 
         await db_session.delete(tag_content)
+        await db_session.flush()
+        await refresh_counters(db_session, tag_ids=[tag_id])
+        await touch(db_session, Tag, [tag_id])
+        await touch(db_session, Content, [content_id])
         await db_session.commit()
+        request.app.emit(
+            "content_changed",
+            tags=[pages.tag("tag", tag_id), pages.tag("content", content_id)],
+        )
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from datetime import datetime
+from collections.abc import Iterable
+from datetime import datetime, timezone
 from os.path import splitext
-from typing import Any
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
 
 import sqlalchemy as sa
 from advanced_alchemy.exceptions import RepositoryError
@@ -19,6 +21,18 @@ from application.utils import build_permalink
 
 from .models import Category, Feature, Special, Tag
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def touch(session: AsyncSession, model: Any, ids: Iterable[UUID]) -> None:
+    """更新 updated_at：只改了关联关系时行本身不会更新，静态导出据此发现变更"""
+    await session.execute(
+        sa.update(model)
+        .where(model.id.in_(list(ids)))
+        .values(updated_at=datetime.now(timezone.utc))
+    )
+
 
 class CategoryRepository(SQLAlchemyAsyncRepository[Category]):
     model_type = Category
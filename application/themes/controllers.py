@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from litestar import Controller, delete, get, patch, put
+from litestar import Controller, Request, delete, get, patch, put
 from litestar.di import Provide
 from litestar.params import Parameter
 
@@ -58,28 +58,34 @@ class TemplateController(Controller):
     @put("{file_path:path}", guards=[edit_permission])
     async def save_template(
         self,
+        request: Request,
         manager: TemplateManager,
         file_path: Annotated[str, Parameter(description="模板文件路径")],
         data: TemplateContentSchema,
     ) -> None:
         """创建或更新模板文件"""
         await manager.write(file_path, data.content)
+        request.app.emit("template_changed")
 
     @delete("{file_path:path}", guards=[delete_permission])
     async def delete_template(
         self,
+        request: Request,
         manager: TemplateManager,
         file_path: Annotated[str, Parameter(description="模板文件路径")],
     ) -> None:
         """删除模板文件"""
         await manager.delete(file_path)
+        request.app.emit("template_changed")
 
     @patch(path="{file_path:path}", guards=[edit_permission])
     async def rename_template(
         self,
+        request: Request,
         manager: TemplateManager,
         file_path: Annotated[str, Parameter(description="模板文件路径")],
         data: TemplateRenameSchema,
     ) -> None:
         """重命名模板文件"""
         await manager.rename(file_path, data.name)
+        request.app.emit("template_changed")
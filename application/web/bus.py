@@ -0,0 +1,273 @@
+"""缓存失效总线
+
+前台缓存（分类列表、整页缓存、固定链接映射）都在各 worker 进程内存中。
+后台修改数据时，处理请求的 worker 通过总线发布失效事件，所有 worker 执行同一组处理函数。
+
+后端：
+- `LocalBus`：只在当前进程内分发，适用于单 worker 和测试；多个实例可以组成一个模拟集群
+- `DatabaseBus`：每个事件在 `web_cache_versions` 表中有一个递增版本号。
+  PostgreSQL 额外通过 LISTEN/NOTIFY 实时推送；所有数据库都会定期轮询版本表，
+  worker 漏收消息（断线、SQLite 无推送）时也能发现版本落后并清理缓存。
+
+消息来源进程通过 origin 标识，自己发布的消息不会重复处理。
+每条消息只携带部分参数（如失效的标签），版本号必须连续处理：
+收到的版本与本地版本之间有空缺时（消息乱序或丢失），按全量失效处理。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+from uuid import uuid4
+
+import sqlalchemy as sa
+from litestar.serialization import decode_json, encode_json
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from application.config import config
+
+from .models import CacheVersion
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+Handler = Callable[..., Awaitable[Any]]
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationBus(ABC):
+    """失效总线基类：维护处理函数和本进程已处理的版本号"""
+
+    def __init__(self) -> None:
+        self.origin = uuid4().hex
+        self._handlers: defaultdict[str, list[Handler]] = defaultdict(list)
+        self._versions: dict[str, int] = {}
+
+    def subscribe(self, event: str) -> Callable[[Handler], Handler]:
+        """注册事件处理函数（装饰器）"""
+
+        def decorator(fn: Handler) -> Handler:
+            self._handlers[event].append(fn)
+            return fn
+
+        return decorator
+
+    def version(self, event: str) -> int:
+        """本进程已处理到的版本号"""
+        return self._versions.get(event, 0)
+
+    def total_version(self) -> int | None:
+        """本进程已处理到的各事件版本号之和；版本号不在进程之间共享时返回 None"""
+        return None
+
+    async def publish(self, event: str, **payload: Any) -> None:
+        """发布事件：先在本进程执行，再广播给其他 worker"""
+        await self.dispatch(event, payload)
+        try:
+            version = await self._send(event, payload)
+        except Exception:
+            # 广播失败不影响本进程；其他 worker 依靠缓存过期兜底
+            logger.exception("缓存失效消息广播失败: %s", event)
+            return
+        if version > self.version(event) + 1:
+            # 之前还有其他 worker 的消息没有收到，内容未知，按全量失效处理
+            self._seen(event, version)
+            await self.dispatch(event, {})
+        else:
+            self._seen(event, version)
+
+    async def receive(
+        self, event: str, version: int, payload: dict[str, Any], origin: str
+    ) -> None:
+        """处理其他 worker 发来的事件"""
+        current = self.version(event)
+        if origin == self.origin or version <= current:
+            # 已经越过这个版本时，越过的同时已经做过全量失效
+            return
+        self._seen(event, version)
+        await self.dispatch(event, payload if version == current + 1 else {})
+
+    async def dispatch(self, event: str, payload: dict[str, Any]) -> None:
+        for handler in self._handlers.get(event, ()):
+            try:
+                await handler(**payload)
+            except Exception:
+                logger.exception("缓存失效处理失败: %s", event)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def _seen(self, event: str, version: int) -> None:
+        self._versions[event] = max(self.version(event), version)
+
+    @abstractmethod
+    async def _send(self, event: str, payload: dict[str, Any]) -> int:
+        """递增事件版本号并广播，返回新版本号"""
+
+
+class LocalBus(InvalidationBus):
+    """进程内总线；传入同一个 peers 列表的实例之间互相广播（用于测试）"""
+
+    def __init__(self, peers: list[LocalBus] | None = None) -> None:
+        super().__init__()
+        self._peers = peers if peers is not None else []
+        self._peers.append(self)
+        self._counters = self._peers[0]._counters if len(self._peers) > 1 else {}
+
+    async def _send(self, event: str, payload: dict[str, Any]) -> int:
+        self._counters[event] = version = self._counters.get(event, 0) + 1
+        for peer in self._peers:
+            await peer.receive(event, version, payload, self.origin)
+        return version
+
+
+class DatabaseBus(InvalidationBus):
+    """基于数据库版本表的总线，PostgreSQL 下额外使用 LISTEN/NOTIFY"""
+
+    channel = "web_cache_invalidation"
+
+    def __init__(self, engine: AsyncEngine, poll_interval: float) -> None:
+        super().__init__()
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self._notify = engine.dialect.name == "postgresql"
+        self._poller: asyncio.Task | None = None
+        self._listener: Any = None
+        self._pending: set[asyncio.Task] = set()
+        self._loaded = False
+
+    def total_version(self) -> int | None:
+        return sum(self._versions.values()) if self._loaded else None
+
+    async def start(self) -> None:
+        # 新进程的缓存本来就是空的，只记录当前版本，不触发处理
+        try:
+            for key, version in await self._load_versions():
+                self._seen(key, version)
+            self._loaded = True
+        except Exception:
+            logger.exception("读取缓存版本失败")
+        if self._notify:
+            await self._listen()
+        self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._poller
+            self._poller = None
+        if self._listener is not None:
+            conn, driver = self._listener
+            with contextlib.suppress(Exception):
+                await driver.remove_listener(self.channel, self._on_notify)
+            await conn.close()
+            self._listener = None
+
+    async def _send(self, event: str, payload: dict[str, Any]) -> int:
+        table = CacheVersion.__table__
+        dialect = self.engine.dialect.name
+        async with self.engine.begin() as conn:
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = insert(table).values(key=event, version=1)
+                version = await conn.scalar(
+                    stmt.on_conflict_do_update(
+                        index_elements=[table.c.key],
+                        set_={"version": table.c.version + 1},
+                    ).returning(table.c.version)
+                )
+            else:
+                version = await self._bump(conn, event)
+            if self._notify:
+                # 与版本号在同一事务中发送，提交时才投递，顺序与版本号一致
+                message = encode_json(
+                    {
+                        "event": event,
+                        "version": version,
+                        "payload": payload,
+                        "origin": self.origin,
+                    }
+                ).decode()
+                await conn.execute(sa.select(sa.func.pg_notify(self.channel, message)))
+        return version
+
+    @staticmethod
+    async def _bump(conn: AsyncConnection, event: str) -> int:
+        """不支持 upsert 的数据库：插入冲突时改为更新"""
+        table = CacheVersion.__table__
+        update = (
+            sa.update(table)
+            .where(table.c.key == event)
+            .values(version=table.c.version + 1)
+        )
+        if (await conn.execute(update)).rowcount == 0:
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(sa.insert(table).values(key=event, version=1))
+            except IntegrityError:
+                await conn.execute(update)
+        return await conn.scalar(sa.select(table.c.version).where(table.c.key == event))
+
+    async def _load_versions(self) -> list[tuple[str, int]]:
+        table = CacheVersion.__table__
+        async with self.engine.connect() as conn:
+            result = await conn.execute(sa.select(table.c.key, table.c.version))
+            return [(row.key, row.version) for row in result]
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                versions = await self._load_versions()
+            except Exception:
+                logger.exception("轮询缓存版本失败")
+                continue
+            for key, version in versions:
+                if version > self.version(key):
+                    # 漏收的消息没有参数，处理函数按全量失效处理
+                    self._seen(key, version)
+                    await self.dispatch(key, {})
+
+    async def _listen(self) -> None:
+        try:
+            conn = await self.engine.connect()
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            await driver.add_listener(self.channel, self._on_notify)
+        except Exception:
+            logger.exception("LISTEN 失败，仅使用轮询")
+            return
+        self._listener = (conn, driver)
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, message: str) -> None:
+        data = decode_json(message)
+        task = asyncio.create_task(
+            self.receive(
+                data["event"], data["version"], data["payload"], data["origin"]
+            )
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+def create_bus() -> InvalidationBus:
+    if config.web_bus_backend == "local":
+        return LocalBus()
+    return DatabaseBus(
+        engine=config.plugins.sqlalchemy.get_engine(),
+        poll_interval=config.web_bus_poll_interval,
+    )
+
+
+bus = create_bus()
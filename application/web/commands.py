@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import anyio
+import click
+
+from application.config import config
+
+from .export import MANIFEST_PATH, SiteExporter
+from .sitemap import SitemapBuilder
+
+
+@click.group(
+    name="pages",
+    invoke_without_command=False,
+    help="Manage static pages.",
+)
+def pages_management() -> None:
+    """Manage static pages."""
+
+
+@pages_management.command(name="export", help="导出首页、栏目和已发布内容的静态页面")
+@click.option("--full", is_flag=True, help="忽略上次导出记录，重新导出全部页面")
+@click.option(
+    "--concurrency",
+    type=int,
+    default=config.export_concurrency,
+    show_default=True,
+    help="同时渲染的页面数",
+)
+@click.option(
+    "--base-url", default=config.export_base_url, show_default=True, help="站点地址"
+)
+def export(full: bool, concurrency: int, base_url: str) -> None:
+    from application import create_app
+
+    exporter = SiteExporter(
+        create_app(),
+        root=config.export_dir,
+        manifest_path=MANIFEST_PATH,
+        concurrency=concurrency,
+        base_url=base_url,
+    )
+    result = anyio.run(exporter.run, full)
+
+    mode = "全量" if result.full else "增量"
+    click.echo(
+        f"{mode}导出完成：渲染 {result.rendered} 个，未变化 {result.unchanged} 个，"
+        f"删除 {result.removed} 个，耗时 {result.elapsed:.1f}s"
+    )
+    for path in result.failed:
+        click.secho(f"|--->{path} 失败", fg="red")
+    if result.failed:
+        raise SystemExit(1)
+
+
+@click.group(
+    name="sitemap",
+    invoke_without_command=False,
+    help="Manage sitemaps.",
+)
+def sitemap_management() -> None:
+    """Manage sitemaps."""
+
+
+@sitemap_management.command(name="build", help="生成站点地图，只重新生成有变化的分片")
+@click.option("--full", is_flag=True, help="忽略上次生成记录，重新生成全部分片")
+@click.option(
+    "--base-url", default=config.export_base_url, show_default=True, help="站点地址"
+)
+def build(full: bool, base_url: str) -> None:
+    builder = SitemapBuilder(
+        root=config.sitemap_dir,
+        manifest_path=config.storage_dir / "sitemap.json",
+        base_url=base_url,
+        shard_size=config.sitemap_shard_size,
+    )
+    result = anyio.run(builder.run, full)
+    click.echo(
+        f"站点地图已生成：{result.urls} 个 URL，写入 {result.written} 个文件，"
+        f"未变化 {result.unchanged} 个，删除 {result.removed} 个，"
+        f"耗时 {result.elapsed:.1f}s"
+    )
@@ -1,26 +1,43 @@
 from __future__ import annotations
 
 import json
-
-from litestar import Controller, Request, Response, get
-from litestar.status_codes import HTTP_404_NOT_FOUND
+from functools import partial
+from uuid import UUID
+
+from litestar import Controller, Request, Response, get, post
+from litestar.response import Redirect
+from litestar.pagination import ClassicPagination
+from litestar.status_codes import (
+    HTTP_200_OK,
+    HTTP_204_NO_CONTENT,
+    HTTP_404_NOT_FOUND,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
 from application.articles.models import Article
 from application.articles.services import ArticleRepository
 from application.config import config
+from application.contents.counters import get_count
+from application.contents.enums import PublishStatus
+from application.contents.hits import view_counter
 from application.contents.models import Content
 from application.contents.schemas import ContentLiteSchema
 from application.contents.services import ContentRepository
+from application.search.index import search_index
 from application.taxonomies.models import Category
 from application.taxonomies.services import (
     CategoryRepository,
+    FeatureRepository,
     SpecialRepository,
     TagRepository,
 )
 
-from . import exceptions, schemas, urls, utils
+from . import exceptions, feeds, pages, schemas, urls, utils
+from .export import EXPORT_HEADER, is_exported
+from .loaders import get_article_loader
+from .pages import page_cache
+from .permalinks import resolver
 from .plugin import plugin
 
 
@@ -30,11 +47,15 @@ class WebController(Controller):
     include_in_schema = False
     opt = {"exclude_from_auth": True}
 
-    @get("/", cache=300)
+    @get("/")
     async def index(self, request: Request) -> Response:
-        return await utils.render_template(
-            request=request,
-            template_name=["index.html", "_index.html"],
+        return await page_cache.render(
+            request,
+            partial(
+                utils.render_template,
+                request=request,
+                template_name=["index.html", "_index.html"],
+            ),
         )
 
     @get("{path:path}")
@@ -44,27 +65,163 @@ class WebController(Controller):
         db_session: AsyncSession,
         path: str,
     ) -> Response:
-        for view in [self.category_view, self.article_view]:
-            if response := await view(path, request, db_session):
-                return response
+        if resolver.is_miss(path):
+            return await self.not_found(request)
 
-        return await utils.render_template(
-            request, template_name="_404.html", status_code=HTTP_404_NOT_FOUND
+        response = await page_cache.render(
+            request, partial(self.permalink_view, path, request, db_session)
         )
+        if response.status_code == HTTP_200_OK and EXPORT_HEADER not in request.headers:
+            view_counter.hit(path)
+        return response
+
+    @post(urls.HITS, status_code=HTTP_204_NO_CONTENT)
+    async def hits(self, path: str) -> None:
+        """静态导出的内容页面不经过应用，由页面中的脚本上报浏览"""
+        # 只接受已导出的页面，任意路径不会占用待写入的计数
+        if path.startswith("/") and is_exported(config.export_dir, path):
+            view_counter.hit(path)
 
     @get(urls.SPECIAL_SHOW)
     async def specials(
         self, request: Request, db_session: AsyncSession, slug: str
     ) -> Response:
-        repo = SpecialRepository(session=db_session)
+        return await page_cache.render(
+            request, partial(self.special_view, slug, request, db_session)
+        )
+
+    @get(urls.TAG_SHOW)
+    async def tag(
+        self, request: Request, db_session: AsyncSession, slug: str | None = None
+    ) -> Response:
+        return await page_cache.render(
+            request, partial(self.tag_view, slug, request, db_session)
+        )
+
+    @get(urls.FEED_CATEGORY)
+    async def category_feed(
+        self, request: Request, db_session: AsyncSession, feed_format: str, path: str
+    ) -> Response:
+        if feed_format not in feeds.FEED_FORMATS:
+            return await self.not_found(request)
+        return await page_cache.render(
+            request,
+            partial(self.category_feed_view, feed_format, path, request, db_session),
+        )
+
+    @get(urls.FEED_TAG)
+    async def tag_feed(
+        self, request: Request, db_session: AsyncSession, feed_format: str, slug: str
+    ) -> Response:
+        if feed_format not in feeds.FEED_FORMATS:
+            return await self.not_found(request)
+        return await page_cache.render(
+            request, partial(self.tag_feed_view, feed_format, slug, request, db_session)
+        )
+
+    @get(urls.FEED_FEATURE)
+    async def feature_feed(
+        self,
+        request: Request,
+        db_session: AsyncSession,
+        feed_format: str,
+        feature_id: UUID,
+    ) -> Response:
+        if feed_format not in feeds.FEED_FORMATS:
+            return await self.not_found(request)
+        return await page_cache.render(
+            request,
+            partial(
+                self.feature_feed_view, feed_format, feature_id, request, db_session
+            ),
+        )
+
+    @get(urls.SEARCH)
+    async def search(
+        self, request: Request, db_session: AsyncSession, q: str = ""
+    ) -> Response:
+        # 搜索结果不进入整页缓存（带 q 参数的请求 page_key 返回 None）
+        query = q.strip()[: config.search_query_length]
+        page_size = config.search_page_size
+        if not query:
+            pagination = ClassicPagination(
+                items=[], page_size=page_size, current_page=1, total_pages=0
+            )
+        elif search_index.available(db_session):
+            page = utils.current_page(request)
+            ids, total = await search_index.search(
+                db_session, query, limit=page_size, offset=(page - 1) * page_size
+            )
+            loader = get_article_loader(request, db_session)
+            pagination = ClassicPagination(
+                items=await loader.fetch_ids(ids),
+                page_size=page_size,
+                current_page=page,
+                total_pages=(total + page_size - 1) // page_size,
+            )
+        else:
+            pagination = await utils.paginate(
+                request,
+                ContentLiteSchema,
+                ContentRepository(session=db_session),
+                Content.status == PublishStatus.PUBLISHED,
+                Content.title.icontains(query, autoescape=True),
+                order_by=[Content.published_at.desc(), Content.id.desc()],
+                page_size=page_size,
+            )
+        return await utils.render_template(
+            request,
+            template_name=["search.html", "_search.html"],
+            query=query,
+            pagination=pagination,
+            items=pagination.items,
+        )
+
+    @get("plugin/{plugin_name:str}")
+    async def plugin_callback(self, request: Request, plugin_name: str) -> Response:
+        try:
+            handler = plugin.get_handler(plugin_name)
+            if handler:
+                return await handler(request)
+        except Exception:
+            pass
+
+        return await self.not_found(request)
+
+    async def not_found(self, request: Request) -> Response:
+        return await utils.render_template(
+            request, template_name="_404.html", status_code=HTTP_404_NOT_FOUND
+        )
+
+    async def permalink_view(
+        self, path: str, request: Request, session: AsyncSession
+    ) -> Response:
+        category_id = await resolver.category_id(session, path)
+        if category_id is not None:
+            response = await self.category_view(category_id, request, session)
+        else:
+            response = await self.article_view(path, request, session)
+
+        if response is None:
+            resolver.add_miss(path)
+            return await self.not_found(request)
+        return response
+
+    async def special_view(
+        self, slug: str, request: Request, session: AsyncSession
+    ) -> Response:
+        repo = SpecialRepository(session=session)
         special = await repo.get(item_id=slug, id_attribute="slug")
+        pages.depends_on(pages.SPECIALS_TAG, pages.tag("special", special.id))
         pagination = await utils.paginate(
             request,
             ContentLiteSchema,
-            ContentRepository(session=db_session),
+            ContentRepository(session=session),
+            Content.status == PublishStatus.PUBLISHED,
             Content.specials.any(id=special.id),
             order_by=Content.created_at.desc(),
             page_size=10,
+            total=await get_count(session, "special", special.id),
         )
         return await utils.render_template(
             request,
@@ -74,19 +231,21 @@ class WebController(Controller):
             pagination=pagination,
         )
 
-    @get(urls.TAG_SHOW)
-    async def tag(
-        self, request: Request, db_session: AsyncSession, slug: str | None = None
+    async def tag_view(
+        self, slug: str | None, request: Request, session: AsyncSession
     ) -> Response:
-        repo = TagRepository(session=db_session)
+        repo = TagRepository(session=session)
         tag = await repo.get(item_id=slug, id_attribute="slug")
+        pages.depends_on(pages.tag("tag", tag.id))
         pagination = await utils.paginate(
             request,
             ContentLiteSchema,
-            ContentRepository(session=db_session),
+            ContentRepository(session=session),
+            Content.status == PublishStatus.PUBLISHED,
             Content.tags.any(id=tag.id),
             order_by=Content.created_at.desc(),
             page_size=10,
+            total=await get_count(session, "tag", tag.id),
         )
         return await utils.render_template(
             request,
@@ -96,31 +255,75 @@ class WebController(Controller):
             pagination=pagination,
         )
 
-    @get("plugin/{plugin_name:str}")
-    async def plugin_callback(self, request: Request, plugin_name: str) -> Response:
-        try:
-            handler = plugin.get_handler(plugin_name)
-            if handler:
-                return await handler(request)
-        except Exception:
-            pass
+    async def category_feed_view(
+        self, feed_format: str, path: str, request: Request, session: AsyncSession
+    ) -> Response:
+        category_id = await resolver.category_id(session, path)
+        if category_id is None:
+            return await self.not_found(request)
+        category = await CategoryRepository(session=session).get(category_id)
+        pages.depends_on(pages.tag("category", category.id))
+        return await feeds.render_feed(
+            request,
+            session,
+            feed_format,
+            Content.category_id == category.id,
+            title=category.title or category.name,
+            link=category.url,
+            description=category.description,
+        )
 
-        return await utils.render_template(
-            request, template_name="_404.html", status_code=HTTP_404_NOT_FOUND
+    async def tag_feed_view(
+        self, feed_format: str, slug: str, request: Request, session: AsyncSession
+    ) -> Response:
+        tag = await TagRepository(session=session).get(
+            item_id=slug, id_attribute="slug"
+        )
+        pages.depends_on(pages.tag("tag", tag.id))
+        return await feeds.render_feed(
+            request,
+            session,
+            feed_format,
+            Content.tags.any(id=tag.id),
+            title=f"#{tag.name}",
+            link=urls.build_tag_url(tag.slug),
+        )
+
+    async def feature_feed_view(
+        self,
+        feed_format: str,
+        feature_id: UUID,
+        request: Request,
+        session: AsyncSession,
+    ) -> Response:
+        feature = await FeatureRepository(session=session).get_one_or_none(
+            id=feature_id, is_active=True
+        )
+        if feature is None:
+            return await self.not_found(request)
+        pages.depends_on(pages.FEATURES_TAG, pages.tag("feature", feature.id))
+        return await feeds.render_feed(
+            request,
+            session,
+            feed_format,
+            Content.features.any(id=feature.id),
+            title=feature.name,
+            link="/",
         )
 
     async def category_view(
         self,
-        path: str,
+        category_id: UUID,
         request: Request,
         session: AsyncSession,
     ) -> Response | None:
         repo = CategoryRepository(session=session)
-        category = await repo.get_one_or_none(path=path)
+        category = await repo.get_one_or_none(id=category_id)
 
         if category is None:
             return
 
+        pages.depends_on(pages.tag("category", category.id))
         category_schema = schemas.Category.model_validate(category).model_dump()
 
         breadcrumb_schema = schemas.breadcrumb_list_adapter.dump_python(
@@ -132,14 +335,36 @@ class WebController(Controller):
             )
         )
 
-        pagination = await utils.paginate(
-            request,
-            ContentLiteSchema,
-            ContentRepository(session=session),
-            category_id=category.id,
-            order_by=Content.created_at.desc(),
-            page_size=category.page_size,
-        )
+        content_repo = ContentRepository(session=session)
+        published = Content.status == PublishStatus.PUBLISHED
+        total = await get_count(session, "category", category.id)
+        if total is None:
+            total = await content_repo.count(published, category_id=category.id)
+        # 文章较少的栏目保留页码分页，多的改用游标分页，避免深翻页扫描
+        if total <= config.web_keyset_threshold:
+            pagination = await utils.paginate(
+                request,
+                ContentLiteSchema,
+                content_repo,
+                published,
+                category_id=category.id,
+                order_by=[Content.published_at.desc(), Content.id.desc()],
+                page_size=category.page_size,
+                total=total,
+            )
+        else:
+            if "page" in request.query_params:
+                # 游标分页不使用页码，去掉页码重定向，同一页只有一个地址
+                return Redirect(path=utils.url_without(request, "page"))
+            pagination = await utils.keyset_paginate(
+                request,
+                ContentLiteSchema,
+                content_repo,
+                published,
+                category_id=category.id,
+                page_size=category.page_size,
+                total=total,
+            )
 
         return await utils.render_template(
             request,
@@ -168,6 +393,10 @@ class WebController(Controller):
         if article is None:
             return
 
+        pages.depends_on(
+            pages.tag("content", article.id),
+            *(pages.tag("tag", item.id) for item in article.tags),
+        )
         data = schemas.Article.model_validate(article)
 
         category_repo = CategoryRepository(session=session)
@@ -1,18 +1,110 @@
+"""缓存失效事件
+
+后台接口通过 `request.app.emit()` 触发事件，监听器把事件发布到失效总线，
+由总线在所有 worker 中执行下面 `@bus.subscribe` 注册的处理函数。
+静态导出的文件所有 worker 共用，由监听器在发起修改的 worker 中删除一次。
+"""
+
+import logging
+from collections.abc import Iterable
+
+from anyio.to_thread import run_sync
 from litestar.events import listener
 
+from application.config import config
+
+from .bus import bus
+from .export import MANIFEST_PATH, discard_pages
+from .lookup import template_lookup
+from .pages import FEATURES_TAG, SPECIALS_TAG, page_cache, tag
+from .permalinks import resolver
 from .stores import CATEGORIES_CACHE_KEY, FEATURES_CACHE_KEY, SPECIALS_CACHE_KEY, store
 
+logger = logging.getLogger(__name__)
+
+
+async def discard_exported(tags: Iterable[str] | None = None) -> None:
+    """删除受影响的静态导出页面，tags 为 None 时删除全部"""
+    try:
+        await run_sync(discard_pages, config.export_dir, MANIFEST_PATH, tags)
+    except OSError:
+        logger.exception("删除导出页面失败")
+
 
 @listener("category_changed")
 async def on_category_changed(**kwargs):
-    await store.delete(CATEGORIES_CACHE_KEY)
+    await bus.publish("category_changed", **kwargs)
+    await discard_exported()
 
 
 @listener("feature_changed")
 async def on_feature_changed(**kwargs):
-    await store.delete(FEATURES_CACHE_KEY)
+    await bus.publish("feature_changed", **kwargs)
+    await discard_exported([FEATURES_TAG])
 
 
 @listener("special_changed")
 async def on_special_changed(**kwargs):
+    await bus.publish("special_changed", **kwargs)
+    await discard_exported([SPECIALS_TAG])
+
+
+@listener("content_changed")
+async def on_content_changed(tags: list[str] | None = None, **kwargs):
+    await bus.publish("content_changed", tags=tags, **kwargs)
+    await discard_exported(tags)
+
+
+@listener("tag_changed")
+async def on_tag_changed(item_id=None, **kwargs):
+    await bus.publish("tag_changed", item_id=item_id, **kwargs)
+    await discard_exported(None if item_id is None else [tag("tag", item_id)])
+
+
+@listener("template_changed")
+async def on_template_changed(**kwargs):
+    await bus.publish("template_changed", **kwargs)
+    await discard_exported()
+
+
+@bus.subscribe("category_changed")
+async def invalidate_categories(**kwargs):
+    await store.delete(CATEGORIES_CACHE_KEY)
+    resolver.reset_categories()
+    # 栏目影响导航、面包屑和 URL，直接清空整页缓存
+    page_cache.clear()
+
+
+@bus.subscribe("feature_changed")
+async def invalidate_features(**kwargs):
+    await store.delete(FEATURES_CACHE_KEY)
+    page_cache.evict(FEATURES_TAG)
+
+
+@bus.subscribe("special_changed")
+async def invalidate_specials(**kwargs):
     await store.delete(SPECIALS_CACHE_KEY)
+    page_cache.evict(SPECIALS_TAG)
+
+
+@bus.subscribe("content_changed")
+async def invalidate_contents(tags: list[str] | None = None, **kwargs):
+    resolver.reset_misses()
+    if tags is None:
+        page_cache.clear()
+    else:
+        page_cache.evict(*tags)
+
+
+@bus.subscribe("tag_changed")
+async def invalidate_tag(item_id=None, **kwargs):
+    if item_id is None:
+        page_cache.clear()
+    else:
+        page_cache.evict(tag("tag", item_id))
+
+
+@bus.subscribe("template_changed")
+async def invalidate_templates(**kwargs):
+    template_lookup.clear()
+    page_cache.clear()
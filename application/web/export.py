@@ -0,0 +1,409 @@
+"""静态页面导出
+
+把首页、栏目首页和已发布内容渲染成静态 HTML 写入 `export_dir`，
+nginx 通过 try_files 直接返回，翻页等带查询参数的请求和没有导出的页面仍交给应用。
+
+页面通过进程内的 ASGI 客户端请求应用本身渲染，与线上访问使用同一套视图、模板和异常处理。
+渲染时收集到的缓存标签（见 `pages.depends_on`）保存在清单中，再次导出时只重新渲染
+依赖了变更数据的页面：
+- 内容：变更前后的 `content_tags`（栏目、标签、专题、推荐位）
+- 专题、推荐位、标签：修改或删除了的对应标签（推送、移除、排序内容时也会更新它们的 updated_at）
+- 热门排行：快照中的名次变化时，使用了排行的页面
+- 栏目或模板变化会影响导航和 URL，整站重新导出
+
+后台修改数据时，发起修改的 worker 删除依赖了失效标签的导出文件（见 `discard_pages`），
+这些页面回退到应用渲染，下次导出时重新生成；导出时文件不存在的页面也会重新渲染。
+
+内容页面由 nginx 直接返回时不经过应用，导出的文件中附加一段脚本，
+打开页面时向 `urls.HITS` 上报一次浏览（计入浏览量和热门排行）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import sqlalchemy as sa
+from litestar.status_codes import HTTP_200_OK, HTTP_404_NOT_FOUND
+from litestar.testing import AsyncTestClient
+
+from application.config import config
+from application.contents.enums import PublishStatus
+from application.contents.models import Content
+from application.contents.trending import trending_service
+from application.taxonomies.models import Category, Feature, Special, Tag
+from application.taxonomies.models.features import FeatureContent
+from application.taxonomies.models.specials import SpecialContent
+from application.taxonomies.models.tags import TagContent
+
+from . import pages, urls
+from .pages import page_cache
+
+if TYPE_CHECKING:
+    from litestar import Litestar
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.html"
+MANIFEST_PATH = config.storage_dir / "export.json"
+BEACON = (
+    '<script>navigator.sendBeacon("{url}?path="+encodeURIComponent({path}))</script>'
+)
+# 导出请求带上该请求头，视图据此不计入浏览量和热门排行
+EXPORT_HEADER = "X-Site-Export"
+
+
+def page_file(root: Path, path: str) -> Path:
+    """页面路径对应的文件：/p/1.html -> p/1.html，/news -> news/index.html"""
+    name = path.strip("/")
+    if not name:
+        return root / INDEX_FILE
+    if name.endswith(".html"):
+        return root / name
+    return root / name / INDEX_FILE
+
+
+def is_exported(root: Path, path: str) -> bool:
+    """页面是否已导出为静态文件"""
+    file = page_file(root, path)
+    return file.resolve().is_relative_to(root.resolve()) and file.is_file()
+
+
+def with_beacon(body: bytes, path: str) -> bytes:
+    """在页面末尾附加上报浏览量的脚本"""
+    script = BEACON.format(
+        url=urls.HITS, path=json.dumps(path).replace("</", "<\\/")
+    ).encode()
+    head, found, tail = body.rpartition(b"</body>")
+    if not found:
+        return body + script
+    return head + script + found + tail
+
+
+def templates_fingerprint(directories: Iterable[Path]) -> str:
+    """模板目录的指纹，任一模板增删改都会变化"""
+    digest = hashlib.sha256()
+    for directory in directories:
+        if not directory.is_dir():
+            continue
+        for file in sorted(directory.rglob("*.html")):
+            stat = file.stat()
+            digest.update(f"{file}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class Manifest:
+    """上一次导出的记录"""
+
+    exported_at: str
+    templates: str
+    categories: list[str]
+    # 热门排行名次的摘要
+    trending: str = ""
+    # 页面路径 -> 页面依赖的标签
+    pages: dict[str, list[str]] = field(default_factory=dict)
+    # 内容 ID -> 内容变更时需要失效的标签
+    contents: dict[str, list[str]] = field(default_factory=dict)
+    # special / feature / tag -> 导出时存在的 ID，用来发现删除
+    taxonomies: dict[str, list[str]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> Manifest | None:
+        try:
+            return cls(**json.loads(path.read_bytes()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(self), ensure_ascii=False))
+        os.replace(tmp, path)
+
+
+@dataclass
+class ExportResult:
+    rendered: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: list[str] = field(default_factory=list)
+    full: bool = False
+    elapsed: float = 0.0
+
+
+async def _content_tags(
+    session: AsyncSession, where: sa.ColumnElement[bool]
+) -> dict[str, list[str]]:
+    """计算符合条件的内容变更时需要失效的标签"""
+    stmt = sa.select(Content.id, Content.category_id).where(where)
+    contents = (await session.execute(stmt)).all()
+    if not contents:
+        return {}
+
+    related: dict[str, defaultdict[Any, list[Any]]] = {}
+    for name, model, column in (
+        ("tag_ids", TagContent, TagContent.tag_id),
+        ("special_ids", SpecialContent, SpecialContent.special_id),
+        ("feature_ids", FeatureContent, FeatureContent.feature_id),
+    ):
+        assoc = (
+            sa.select(model.content_id, column)
+            .join(Content, Content.id == model.content_id)
+            .where(where)
+        )
+        items: defaultdict[Any, list[Any]] = defaultdict(list)
+        for content_id, item_id in await session.execute(assoc):
+            items[content_id].append(item_id)
+        related[name] = items
+
+    return {
+        str(content_id): pages.content_tags(
+            content_ids=[content_id],
+            category_ids=[category_id],
+            **{name: items.get(content_id, ()) for name, items in related.items()},
+        )
+        for content_id, category_id in contents
+    }
+
+
+async def _taxonomy_tags(
+    session: AsyncSession, since: datetime | None, previous: dict[str, list[str]]
+) -> tuple[set[str], dict[str, list[str]]]:
+    """上次导出后修改或删除过的专题、推荐位、标签，以及当前各自的 ID"""
+    tags: set[str] = set()
+    current: dict[str, list[str]] = {}
+    for model, kind, group in (
+        (Special, "special", pages.SPECIALS_TAG),
+        (Feature, "feature", pages.FEATURES_TAG),
+        (Tag, "tag", None),
+    ):
+        rows = (await session.execute(sa.select(model.id, model.updated_at))).all()
+        ids = current[kind] = sorted(str(item_id) for item_id, _ in rows)
+        if since is None:
+            continue
+        changed = set(previous.get(kind, ())).difference(ids)
+        changed.update(str(item_id) for item_id, at in rows if at > since)
+        if changed and group is not None:
+            tags.add(group)
+        tags.update(pages.tag(kind, i) for i in changed)
+    return tags, current
+
+
+def discard_pages(
+    root: Path, manifest_path: Path, tags: Iterable[str] | None = None
+) -> int:
+    """删除依赖任一标签的导出页面，tags 为 None 时删除全部，返回删除的文件数"""
+    manifest = Manifest.load(manifest_path)
+    if manifest is None:
+        return 0
+    wanted = None if tags is None else set(tags)
+    removed = 0
+    for path, page_tags in manifest.pages.items():
+        if wanted is not None and wanted.isdisjoint(page_tags):
+            continue
+        file = page_file(root, path)
+        if file.is_file():
+            file.unlink()
+            removed += 1
+    return removed
+
+
+class SiteExporter:
+    def __init__(
+        self,
+        app: Litestar,
+        root: Path,
+        manifest_path: Path,
+        concurrency: int = 4,
+        base_url: str = "http://example.com",
+    ) -> None:
+        self.app = app
+        self.root = root
+        self.manifest_path = manifest_path
+        self.concurrency = concurrency
+        self.base_url = base_url
+        self.template_dirs = [
+            config.app_dir / "web" / "templates",
+            config.storage_dir / "templates",
+        ]
+
+    async def run(self, full: bool = False) -> ExportResult:
+        started = time.perf_counter()
+        result = ExportResult()
+        previous = Manifest.load(self.manifest_path)
+        exported_at = datetime.now(UTC)
+        fingerprint = templates_fingerprint(self.template_dirs)
+        ranking = trending_service.snapshot_fingerprint()
+
+        async with config.plugins.sqlalchemy.get_session() as session:
+            categories = (
+                await session.execute(sa.select(Category.path, Category.updated_at))
+            ).all()
+            category_paths = sorted(path for path, _ in categories)
+            published = Content.status == PublishStatus.PUBLISHED
+            contents = dict(
+                (
+                    await session.execute(
+                        sa.select(Content.id, Content.path).where(published)
+                    )
+                ).all()
+            )
+
+            since = None
+            if previous is not None and not full:
+                since = datetime.fromisoformat(previous.exported_at)
+                if (
+                    previous.templates != fingerprint
+                    or previous.categories != category_paths
+                    or any(updated_at > since for _, updated_at in categories)
+                ):
+                    since = None
+
+            dirty, taxonomies = await _taxonomy_tags(
+                session, since, previous.taxonomies if previous is not None else {}
+            )
+            if previous is None or since is None:
+                result.full = True
+                content_tags = await _content_tags(session, published)
+            else:
+                content_ids = {str(i) for i in contents}
+                content_tags = {
+                    key: tags
+                    for key, tags in previous.contents.items()
+                    if key in content_ids
+                }
+                changed = await _content_tags(
+                    session, sa.and_(published, Content.updated_at > since)
+                )
+                content_tags.update(changed)
+                if previous.trending != ranking:
+                    dirty.add(pages.TRENDING_TAG)
+                # 变更或下线的内容：变更前后展示它的页面都要重新渲染
+                for key, tags in previous.contents.items():
+                    if key in changed or key not in content_ids:
+                        dirty.update(tags)
+                for tags in changed.values():
+                    dirty.update(tags)
+
+        current = ["/", *category_paths, *contents.values()]
+        manifest = Manifest(
+            exported_at=exported_at.isoformat(),
+            templates=fingerprint,
+            categories=category_paths,
+            trending=ranking,
+            contents=content_tags,
+            taxonomies=taxonomies,
+        )
+
+        targets = []
+        for path in current:
+            tags = previous.pages.get(path) if not result.full else None
+            # 文件不存在：变更时已被删除（见 discard_pages）
+            if (
+                tags is None
+                or dirty.intersection(tags)
+                or not page_file(self.root, path).is_file()
+            ):
+                targets.append(path)
+            else:
+                manifest.pages[path] = tags
+                result.unchanged += 1
+
+        await self._render_all(targets, manifest, result, set(contents.values()))
+
+        if previous is not None:
+            for path in previous.pages.keys() - set(current):
+                self._remove(path)
+                result.removed += 1
+
+        manifest.save(self.manifest_path)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    async def _render_all(
+        self,
+        targets: list[str],
+        manifest: Manifest,
+        result: ExportResult,
+        content_paths: set[str],
+    ) -> None:
+        if not targets:
+            return
+        if page_cache.store is None:
+            # 页面渲染时收集的标签要从整页缓存中取回，导出时总是启用
+            page_cache.store = config.plugins.stores.get("pages")
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        for path in targets:
+            queue.put_nowait(path)
+
+        async with AsyncTestClient(app=self.app, base_url=self.base_url) as client:
+
+            async def worker() -> None:
+                while not queue.empty():
+                    path = queue.get_nowait()
+                    try:
+                        await self._render(
+                            client, path, manifest, result, path in content_paths
+                        )
+                    except Exception:
+                        logger.exception("导出页面失败: %s", path)
+                        result.failed.append(path)
+
+            await asyncio.gather(
+                *(worker() for _ in range(min(self.concurrency, len(targets))))
+            )
+
+    async def _render(
+        self,
+        client: AsyncTestClient,
+        path: str,
+        manifest: Manifest,
+        result: ExportResult,
+        beacon: bool = False,
+    ) -> None:
+        response = await client.get(
+            path, follow_redirects=False, headers={EXPORT_HEADER: "1"}
+        )
+        if response.status_code == HTTP_404_NOT_FOUND:
+            self._remove(path)
+            return
+        if response.status_code != HTTP_200_OK:
+            result.failed.append(path)
+            return
+
+        file = page_file(self.root, path)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = file.with_name(f".{file.name}.tmp")
+        body = response.content
+        tmp.write_bytes(with_beacon(body, path) if beacon else body)
+        os.replace(tmp, file)
+
+        result.rendered += 1
+        tags = await page_cache.tags(f"{path}?page=1")
+        # 没有取到依赖（页面未进入缓存）时不记录，下次导出重新渲染
+        if tags is not None:
+            manifest.pages[path] = sorted(tags)
+
+    def _remove(self, path: str) -> None:
+        file = page_file(self.root, path)
+        file.unlink(missing_ok=True)
+        # 顺带清理空目录
+        parent = file.parent
+        while parent != self.root and parent.is_relative_to(self.root):
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
@@ -0,0 +1,91 @@
+"""RSS / Atom 订阅
+
+栏目、标签、推荐位的订阅与对应列表页使用相同的查询，通过整页缓存渲染：
+同一订阅在数据变更（按标签失效）或缓存过期前只渲染一次，
+缓存带 ETag 和最新内容时间作为 Last-Modified，阅读器的条件请求直接返回 304，
+轮询不会访问数据库。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from email.utils import format_datetime
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from advanced_alchemy.filters import LimitOffset
+
+from application.config import config
+from application.contents.enums import PublishStatus
+from application.contents.models import Content
+from application.contents.schemas import ContentLiteSchema
+from application.contents.services import ContentRepository
+
+from . import utils
+
+if TYPE_CHECKING:
+    from litestar import Request, Response
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class FeedFormat(NamedTuple):
+    template: str
+    media_type: str
+
+
+FEED_FORMATS = {
+    "rss": FeedFormat("_rss.xml", "application/rss+xml"),
+    "atom": FeedFormat("_atom.xml", "application/atom+xml"),
+}
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value, usegmt=True)
+
+
+def _updated(item: dict[str, Any]) -> datetime:
+    return max(filter(None, (item["published_at"], item["updated_at"])))
+
+
+async def render_feed(
+    request: Request,
+    session: AsyncSession,
+    feed_format: str,
+    *filters: Any,
+    title: str,
+    link: str,
+    description: str | None = None,
+) -> Response:
+    """渲染符合条件的最新已发布内容，feed_format 须为 FEED_FORMATS 中的格式"""
+    template, media_type = FEED_FORMATS[feed_format]
+
+    result = await ContentRepository(session=session).list(
+        LimitOffset(limit=config.web_feed_size, offset=0),
+        Content.status == PublishStatus.PUBLISHED,
+        *filters,
+        order_by=[Content.published_at.desc(), Content.id.desc()],
+    )
+    items = [ContentLiteSchema.model_validate(item).model_dump() for item in result]
+    updated = max(map(_updated, items), default=None)
+
+    # 阅读器需要绝对地址
+    base_url = str(request.base_url).rstrip("/")
+    for item in items:
+        if item["url"].startswith("/"):
+            item["url"] = base_url + item["url"]
+
+    response = await utils.render_template(
+        request,
+        template_name=[template.removeprefix("_"), template],
+        stream=False,
+        feed_url=str(request.url),
+        title=title,
+        link=base_url + link if link.startswith("/") else link,
+        description=description,
+        items=items,
+        updated=updated,
+        http_date=http_date,
+    )
+    response.media_type = media_type
+    if updated is not None:
+        response.headers["Last-Modified"] = http_date(updated)
+    return response
@@ -0,0 +1,53 @@
+"""合并并发的相同加载（single-flight）
+
+缓存失效或过期后，同一时刻到达的请求都会未命中，各自执行同样的查询和渲染。
+`SingleFlight.do()` 让同一 worker 内同一个 key 的并发调用只执行一次，
+其余调用等待同一个结果。
+
+第一个调用者（leader）在自己的任务中执行加载，可以使用自己请求的数据库会话；
+leader 被取消（如客户端断开）时，等待者重新竞争执行，不会跟着失败。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future[Any]] = {}
+
+    def running(self, key: str) -> bool:
+        """key 是否有正在执行的加载"""
+        return key in self._calls
+
+    async def do[T](self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._calls.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not future.cancelled() or (task is not None and task.cancelling()):
+                    raise
+                # leader 被取消，重新竞争
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
@@ -3,28 +3,11 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Literal, Mapping
 from uuid import UUID
 
-from advanced_alchemy.filters import (
-    CollectionFilter,
-    ComparisonFilter,
-    ExistsFilter,
-    LimitOffset,
-    OrderBy,
-)
-from sqlalchemy.orm import defer, joinedload, load_only, noload
-
-from application.accounts.models import User
-from application.articles.models import Article, PublishStatus
-from application.articles.services import ArticleRepository
 from application.config import config, template
-from application.taxonomies.models import Category, Feature, Special
-from application.utils import list_to_tree
-
-from .schemas import (
-    article_list_adapter,
-    category_list_adapter,
-    feature_list_adapter,
-    special_list_adapter,
-)
+from application.contents.trending import trending_service
+
+from . import pages
+from .loaders import ArticleQuery, get_article_loader
 from .stores import (
     get_categories_cached,
     get_features_cached,
@@ -44,49 +27,44 @@ def get_session_by_request(ctx: Mapping[str, Any]) -> AsyncSession:
 
 @template.global_function(use_context=True)
 async def categories_tree(ctx):
-    result = await get_categories_cached(get_session_by_request(ctx))
-    pydantic_list = category_list_adapter.validate_python(result)
-    return list_to_tree(category_list_adapter.dump_python(pydantic_list))
+    pages.depends_on(pages.CATEGORIES_TAG)
+    snapshot = await get_categories_cached(get_session_by_request(ctx))
+    return snapshot.tree
 
 
 @template.global_function(use_context=True)
 async def categories(ctx):
-    result = await get_categories_cached(get_session_by_request(ctx))
-    pydantic_list = category_list_adapter.validate_python(result)
-    return category_list_adapter.dump_python(pydantic_list)
+    pages.depends_on(pages.CATEGORIES_TAG)
+    snapshot = await get_categories_cached(get_session_by_request(ctx))
+    return snapshot.items
 
 
 @template.global_function(use_context=True)
 async def specials(ctx):
-    result = await get_specials_cached(get_session_by_request(ctx))
-    pydantic_list = special_list_adapter.validate_python(result)
-    return special_list_adapter.dump_python(pydantic_list)
+    pages.depends_on(pages.SPECIALS_TAG)
+    snapshot = await get_specials_cached(get_session_by_request(ctx))
+    return snapshot.items
 
 
 @template.global_function(use_context=True)
 async def features(ctx):
-    result = await get_features_cached(get_session_by_request(ctx))
-    pydantic_list = feature_list_adapter.validate_python(result)
-    return feature_list_adapter.dump_python(pydantic_list)
+    pages.depends_on(pages.FEATURES_TAG)
+    snapshot = await get_features_cached(get_session_by_request(ctx))
+    return snapshot.items
 
 
 @template.global_function(use_context=True)
 async def feature_select(ctx, *args):
-    features = await get_features_cached(get_session_by_request(ctx))
-    if args:
-        features = [feature for feature in features if feature.id in args]
-    pydantic_list = feature_list_adapter.validate_python(features)
-    return feature_list_adapter.dump_python(pydantic_list)
+    pages.depends_on(pages.FEATURES_TAG)
+    snapshot = await get_features_cached(get_session_by_request(ctx))
+    return snapshot.select(args)
 
 
 @template.global_function(use_context=True)
 async def special_select(ctx, *args):
-    specials = await get_specials_cached(get_session_by_request(ctx))
-    if args:
-        specials = [special for special in specials if special.id in args]
-
-    pydantic_list = special_list_adapter.validate_python(specials)
-    return special_list_adapter.dump_python(pydantic_list)
+    pages.depends_on(pages.SPECIALS_TAG)
+    snapshot = await get_specials_cached(get_session_by_request(ctx))
+    return snapshot.select(args)
 
 
 @template.global_function(use_context=True)
@@ -103,12 +81,9 @@ async def category_select(ctx, *args):
     Returns:
         list: List of selected categories.
     """
-    categories = await get_categories_cached(get_session_by_request(ctx))
-    if args:
-        categories = [category for category in categories if category.id in args]
-
-    pydantic_list = category_list_adapter.validate_python(categories)
-    return category_list_adapter.dump_python(pydantic_list)
+    pages.depends_on(pages.CATEGORIES_TAG)
+    snapshot = await get_categories_cached(get_session_by_request(ctx))
+    return snapshot.select(args)
 
 
 @template.global_function(use_context=True)
@@ -122,62 +97,41 @@ async def article_select(
     order_by: str = "published_at",
     order_dir: Literal["desc", "asc"] = "desc",
 ):
-    repo = ArticleRepository(session=get_session_by_request(ctx))
-
-    condition = [
-        OrderBy(field_name=order_by, sort_order=order_dir),
-        LimitOffset(limit=limit, offset=0),
-        ComparisonFilter(
-            field_name="status", operator="eq", value=PublishStatus.PUBLISHED
-        ),
+    query = ArticleQuery.create(
+        category=category,
+        special=special,
+        feature=feature,
+        limit=limit,
+        cover=cover,
+        order_by=order_by,
+        order_dir=order_dir,
+    )
+
+    # 记录整页缓存依赖：限定了分类时只依赖对应分类，否则依赖全部内容
+    dependencies = [
+        pages.tag(kind, value)
+        for kind, values in (
+            ("category", query.category),
+            ("special", query.special),
+            ("feature", query.feature),
+        )
+        for value in values or ()
     ]
+    pages.depends_on(*(dependencies or [pages.CONTENTS_TAG]))
 
-    if cover:
-        condition.append(Article.cover_url.isnot(None))
-
-    # 处理 category 参数
-    if category is not None:
-        if isinstance(category, list):
-            condition.append(
-                CollectionFilter(field_name="category_id", values=category)
-            )
-        else:
-            condition.append(
-                ComparisonFilter(
-                    field_name="category_id", operator="eq", value=category
-                )
-            )
-
-    # 处理 special 参数
-    if special is not None:
-        if isinstance(special, list):
-            condition.append(
-                ExistsFilter([Article.specials.any(Special.id.in_(special))])
-            )
-        else:
-            condition.append(Article.specials.any(Special.id == special))
-
-    # 处理 feature 参数
-    if feature is not None:
-        if isinstance(feature, list):
-            condition.append(
-                ExistsFilter([Article.features.any(Feature.id.in_(feature))])
-            )
-        else:
-            condition.append(Article.features.any(Feature.id == feature))
-
-    result = await repo.list(
-        *condition,
-        load=[
-            defer(Article.text),
-            joinedload(Article.creator).options(
-                load_only(User.id, User.username, User.email), noload(User.roles)
-            ),
-            joinedload(Article.category).options(
-                noload(Category.parent),
-                noload(Category.children),
-            ),
-        ],
-    )
-    pydantic_list = article_list_adapter.validate_python(result)
-    return article_list_adapter.dump_python(pydantic_list)
+    loader = get_article_loader(ctx["request"], get_session_by_request(ctx))
+    return await loader.load(ctx.name or "", query)
+
+
+@template.global_function(use_context=True)
+async def trending_select(
+    ctx,
+    category: UUID | None = None,
+    window: str = "24h",
+    limit: int = 10,
+):
+    """热门内容：最近 window 内浏览最多的文章，category 限定栏目"""
+    pages.depends_on(pages.TRENDING_TAG, pages.CONTENTS_TAG)
+    ranked = trending_service.top(window, category, limit)
+    loader = get_article_loader(ctx["request"], get_session_by_request(ctx))
+    return await loader.fetch_ids([content_id for content_id, _ in ranked])
@@ -0,0 +1,208 @@
+"""请求级文章加载器
+
+模板中的 `article_select()` 每调用一次就是一次查询，首页这类多个区块的模板会串行执行多次。
+加载器挂在 `request.state` 上，在一次渲染内：
+- 相同参数的调用只查询一次
+- 记住每个模板上一次渲染的调用序列（调用计划）；本次渲染的第一个调用与计划一致时，
+  把计划中的所有调用合并成一条 UNION ALL 查询预取，之后的调用直接命中结果
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+import sqlalchemy as sa
+from sqlalchemy.orm import defer, joinedload, load_only, noload
+
+from application.accounts.models import User
+from application.articles.models import Article, PublishStatus
+from application.taxonomies.models import Category, Feature, Special
+
+from .schemas import article_list_adapter
+
+if TYPE_CHECKING:
+    from litestar import Request
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+STATE_KEY = "article_loader"
+
+# 列表展示需要的关联数据
+LIST_OPTIONS = (
+    defer(Article.text),
+    joinedload(Article.creator).options(
+        load_only(User.id, User.username, User.email), noload(User.roles)
+    ),
+    joinedload(Article.category).options(
+        noload(Category.parent),
+        noload(Category.children),
+    ),
+)
+
+
+def _ids(value: Any) -> tuple[Any, ...] | None:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value)
+    return (value,)
+
+
+@dataclass(frozen=True, slots=True)
+class ArticleQuery:
+    """一次 `article_select()` 调用的参数（可哈希，用于去重）"""
+
+    category: tuple[Any, ...] | None = None
+    special: tuple[Any, ...] | None = None
+    feature: tuple[Any, ...] | None = None
+    limit: int = 10
+    cover: bool = False
+    order_by: str = "published_at"
+    order_dir: Literal["desc", "asc"] = "desc"
+
+    @classmethod
+    def create(
+        cls, category=None, special=None, feature=None, **kwargs
+    ) -> ArticleQuery:
+        return cls(
+            category=_ids(category),
+            special=_ids(special),
+            feature=_ids(feature),
+            **kwargs,
+        )
+
+    def statement(self, batch: int) -> sa.Select:
+        """只查 id 的子查询，附带批次号和批次内顺序"""
+        column = getattr(Article, self.order_by)
+        order = column.desc() if self.order_dir == "desc" else column.asc()
+
+        conditions = [Article.status == PublishStatus.PUBLISHED]
+        if self.cover:
+            conditions.append(Article.cover_url.isnot(None))
+        if self.category is not None:
+            conditions.append(Article.category_id.in_(self.category))
+        if self.special is not None:
+            conditions.append(Article.specials.any(Special.id.in_(self.special)))
+        if self.feature is not None:
+            conditions.append(Article.features.any(Feature.id.in_(self.feature)))
+
+        subquery = (
+            sa.select(
+                sa.literal(batch).label("batch"),
+                Article.id.label("id"),
+                sa.func.row_number().over(order_by=order).label("position"),
+            )
+            .where(*conditions)
+            .order_by(order)
+            .limit(self.limit)
+            .subquery()
+        )
+        # SQLite 不允许 UNION 的分支直接带 ORDER BY/LIMIT，外面再包一层
+        return sa.select(subquery.c.batch, subquery.c.id, subquery.c.position)
+
+
+class CallPlans:
+    """每个模板最近一次渲染的调用序列"""
+
+    def __init__(self, max_templates: int = 256, max_calls: int = 32) -> None:
+        self.max_templates = max_templates
+        self.max_calls = max_calls
+        self._plans: OrderedDict[str, tuple[ArticleQuery, ...]] = OrderedDict()
+
+    def get(self, template: str) -> tuple[ArticleQuery, ...]:
+        return self._plans.get(template, ())
+
+    def set(self, template: str, calls: list[ArticleQuery]) -> None:
+        self._plans[template] = tuple(calls[: self.max_calls])
+        self._plans.move_to_end(template)
+        while len(self._plans) > self.max_templates:
+            self._plans.popitem(last=False)
+
+
+plans = CallPlans()
+
+
+class ArticleLoader:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self._results: dict[ArticleQuery, list[dict[str, Any]]] = {}
+        # template -> 本次渲染中的调用序列
+        self._calls: dict[str, list[ArticleQuery]] = {}
+
+    async def load(self, template: str, query: ArticleQuery) -> list[dict[str, Any]]:
+        calls = self._calls.get(template)
+        if calls is None:
+            planned = plans.get(template)
+            calls = self._calls[template] = []
+            # 第一个调用与上次一致时，认为本次渲染的调用序列也相同，整体预取
+            batch = planned if planned and planned[0] == query else (query,)
+        else:
+            batch = (query,)
+
+        if query not in calls:
+            calls.append(query)
+            plans.set(template, calls)
+
+        missing = [item for item in dict.fromkeys(batch) if item not in self._results]
+        if missing:
+            self._results.update(await self.fetch(missing))
+        return self._results[query]
+
+    async def fetch(
+        self, queries: list[ArticleQuery]
+    ) -> dict[ArticleQuery, list[dict[str, Any]]]:
+        """一次往返查询多组文章"""
+        statements = [query.statement(batch) for batch, query in enumerate(queries)]
+        ids = (
+            statements[0] if len(statements) == 1 else sa.union_all(*statements)
+        ).subquery()
+
+        result = await self.session.execute(
+            sa.select(Article, ids.c.batch)
+            .join(ids, ids.c.id == Article.id)
+            .order_by(ids.c.batch, ids.c.position)
+            .options(*LIST_OPTIONS)
+        )
+
+        grouped: list[list[Article]] = [[] for _ in queries]
+        for article, batch in result:
+            grouped[batch].append(article)
+
+        return {
+            query: article_list_adapter.dump_python(
+                article_list_adapter.validate_python(articles)
+            )
+            for query, articles in zip(queries, grouped, strict=True)
+        }
+
+    async def fetch_ids(self, ids: list[Any]) -> list[dict[str, Any]]:
+        """按给定顺序加载已发布的文章，不存在或未发布的跳过"""
+        if not ids:
+            return []
+        result = await self.session.scalars(
+            sa.select(Article)
+            .where(Article.id.in_(ids), Article.status == PublishStatus.PUBLISHED)
+            .options(*LIST_OPTIONS)
+        )
+        articles = {article.id: article for article in result}
+        return article_list_adapter.dump_python(
+            article_list_adapter.validate_python(
+                [articles[i] for i in ids if i in articles]
+            )
+        )
+
+
+def get_article_loader(request: Request, session: AsyncSession) -> ArticleLoader:
+    loader = request.state.get(STATE_KEY)
+    if loader is None:
+        loader = ArticleLoader(session)
+        request.state[STATE_KEY] = loader
+    return loader
+
+
+def rebind_article_loader(request: Request, session: AsyncSession) -> None:
+    """请求中已创建的加载器改用 session"""
+    loader = request.state.get(STATE_KEY)
+    if loader is not None:
+        loader.session = session
@@ -0,0 +1,112 @@
+"""模板查找缓存
+
+前台视图按候选列表查找模板（如 `special_{slug}.html` -> `_special.html`），
+不存在的候选每次都要访问文件系统并抛出异常。这里按候选列表缓存最终选中的模板，
+找不到的结果也缓存。
+
+Jinja 环境只在 debug 模式下检查模板文件修改时间，其余情况下模板变更通过
+`template_changed` 事件通知：
+- 后台模板管理接口修改文件后发布事件（所有 worker）
+- `TemplateWatcher` 监听模板目录，发现文件变化时只在本进程处理
+  （每个 worker 都有自己的监听任务）
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Sequence
+from pathlib import Path
+
+from jinja2 import Environment, Template
+from litestar.contrib.jinja import JinjaTemplateEngine
+from litestar.exceptions import TemplateNotFoundException
+
+from application.config import config
+
+from .bus import bus
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateLookup:
+    def __init__(self) -> None:
+        self._resolved: dict[tuple[str, ...], Template | None] = {}
+        self._environments: dict[int, Environment] = {}
+
+    def resolve(
+        self, engine: JinjaTemplateEngine, candidates: Sequence[str]
+    ) -> Template | None:
+        """返回第一个存在的模板，都不存在时返回 None"""
+        key = tuple(candidates)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        self._environments.setdefault(id(engine.engine), engine.engine)
+        template = None
+        for name in key:
+            try:
+                template = engine.get_template(name)
+                break
+            except TemplateNotFoundException:
+                continue
+        self._resolved[key] = template
+        return template
+
+    def clear(self) -> None:
+        self._resolved.clear()
+        # 同时清理 Jinja 的模板缓存，extends/include 的模板也会重新加载
+        for env in self._environments.values():
+            if env.cache is not None:
+                env.cache.clear()
+
+
+template_lookup = TemplateLookup()
+
+
+class TemplateWatcher:
+    """监听模板目录，文件变化时清理本进程的模板缓存"""
+
+    def __init__(self, directories: Sequence[Path], enabled: bool = True) -> None:
+        self.directories = directories
+        self.enabled = enabled
+        self._task: asyncio.Task | None = None
+        self._stop: asyncio.Event | None = None
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        try:
+            from watchfiles import awatch
+        except ImportError:
+            logger.warning("未安装 watchfiles，模板文件变化需要通过后台保存或重启生效")
+            return
+
+        directories = [d for d in self.directories if d.is_dir()]
+        if not directories:
+            return
+        stop = self._stop = asyncio.Event()
+
+        async def watch() -> None:
+            async for _ in awatch(*directories, stop_event=stop):
+                await bus.dispatch("template_changed", {})
+
+        self._task = asyncio.create_task(watch())
+
+    async def stop(self) -> None:
+        if self._task is None or self._stop is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+
+watcher = TemplateWatcher(
+    [config.app_dir / "web" / "templates", config.storage_dir / "templates"],
+    enabled=config.web_template_watch,
+)
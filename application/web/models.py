@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from advanced_alchemy.base import AdvancedDeclarativeBase
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class CacheVersion(AdvancedDeclarativeBase):
+    """
+    缓存版本表
+
+    每个失效事件一行，事件发生时 version + 1。各 worker 定期比对本地已处理的版本号，
+    发现落后即说明漏收了失效消息，据此清理本地缓存。
+    """
+
+    __tablename__ = "web_cache_versions"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
@@ -0,0 +1,376 @@
+"""前台整页缓存
+
+渲染结果按 `path + page` 缓存为字节串。渲染过程中视图和模板全局函数通过
+`depends_on()` 记录页面依赖的标签（栏目、内容、推荐位、专题……），
+后台修改数据后按标签精确失效，不影响无关页面。
+
+标签约定：
+- `category:{id}` / `tag:{id}` / `special:{id}` / `feature:{id}`：依赖某个分类下的内容列表
+- `content:{id}`：展示了某篇内容
+- `contents`：展示了不限分类的最新内容
+- `categories` / `specials` / `features`：使用了分类全局列表（导航等）
+- `trending`：使用了热门排行
+
+页面存放在 `pages` 命名空间的两级缓存存储中（见 `config.stores`），所有 worker 共用。
+
+缓存的页面带强 ETag（内容摘要），渲染器提供了 Last-Modified 时一并保存；
+命中缓存的条件请求（If-None-Match / If-Modified-Since）直接返回 304。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any
+
+import msgspec
+from litestar import Request, Response
+from litestar.status_codes import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+from application.config import config
+
+from .bus import bus
+from .flight import SingleFlight
+
+if TYPE_CHECKING:
+    from litestar.stores.base import Store
+
+CONTENTS_TAG = "contents"
+CATEGORIES_TAG = "categories"
+SPECIALS_TAG = "specials"
+FEATURES_TAG = "features"
+TRENDING_TAG = "trending"
+
+PAGE_PARAMS = frozenset({"page", "after", "before"})
+
+_collected_tags: ContextVar[set[str] | None] = ContextVar("page_tags", default=None)
+
+
+def tag(kind: str, value: Any) -> str:
+    """构造单个对象的缓存标签，如 tag("category", id) -> "category:{id}" """
+    return f"{kind}:{value}"
+
+
+def depends_on(*tags: str) -> None:
+    """记录当前正在渲染的页面依赖的标签（不在页面缓存渲染中时忽略）"""
+    collected = _collected_tags.get()
+    if collected is not None:
+        collected.update(tags)
+
+
+def collecting() -> bool:
+    """当前是否在为整页缓存渲染页面"""
+    return _collected_tags.get() is not None
+
+
+def content_tags(
+    content_ids: Iterable[Any] = (),
+    category_ids: Iterable[Any] = (),
+    tag_ids: Iterable[Any] = (),
+    special_ids: Iterable[Any] = (),
+    feature_ids: Iterable[Any] = (),
+) -> list[str]:
+    """内容增删改时需要失效的标签"""
+    tags = {CONTENTS_TAG}
+    tags.update(tag("content", i) for i in content_ids)
+    tags.update(tag("category", i) for i in category_ids)
+    tags.update(tag("tag", i) for i in tag_ids)
+    tags.update(tag("special", i) for i in special_ids)
+    tags.update(tag("feature", i) for i in feature_ids)
+    return sorted(tags)
+
+
+def page_key(request: Request) -> str | None:
+    """缓存键：path + 页码或游标；带其他查询参数的请求不缓存
+
+    游标分页不使用页码，带游标时键中不含页码，同一页只缓存一份。
+    """
+    params = request.query_params
+    if any(name not in PAGE_PARAMS for name in params):
+        return None
+    for name in ("after", "before"):
+        if cursor := params.get(name):
+            return f"{request.url.path}?{name}={cursor}"
+    page = params.get("page", "1")
+    if not page.isdigit():
+        return None
+    return f"{request.url.path}?page={int(page) or 1}"
+
+
+def etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class PageEntry(msgspec.Struct, frozen=True, array_like=True):
+    body: bytes
+    tags: frozenset[str]
+    # 过期时间和渲染开始时间，时间戳（秒），worker 之间可比较
+    expires_at: float
+    etag: str
+    media_type: str = "text/html"
+    last_modified: str | None = None
+    rendered_at: float = 0.0
+    # 渲染开始时失效总线的版本（见 `InvalidationBus.total_version`），-1 表示未知
+    bus_version: int = -1
+
+    def headers(self, state: str) -> dict[str, str]:
+        headers = {"X-Page-Cache": state, "ETag": self.etag}
+        if self.last_modified:
+            headers["Last-Modified"] = self.last_modified
+        return headers
+
+    def not_modified(self, request: Request) -> bool:
+        """客户端缓存的版本是否仍然有效"""
+        headers = request.headers
+        if (if_none_match := headers.get("If-None-Match")) is not None:
+            # GET 请求按弱比较，忽略 W/ 前缀
+            tags = {
+                item.strip().removeprefix("W/") for item in if_none_match.split(",")
+            }
+            return "*" in tags or self.etag in tags
+        since = headers.get("If-Modified-Since")
+        if since is None or self.last_modified is None:
+            return False
+        try:
+            return parsedate_to_datetime(self.last_modified) <= parsedate_to_datetime(
+                since
+            )
+        except (TypeError, ValueError):
+            return False
+
+    def to_response(self, state: str = "HIT") -> Response:
+        return Response(
+            content=self.body,
+            media_type=self.media_type,
+            status_code=HTTP_200_OK,
+            headers=self.headers(state),
+        )
+
+    def to_not_modified(self) -> Response:
+        return Response(
+            content=b"",
+            status_code=HTTP_304_NOT_MODIFIED,
+            headers=self.headers("HIT"),
+        )
+
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder(PageEntry)
+
+
+def copy_response(response: Response) -> Response:
+    """合并渲染时，等待者各自拿到一份独立的 Response"""
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        media_type=response.media_type,
+        headers=dict(response.headers),
+    )
+
+
+class PageCache:
+    """页面存放在两级缓存存储中（worker 内存 + worker 之间共享），
+    一个 worker 渲染的页面其他 worker 也能直接使用。
+
+    共享层无法按标签删除，失效改为在读取时判断：条目记录渲染开始的时间和依赖的标签，
+    每个 worker 记录各标签最后一次失效的时间（失效事件通过消息总线送达所有 worker），
+    渲染早于任一依赖标签失效时间的页面视为已失效，在 stale_ttl 内仍可作为旧版本返回。
+
+    worker 启动前渲染的页面，启动前的失效事件没有记录；条目同时记录渲染时总线的版本，
+    不低于 worker 启动时的版本说明期间没有失效事件，可以继续使用，重启后不必重新渲染。
+    """
+
+    # 失效时间记录超过这么多条时清理已经用不到的记录
+    MAX_MARKS = 4096
+
+    def __init__(
+        self,
+        store: Store | None,
+        ttl: int,
+        stale_ttl: int = 0,
+        bus_version: Callable[[], int | None] = lambda: None,
+    ) -> None:
+        self.store = store
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.bus_version = bus_version
+        # 启动时间和当时总线的版本，见 start()
+        self._started_at = time.time()
+        self._started_version: int | None = None
+        self._cleared_at = 0.0
+        # tag -> 最后一次失效的时间
+        self._invalidated: dict[str, float] = {}
+        # 每次失效递增，用于丢弃与失效并发渲染出来的旧结果
+        self._generation = 0
+        self._flight = SingleFlight()
+
+    async def start(self) -> None:
+        """在失效总线启动后调用，记录启动时的总线版本"""
+        self._started_at = time.time()
+        self._started_version = self.bus_version()
+
+    def _missed_events(self, entry: PageEntry) -> bool:
+        """页面是否可能错过了启动前的失效事件"""
+        if entry.rendered_at > self._started_at:
+            return False
+        return (
+            self._started_version is None or entry.bus_version < self._started_version
+        )
+
+    async def lookup(self, key: str) -> tuple[PageEntry | None, PageEntry | None]:
+        """返回 (有效的页面, 可作为旧版本返回的页面)，两者最多一个不为 None"""
+        if self.store is None:
+            return None, None
+        data = await self.store.get(key)
+        if data is None:
+            return None, None
+        try:
+            entry = _decoder.decode(data)
+        except msgspec.DecodeError:
+            return None, None
+
+        now = time.time()
+        if entry.rendered_at <= self._cleared_at or self._missed_events(entry):
+            # 结构性变更或错过了失效事件，旧页面中的链接可能已经失效，不作为旧版本返回
+            return None, None
+        invalidated = max(
+            (
+                at
+                for name in entry.tags
+                if (at := self._invalidated.get(name, 0.0)) >= entry.rendered_at
+            ),
+            default=None,
+        )
+        if invalidated is None and now < entry.expires_at:
+            return entry, None
+        stale_until = (invalidated or entry.expires_at) + self.stale_ttl
+        return None, entry if now < stale_until else None
+
+    async def get(self, key: str) -> PageEntry | None:
+        return (await self.lookup(key))[0]
+
+    async def tags(self, key: str) -> frozenset[str] | None:
+        """缓存中页面依赖的标签"""
+        fresh, stale = await self.lookup(key)
+        entry = fresh or stale
+        return entry.tags if entry is not None else None
+
+    async def set(
+        self,
+        key: str,
+        body: bytes,
+        tags: Iterable[str],
+        media_type: str = "text/html",
+        last_modified: str | None = None,
+        rendered_at: float | None = None,
+        bus_version: int | None = None,
+    ) -> PageEntry | None:
+        if self.store is None:
+            return None
+        now = time.time()
+        entry = PageEntry(
+            body=body,
+            tags=frozenset(tags),
+            expires_at=now + self.ttl,
+            etag=etag(body),
+            media_type=media_type,
+            last_modified=last_modified,
+            rendered_at=now if rendered_at is None else rendered_at,
+            bus_version=-1 if bus_version is None else bus_version,
+        )
+        # 多保留 stale_ttl，过期后仍可作为旧版本返回
+        await self.store.set(key, _encoder.encode(entry), self.ttl + self.stale_ttl)
+        return entry
+
+    def evict(self, *tags: str) -> None:
+        """失效依赖任一标签的页面"""
+        self._generation += 1
+        now = time.time()
+        for name in tags:
+            self._invalidated[name] = now
+        if len(self._invalidated) > self.MAX_MARKS:
+            # 早于这个时间渲染的页面都已从存储中过期
+            horizon = now - self.ttl - self.stale_ttl
+            self._invalidated = {
+                name: at for name, at in self._invalidated.items() if at > horizon
+            }
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._cleared_at = time.time()
+        self._invalidated.clear()
+
+    async def render(
+        self, request: Request, renderer: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        """命中缓存直接返回，否则调用 renderer 渲染并按收集到的标签缓存"""
+        key = page_key(request)
+        if key is None:
+            return await renderer()
+
+        entry, stale = await self.lookup(key)
+        if entry is not None:
+            if entry.not_modified(request):
+                return entry.to_not_modified()
+            return entry.to_response()
+
+        # 同一页面只渲染一次；已有请求在重新渲染时，其他请求直接返回旧版本
+        generation = self._generation
+        flight_key = f"{generation}:{key}"
+        if self._flight.running(flight_key) and stale is not None:
+            return stale.to_response("STALE")
+
+        async def fill() -> Response:
+            tags: set[str] = set()
+            rendered_at = time.time()
+            bus_version = self.bus_version()
+            token = _collected_tags.set(tags)
+            try:
+                response = await renderer()
+            finally:
+                _collected_tags.reset(token)
+
+            if (
+                response.status_code == HTTP_200_OK
+                and isinstance(response.content, (str, bytes))
+                and generation == self._generation
+            ):
+                body = response.content
+                entry = await self.set(
+                    key,
+                    body.encode() if isinstance(body, str) else body,
+                    tags,
+                    media_type=response.media_type,
+                    last_modified=response.headers.get("Last-Modified"),
+                    rendered_at=rendered_at,
+                    bus_version=bus_version,
+                )
+                if entry is not None:
+                    response.headers["ETag"] = entry.etag
+            return response
+
+        leader = False
+
+        async def render_once() -> Response:
+            nonlocal leader
+            leader = True
+            return await fill()
+
+        response = await self._flight.do(flight_key, render_once)
+        if leader:
+            return response
+        if isinstance(response.content, (str, bytes)):
+            return copy_response(response)
+        # 流式响应不能共享，自己渲染
+        return await renderer()
+
+
+page_cache = PageCache(
+    store=config.plugins.stores.get("pages") if config.web_page_cache else None,
+    ttl=config.web_page_cache_ttl,
+    stale_ttl=config.web_stale_ttl,
+    bus_version=bus.total_version,
+)
@@ -0,0 +1,72 @@
+"""固定链接解析
+
+前台 `{path:path}` 路由的热点路径：
+- 栏目：进程内维护 `Category.path -> id` 映射，命中后按主键查询，不再先试一次 path 查询
+- 文章：未命中栏目映射时，只走一次 `Content.path` 唯一索引查询
+- 不存在的路径：放入有上限、带过期时间的负缓存，爬虫反复访问时不再查库
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+import sqlalchemy as sa
+
+from application.config import config
+from application.taxonomies.models import Category
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class PermalinkResolver:
+    def __init__(self, miss_size: int, miss_ttl: int) -> None:
+        self.miss_size = miss_size
+        self.miss_ttl = miss_ttl
+        # None 表示尚未加载（或已失效），下一次访问时整体重建
+        self._categories: dict[str, UUID] | None = None
+        # path -> 过期时间戳，按插入顺序淘汰
+        self._misses: OrderedDict[str, float] = OrderedDict()
+
+    async def category_id(self, session: AsyncSession, path: str) -> UUID | None:
+        """根据 path 查找栏目 ID"""
+        if self._categories is None:
+            result = await session.execute(sa.select(Category.path, Category.id))
+            self._categories = {row.path: row.id for row in result}
+        return self._categories.get(path)
+
+    def is_miss(self, path: str) -> bool:
+        """path 是否在负缓存中（已确认不存在）"""
+        expires_at = self._misses.get(path)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            self._misses.pop(path, None)
+            return False
+        return True
+
+    def add_miss(self, path: str) -> None:
+        """记录一个不存在的 path"""
+        self._misses[path] = time.monotonic() + self.miss_ttl
+        self._misses.move_to_end(path)
+        while len(self._misses) > self.miss_size:
+            self._misses.popitem(last=False)
+
+    def reset_categories(self) -> None:
+        """栏目变更后清空 path 映射"""
+        self._categories = None
+        # 新增/修改栏目可能让之前不存在的 path 变得可访问
+        self._misses.clear()
+
+    def reset_misses(self) -> None:
+        """内容变更后清空负缓存"""
+        self._misses.clear()
+
+
+resolver = PermalinkResolver(
+    miss_size=config.web_permalink_miss_size,
+    miss_ttl=config.web_permalink_miss_ttl,
+)
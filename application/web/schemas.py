@@ -18,6 +18,7 @@ class CategoryLite(BaseModel):
     model_config = ConfigDict(frozen=True, from_attributes=True)
 
     id: uuid.UUID
+    parent_id: uuid.UUID | None = None
     name: str
     title: str | None = None
     description: str | None = None
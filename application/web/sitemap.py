@@ -0,0 +1,327 @@
+"""站点地图生成
+
+生成的文件写入 `sitemap_dir`，由 nginx 直接返回，爬虫抓取时不查询数据库：
+- `sitemap.xml`：索引文件，列出所有分片和各自的 lastmod
+- `sitemap-pages.xml`：首页和栏目页
+- `sitemap-{栏目}-{N}.xml`：栏目下已发布的内容，按 ID 顺序每 `shard_size` 条一个分片
+
+分片的边界由窗口函数一次算出（各栏目每个分片第一条内容的 ID），
+再按分片统计条数和最后修改时间，与上次生成的记录比较，只重新生成有变化的分片。
+分片内容通过服务端游标（`yield_per`）逐批读取并写入文件，不会一次加载整个栏目。
+
+绑定了独立域名的栏目不属于本站点，不写入站点地图。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote
+from uuid import UUID
+from xml.sax.saxutils import escape
+
+import sqlalchemy as sa
+
+from application.config import config
+from application.contents.enums import PublishStatus
+from application.contents.models import Content
+from application.taxonomies.models import Category
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# 协议规定单个文件最多 50000 个 URL
+MAX_URLS = 50000
+INDEX_FILE = "sitemap.xml"
+PAGES_FILE = "sitemap-pages.xml"
+YIELD_PER = 1000
+
+NAME_RE = re.compile(r"[^0-9A-Za-z_]+")
+XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+@dataclass
+class Shard:
+    """一个分片的范围和统计：ID 在 [first, end) 之间的内容"""
+
+    name: str
+    category_id: str
+    first: str
+    end: str | None
+    count: int
+    lastmod: str
+
+
+@dataclass
+class Manifest:
+    """上一次生成的记录，用来判断哪些分片需要重新生成"""
+
+    base_url: str
+    shard_size: int
+    # 首页和栏目页：[路径, lastmod]
+    pages: list[list[str]] = field(default_factory=list)
+    shards: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> Manifest | None:
+        try:
+            return cls(**json.loads(path.read_bytes()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(self), ensure_ascii=False))
+        os.replace(tmp, path)
+
+
+@dataclass
+class SitemapResult:
+    written: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    urls: int = 0
+    elapsed: float = 0.0
+
+
+def shard_names(categories: Iterable[tuple[UUID, str]]) -> dict[UUID, str]:
+    """栏目对应的分片文件名前缀：/news/sub -> news_sub，重名时附加栏目 ID"""
+    names: dict[UUID, str] = {}
+    used: set[str] = set()
+    for category_id, path in categories:
+        name = NAME_RE.sub("_", path).strip("_").lower() or category_id.hex[:8]
+        if name in used or name == "pages":
+            name = f"{name}_{category_id.hex[:8]}"
+        used.add(name)
+        names[category_id] = name
+    return names
+
+
+def _lastmod(value: datetime | None) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ") if value else ""
+
+
+class SitemapBuilder:
+    def __init__(
+        self,
+        root: Path,
+        manifest_path: Path,
+        base_url: str,
+        shard_size: int = MAX_URLS,
+    ) -> None:
+        self.root = root
+        self.manifest_path = manifest_path
+        self.base_url = base_url.rstrip("/")
+        self.shard_size = min(shard_size, MAX_URLS)
+
+    def _url(self, path: str) -> str:
+        return escape(self.base_url + quote(path, safe="/:@!$&'()*+,;=-._~%"))
+
+    async def run(self, full: bool = False) -> SitemapResult:
+        started = time.perf_counter()
+        result = SitemapResult()
+        previous = Manifest.load(self.manifest_path)
+        if previous is not None and (
+            full
+            or previous.base_url != self.base_url
+            or previous.shard_size != self.shard_size
+        ):
+            previous = None
+        manifest = Manifest(base_url=self.base_url, shard_size=self.shard_size)
+
+        async with config.plugins.sqlalchemy.get_session() as session:
+            categories = (
+                await session.execute(
+                    sa.select(Category.id, Category.path, Category.updated_at)
+                    .where(sa.or_(Category.domain.is_(None), Category.domain == ""))
+                    .order_by(Category.trail)
+                )
+            ).all()
+            names = shard_names(
+                (category_id, path) for category_id, path, _ in categories
+            )
+            shards = await self._shards(session, names)
+
+            for shard in shards:
+                result.urls += shard.count
+                entry = manifest.shards[shard.name] = asdict(shard)
+                if previous is not None and previous.shards.get(shard.name) == entry:
+                    result.unchanged += 1
+                    continue
+                await self._write_shard(session, shard)
+                result.written += 1
+
+        # 栏目的 lastmod 取栏目本身和其中内容的最后修改时间
+        content_lastmod: dict[str, str] = {}
+        for shard in shards:
+            current = content_lastmod.get(shard.category_id, "")
+            content_lastmod[shard.category_id] = max(current, shard.lastmod)
+        pages = [["/", max(content_lastmod.values(), default="")]]
+        for category_id, path, updated_at in categories:
+            lastmod = max(
+                _lastmod(updated_at), content_lastmod.get(str(category_id), "")
+            )
+            pages.append([path, lastmod])
+        result.urls += len(pages)
+
+        manifest.pages = pages
+        if previous is not None and previous.pages == manifest.pages:
+            result.unchanged += 1
+        else:
+            self._write(PAGES_FILE, self._urlset(pages))
+            result.written += 1
+
+        index = [(PAGES_FILE, pages[0][1])]
+        index.extend((shard.name, shard.lastmod) for shard in shards)
+        self._write(INDEX_FILE, self._index(index))
+
+        if previous is not None:
+            for name in previous.shards.keys() - manifest.shards.keys():
+                (self.root / name).unlink(missing_ok=True)
+                result.removed += 1
+
+        manifest.save(self.manifest_path)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    async def _shards(
+        self, session: AsyncSession, names: dict[UUID, str]
+    ) -> list[Shard]:
+        """计算各栏目的分片范围和统计，不读取内容本身"""
+        size = self.shard_size
+        ordered = (
+            sa.select(
+                Content.id,
+                Content.category_id,
+                Content.updated_at,
+                (
+                    sa.func.row_number().over(
+                        partition_by=Content.category_id, order_by=Content.id
+                    )
+                    - 1
+                ).label("position"),
+            )
+            .where(
+                Content.status == PublishStatus.PUBLISHED,
+                Content.category_id.in_(names),
+            )
+            .subquery()
+        )
+        number = (ordered.c.position // size).label("number")
+
+        # 每个分片第一条内容的 ID
+        boundaries: defaultdict[UUID, list[UUID]] = defaultdict(list)
+        for category_id, content_id in await session.execute(
+            sa.select(ordered.c.category_id, ordered.c.id)
+            .where(ordered.c.position % size == 0)
+            .order_by(ordered.c.category_id, ordered.c.position)
+        ):
+            boundaries[category_id].append(content_id)
+
+        stats = {
+            (category_id, index): (count, lastmod)
+            for category_id, index, count, lastmod in await session.execute(
+                sa.select(
+                    ordered.c.category_id,
+                    number,
+                    sa.func.count(),
+                    sa.func.max(ordered.c.updated_at),
+                ).group_by(ordered.c.category_id, number)
+            )
+        }
+
+        shards = []
+        for category_id, name in names.items():
+            firsts = boundaries.get(category_id, [])
+            for index, first in enumerate(firsts):
+                end = firsts[index + 1] if index + 1 < len(firsts) else None
+                count, lastmod = stats[category_id, index]
+                shards.append(
+                    Shard(
+                        name=f"sitemap-{name}-{index + 1}.xml",
+                        category_id=str(category_id),
+                        first=str(first),
+                        end=str(end) if end else None,
+                        count=count,
+                        lastmod=_lastmod(lastmod),
+                    )
+                )
+        return shards
+
+    async def _write_shard(self, session: AsyncSession, shard: Shard) -> None:
+        conditions = [
+            Content.status == PublishStatus.PUBLISHED,
+            Content.category_id == UUID(shard.category_id),
+            Content.id >= UUID(shard.first),
+        ]
+        if shard.end is not None:
+            conditions.append(Content.id < UUID(shard.end))
+        stmt = (
+            sa.select(Content.path, Content.updated_at)
+            .where(*conditions)
+            .order_by(Content.id)
+            .execution_options(yield_per=YIELD_PER)
+        )
+        result = await session.stream(stmt)
+
+        tmp = self._tmp(shard.name)
+        try:
+            with tmp.open("w", encoding="utf-8") as file:
+                file.write(
+                    f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset {XMLNS}>\n'
+                )
+                async for rows in result.partitions():
+                    file.write(
+                        "".join(
+                            self._entry("url", self._url(path), _lastmod(updated_at))
+                            for path, updated_at in rows
+                        )
+                    )
+                file.write("</urlset>\n")
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, self.root / shard.name)
+
+    def _urlset(self, pages: list[list[str]]) -> str:
+        entries = "".join(
+            self._entry("url", self._url(path), lastmod) for path, lastmod in pages
+        )
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset {XMLNS}>\n'
+            f"{entries}</urlset>\n"
+        )
+
+    def _index(self, shards: list[tuple[str, str]]) -> str:
+        entries = "".join(
+            self._entry("sitemap", self._url(f"/{name}"), lastmod)
+            for name, lastmod in shards
+        )
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex {XMLNS}>\n'
+            f"{entries}</sitemapindex>\n"
+        )
+
+    @staticmethod
+    def _entry(tag: str, loc: str, lastmod: str) -> str:
+        if lastmod:
+            return f"<{tag}><loc>{loc}</loc><lastmod>{lastmod}</lastmod></{tag}>\n"
+        return f"<{tag}><loc>{loc}</loc></{tag}>\n"
+
+    def _tmp(self, name: str) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return self.root / f".{name}.tmp"
+
+    def _write(self, name: str, content: str) -> None:
+        tmp = self._tmp(name)
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, self.root / name)
@@ -1,21 +1,32 @@
+"""前台分类数据快照
+
+栏目、专题、推荐位列表在每个页面都会用到（导航、侧栏）。
+这里在进程内缓存渲染直接可用的只读快照：序列化后的列表、id 索引和栏目树，
+失效后第一次访问时重建一次，之后同一 worker 内的所有渲染共享，不再做 Pydantic 校验。
+
+快照中的 dict 被所有请求共享，模板和调用方只能读取，不要修改。
+"""
+
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 
-from litestar.stores.memory import MemoryStore
 from pydantic import TypeAdapter
 
-from application.taxonomies.schemas import (
-    CategoryLiteSchema,
-    FeatureLiteSchema,
-    SpecialLiteSchema,
-)
+from application.config import config
 from application.taxonomies.services import (
     CategoryRepository,
     FeatureRepository,
     SpecialRepository,
 )
 
+from .flight import SingleFlight
+from .schemas import category_list_adapter, feature_list_adapter, special_list_adapter
+
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -24,56 +35,131 @@ CATEGORIES_CACHE_KEY = "categories"
 SPECIALS_CACHE_KEY = "specials"
 FEATURES_CACHE_KEY = "features"
 
-store = MemoryStore()
-
-# ==========================================
-# 定义列表类型的适配器 (Pydantic V2 核心)
-# ==========================================
-# 用于处理 list[Schema] 的序列化、反序列化和 ORM 转换
-category_list_adapter = TypeAdapter(list[CategoryLiteSchema])
-feature_list_adapter = TypeAdapter(list[FeatureLiteSchema])
-special_list_adapter = TypeAdapter(list[SpecialLiteSchema])
-
-
-async def get_categories_cached(session: AsyncSession) -> list[CategoryLiteSchema]:
-    cached = await store.get(CATEGORIES_CACHE_KEY)
-    if cached is not None:
-        # Pydantic V2: 使用适配器反序列化列表
-        return category_list_adapter.validate_json(cached)
-
-    repo = CategoryRepository(session=session)
-    result = await repo.list(order_by=[("trail", False)])
-
-    categories = category_list_adapter.validate_python(result)
-
-    await store.set(CATEGORIES_CACHE_KEY, category_list_adapter.dump_json(categories))
-
-    return categories
-
-
-async def get_features_cached(session: AsyncSession) -> list[FeatureLiteSchema]:
-    cached = await store.get(FEATURES_CACHE_KEY)
-    if cached is not None:
-        return feature_list_adapter.validate_json(cached)
-
-    repo = FeatureRepository(session=session)
-    result = await repo.list()
-
-    features = feature_list_adapter.validate_python(result)
-
-    await store.set(FEATURES_CACHE_KEY, feature_list_adapter.dump_json(features))
-    return features
-
 
-async def get_specials_cached(session: AsyncSession) -> list[SpecialLiteSchema]:
-    cached = await store.get(SPECIALS_CACHE_KEY)
-    if cached is not None:
-        return special_list_adapter.validate_json(cached)
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """渲染用的只读快照"""
+
+    items: tuple[dict[str, Any], ...]
+    index: Mapping[str, dict[str, Any]]
+    tree: tuple[dict[str, Any], ...] = field(default=())
+
+    @classmethod
+    def build(
+        cls, adapter: TypeAdapter, rows: Iterable[Any], tree: bool = False
+    ) -> Snapshot:
+        items = tuple(adapter.dump_python(adapter.validate_python(list(rows))))
+        return cls(
+            items=items,
+            index=MappingProxyType({str(item["id"]): item for item in items}),
+            tree=build_tree(items) if tree else (),
+        )
+
+    def select(self, ids: Iterable[Any]) -> list[dict[str, Any]]:
+        """按 id 筛选（保持快照中的顺序），不传 id 时返回全部"""
+        wanted = {str(i) for i in ids}
+        if not wanted:
+            return list(self.items)
+        return [item for item in self.items if str(item["id"]) in wanted]
+
+
+def build_tree(items: tuple[dict[str, Any], ...]) -> tuple[dict[str, Any], ...]:
+    """按 parent_id 构建栏目树，children 为元组"""
+    children: dict[Any, list[dict[str, Any]]] = {}
+    for item in items:
+        children.setdefault(item.get("parent_id"), []).append(item)
+
+    ids = {item["id"] for item in items}
+
+    def node(item: dict[str, Any]) -> dict[str, Any]:
+        return {
+            **item,
+            "children": tuple(node(child) for child in children.get(item["id"], ())),
+        }
+
+    return tuple(
+        node(item)
+        for item in items
+        if item.get("parent_id") is None or item["parent_id"] not in ids
+    )
+
+
+class SnapshotStore:
+    """
+    进程内快照缓存，按 key 保存，过期或删除后下次访问重建
+
+    并发的重建合并为一次；过期重建期间其他请求在 stale_ttl 内直接使用旧快照。
+    """
+
+    def __init__(self, ttl: int, stale_ttl: int = 0) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._snapshots: dict[str, tuple[Snapshot, float]] = {}
+        self._stale: dict[str, tuple[Snapshot, float]] = {}
+        # key -> 删除次数，删除前开始的重建结果不写回
+        self._generations: dict[str, int] = {}
+        self._flight = SingleFlight()
+
+    async def get(
+        self, key: str, loader: Callable[[], Awaitable[Snapshot]]
+    ) -> Snapshot:
+        now = time.monotonic()
+        cached = self._snapshots.get(key)
+        if cached is not None:
+            if cached[1] > now:
+                return cached[0]
+            self._retire(key)
+
+        generation = self._generations.get(key, 0)
+        flight_key = f"{generation}:{key}"
+        stale = self._stale.get(key)
+        if stale is not None and stale[1] > now and self._flight.running(flight_key):
+            return stale[0]
+
+        async def load() -> Snapshot:
+            snapshot = await loader()
+            if generation == self._generations.get(key, 0):
+                self._snapshots[key] = (snapshot, time.monotonic() + self.ttl)
+                self._stale.pop(key, None)
+            return snapshot
+
+        return await self._flight.do(flight_key, load)
+
+    def _retire(self, key: str) -> None:
+        cached = self._snapshots.pop(key, None)
+        if cached is not None and self.stale_ttl > 0:
+            self._stale[key] = (cached[0], time.monotonic() + self.stale_ttl)
+
+    async def delete(self, key: str) -> None:
+        # 数据已变更：不保留旧快照，否则用旧快照渲染的页面会被写入整页缓存
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._snapshots.pop(key, None)
+        self._stale.pop(key, None)
+
+
+store = SnapshotStore(ttl=config.web_store_ttl, stale_ttl=config.web_stale_ttl)
+
+
+async def get_categories_cached(session: AsyncSession) -> Snapshot:
+    async def load() -> Snapshot:
+        repo = CategoryRepository(session=session)
+        rows = await repo.list(order_by=[("trail", False)])
+        return Snapshot.build(category_list_adapter, rows, tree=True)
+
+    return await store.get(CATEGORIES_CACHE_KEY, load)
+
+
+async def get_features_cached(session: AsyncSession) -> Snapshot:
+    async def load() -> Snapshot:
+        repo = FeatureRepository(session=session)
+        return Snapshot.build(feature_list_adapter, await repo.list())
+
+    return await store.get(FEATURES_CACHE_KEY, load)
 
-    repo = SpecialRepository(session=session)
-    result = await repo.list()
 
-    specials = special_list_adapter.validate_python(result)
+async def get_specials_cached(session: AsyncSession) -> Snapshot:
+    async def load() -> Snapshot:
+        repo = SpecialRepository(session=session)
+        return Snapshot.build(special_list_adapter, await repo.list())
 
-    await store.set(SPECIALS_CACHE_KEY, special_list_adapter.dump_json(specials))
-    return specials
+    return await store.get(SPECIALS_CACHE_KEY, load)
@@ -3,6 +3,14 @@ from __future__ import annotations
 
 TAG_SHOW = "/t/{slug:str}"
 SPECIAL_SHOW = "/s/{slug:str}"
+SEARCH = "/search"
+# 静态导出的内容页面上报浏览量
+HITS = "/hits"
+
+# 订阅：feed_format 为 rss 或 atom
+FEED_CATEGORY = "/feeds/{feed_format:str}/c/{path:path}"
+FEED_TAG = "/feeds/{feed_format:str}/t/{slug:str}"
+FEED_FEATURE = "/feeds/{feed_format:str}/f/{feature_id:uuid}"
 
 
 def build_tag_url(slug: str) -> str:
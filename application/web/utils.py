@@ -1,16 +1,74 @@
 from __future__ import annotations
 
-from typing import Any, Sequence, Type, cast
-
+import base64
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, Sequence, Type, TypeVar, cast
+from urllib.parse import urlencode
+from uuid import UUID
+
+import sqlalchemy as sa
 from advanced_alchemy.filters import LimitOffset
 from advanced_alchemy.repository import SQLAlchemyAsyncRepository
+from jinja2 import Template
 from litestar import Request, Response
 from litestar.contrib.jinja import JinjaTemplateEngine
 from litestar.exceptions import TemplateNotFoundException
 from litestar.pagination import ClassicPagination
+from litestar.response import Stream
 from litestar.status_codes import HTTP_200_OK
 from pydantic import BaseModel
 
+from application.config import config
+
+from .loaders import rebind_article_loader
+from .lookup import template_lookup
+from .pages import collecting
+
+ItemT = TypeVar("ItemT")
+
+
+@dataclass
+class KeysetPagination(Generic[ItemT]):
+    """游标分页结果；模板通过 `?after=` / `?before=` 翻页"""
+
+    items: list[ItemT]
+    page_size: int
+    total_pages: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+def encode_cursor(published_at: datetime, item_id: UUID) -> str:
+    raw = f"{published_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID] | None:
+    """解析游标，格式不正确时返回 None"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        published_at, _, item_id = raw.partition("|")
+        return datetime.fromisoformat(published_at), UUID(item_id)
+    except ValueError:
+        return None
+
+
+def url_without(request: Request, *names: str) -> str:
+    """当前请求的地址（path + 查询参数），去掉指定的查询参数"""
+    params = [
+        (name, value)
+        for name, value in request.query_params.multi_items()
+        if name not in names
+    ]
+    return f"{request.url.path}?{urlencode(params)}" if params else request.url.path
+
+
+def current_page(request: Request) -> int:
+    page = request.query_params.get("page", "1")
+    return max(1, int(page)) if page.isdigit() else 1
+
 
 async def paginate[T: BaseModel](
     request: Request,
@@ -19,16 +77,21 @@ async def paginate[T: BaseModel](
     *filter_args,  # SQLAlchemy 表达式
     page_size: int = 10,
     order_by: Any = None,
+    total: int | None = None,
     **filter_kwargs: Any,  # key=value 过滤
 ) -> ClassicPagination[dict[str, Any]]:
-    page = max(1, int(request.query_params.get("page", 1)))
-
-    result, count = await repo.list_and_count(
-        LimitOffset(limit=page_size, offset=(page - 1) * page_size),
-        *filter_args,
-        **filter_kwargs,
-        order_by=order_by,
-    )
+    """页码分页；已知总数时传入 total，省去 COUNT 查询"""
+    page = current_page(request)
+    limit_offset = LimitOffset(limit=page_size, offset=(page - 1) * page_size)
+    if total is None:
+        result, count = await repo.list_and_count(
+            limit_offset, *filter_args, **filter_kwargs, order_by=order_by
+        )
+    else:
+        result = await repo.list(
+            limit_offset, *filter_args, **filter_kwargs, order_by=order_by
+        )
+        count = total
 
     items = [schema.model_validate(item).model_dump() for item in result]
 
@@ -42,13 +105,95 @@ async def paginate[T: BaseModel](
     )
 
 
+async def keyset_paginate[T: BaseModel](
+    request: Request,
+    schema: Type[T],
+    repo: SQLAlchemyAsyncRepository,
+    *filter_args,  # SQLAlchemy 表达式
+    total: int,
+    page_size: int = 10,
+    **filter_kwargs: Any,  # key=value 过滤
+) -> KeysetPagination[dict[str, Any]]:
+    """
+    按 (published_at, id) 倒序的游标分页
+
+    深翻页不再扫描并丢弃 offset 行，配合 (category_id, status, published_at) 索引使用。
+    `?after=` 取游标之后（更早）的一页，`?before=` 取游标之前（更新）的一页。
+    """
+    model = repo.model_type
+    columns = (model.published_at, model.id)
+    key = sa.tuple_(*columns)
+
+    def cursor_key(values: tuple[datetime, UUID]) -> Any:
+        # 显式指定绑定类型，否则 SQLite 下 UUID 会按字符串而不是列类型比较
+        return sa.tuple_(
+            *(sa.literal(value, column.type) for column, value in zip(columns, values))
+        )
+
+    after = decode_cursor(request.query_params.get("after", ""))
+    before = None if after else decode_cursor(request.query_params.get("before", ""))
+
+    conditions = [*filter_args, model.published_at.isnot(None)]
+    if after:
+        conditions.append(key < cursor_key(after))
+        order_by = [model.published_at.desc(), model.id.desc()]
+    elif before:
+        conditions.append(key > cursor_key(before))
+        order_by = [model.published_at.asc(), model.id.asc()]
+    else:
+        order_by = [model.published_at.desc(), model.id.desc()]
+
+    # 多取一条判断该方向上是否还有下一页
+    result = list(
+        await repo.list(
+            LimitOffset(limit=page_size + 1, offset=0),
+            *conditions,
+            **filter_kwargs,
+            order_by=order_by,
+        )
+    )
+    has_more = len(result) > page_size
+    result = result[:page_size]
+    if before:
+        result.reverse()
+
+    has_next = has_more if not before else True
+    has_prev = bool(after) or (before is not None and has_more)
+
+    items = [schema.model_validate(item).model_dump() for item in result]
+
+    return KeysetPagination(
+        items=items,
+        page_size=page_size,
+        total_pages=(total + page_size - 1) // page_size,
+        next_cursor=(
+            encode_cursor(result[-1].published_at, result[-1].id)
+            if result and has_next
+            else None
+        ),
+        prev_cursor=(
+            encode_cursor(result[0].published_at, result[0].id)
+            if result and has_prev
+            else None
+        ),
+    )
+
+
 async def render_template(
     request: Request,
     template_name: str | Sequence[str],
     *,
     status_code: int = HTTP_200_OK,
+    stream: bool | None = None,
     **context: Any,
 ) -> Response:
+    """
+    渲染模板
+
+    stream 为 True（默认取 web_stream_render）时以分块方式边渲染边发送，
+    浏览器可以先拿到 <head> 开始加载样式；整页缓存渲染中的页面仍然整体渲染，
+    以便缓存完整结果。
+    """
     engine = cast(JinjaTemplateEngine, request.app.template_engine)
 
     # 支持按列表顺序查找模板
@@ -57,13 +202,7 @@ async def render_template(
     else:
         template_candidates = [cast(str, template_name)]
 
-    template = None
-    for name in template_candidates:
-        try:
-            template = engine.get_template(name)
-            break
-        except TemplateNotFoundException:
-            continue
+    template = template_lookup.resolve(engine, template_candidates)
 
     if template is None:
         raise TemplateNotFoundException(
@@ -75,6 +214,15 @@ async def render_template(
     if context:
         full_context.update(context)
 
+    if stream is None:
+        stream = config.web_stream_render
+    if stream and not collecting():
+        return Stream(
+            _generate(request, template, full_context),
+            media_type="text/html",
+            status_code=status_code,
+        )
+
     # 使用 render_async 异步渲染模板
     html = await template.render_async(**full_context)
 
@@ -83,3 +231,19 @@ async def render_template(
         media_type="text/html",
         status_code=status_code,
     )
+
+
+async def _generate(
+    request: Request, template: Template, context: dict[str, Any]
+) -> AsyncIterator[str]:
+    # 响应头发出时请求的数据库会话已经提交并关闭，渲染期间改用新的会话：
+    # 模板全局函数通过请求取到的、响应前创建的加载器（如搜索页）都使用它，结束后关闭
+    session = config.plugins.sqlalchemy.provide_session(
+        request.app.state, request.scope
+    )
+    rebind_article_loader(request, session)
+    try:
+        async for chunk in template.generate_async(**context):
+            yield chunk
+    finally:
+        await session.close()